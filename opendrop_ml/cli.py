@@ -0,0 +1,249 @@
+"""Command line entry point.
+
+``opendrop-ml`` opens the GUI and ``opendrop-ml batch`` analyses a set of
+images with the settings of a ``user_config.yaml``, without a display:
+
+    opendrop-ml batch ca "images/*.png" -o results.csv
+    opendrop-ml batch ift images/ -c my_config.yaml -j 0
+    opendrop-ml batch ca run1.mp4 --stride 10 --start 5 --end 65
+
+The batch command never imports Tk or a matplotlib GUI backend, so it runs
+on headless machines and starts faster than the GUI.
+"""
+
+from opendrop_ml.modules.image.video import VIDEO_EXTENSIONS, set_import_files
+from opendrop_ml.utils.enums import FunctionType, RegionSelect, ThresholdSelect
+from opendrop_ml.utils.os import resource_path
+
+from typing import List, Optional, Sequence
+import numpy as np
+import argparse
+import glob
+import time
+import sys
+import os
+
+IMAGE_EXTENSIONS = (".bmp", ".jpg", ".jpeg", ".png", ".tif", ".tiff")
+
+ANALYSES = {
+    "ca": FunctionType.CONTACT_ANGLE,
+    "ift": FunctionType.INTERFACIAL_TENSION,
+}
+
+# screen size the region scaling is computed for when there is no screen
+HEADLESS_SCREEN_RESOLUTION = [1920, 1080]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="opendrop-ml")
+    commands = parser.add_subparsers(dest="command")
+
+    batch = commands.add_parser("batch", help="analyse images without the GUI")
+    batch.add_argument(
+        "analysis",
+        choices=ANALYSES,
+        help="contact angle (ca) or interfacial tension (ift)",
+    )
+    batch.add_argument(
+        "input",
+        help="directory of images or videos, or a glob pattern such as "
+        "'run1/*.png' or 'run1.mp4'",
+    )
+    batch.add_argument(
+        "-o",
+        "--output",
+        help="results file; .csv, .h5 or .parquet (default: a timestamped "
+        "file in the configured output_directory)",
+    )
+    batch.add_argument(
+        "-c",
+        "--config",
+        default=resource_path("user_config.yaml"),
+        help="settings file (default: the bundled user_config.yaml)",
+    )
+    batch.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        help="worker processes, 0 for every CPU core (overrides n_workers)",
+    )
+    batch.add_argument(
+        "--stride",
+        type=int,
+        help="analyse every n-th frame of videos (overrides video_frame_stride)",
+    )
+    batch.add_argument(
+        "--start",
+        type=float,
+        help="seconds into videos to start at (overrides video_start_s)",
+    )
+    batch.add_argument(
+        "--end",
+        type=float,
+        help="seconds into videos to stop at (overrides video_end_s)",
+    )
+    return parser
+
+
+def find_images(pattern: str) -> List[str]:
+    """Image and video files in the directory ``pattern``, or matching the
+    glob"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*")
+    return sorted(
+        path
+        for path in glob.glob(pattern)
+        if os.path.isfile(path)
+        and path.lower().endswith(IMAGE_EXTENSIONS + VIDEO_EXTENSIONS)
+    )
+
+
+def load_setup(config_path: str, files: Sequence[str], overrides=None):
+    """Settings from ``config_path`` for analysing the images and videos in
+    ``files`` without a display; ValueError if they need one.
+    ``overrides`` are settings replacing those of the file."""
+    from opendrop_ml.modules.core.classes import ExperimentalSetup
+
+    user_input_data = ExperimentalSetup()
+    user_input_data.from_yaml(config_path)
+    for name, value in (overrides or {}).items():
+        if value is not None:
+            setattr(user_input_data, name, value)
+    set_import_files(user_input_data, files)
+    user_input_data.screen_resolution = HEADLESS_SCREEN_RESOLUTION
+    # there is nowhere to show the intermediate images
+    user_input_data.original_boole = 0
+    user_input_data.cropped_boole = 0
+    user_input_data.threshold_boole = 0
+
+    manual = [
+        name
+        for name in ("drop_id_method", "needle_region_method", "baseline_method")
+        if getattr(user_input_data, name)
+        in (RegionSelect.USER_SELECTED, ThresholdSelect.USER_SELECTED)
+    ]
+    if manual:
+        raise ValueError(
+            "batch analysis needs Automated " + ", ".join(manual) + f" in {config_path}"
+        )
+    return user_input_data
+
+
+def run_batch(args) -> int:
+    # matplotlib is only used for figures saved to files
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    function_type = ANALYSES[args.analysis]
+
+    files = find_images(args.input)
+    try:
+        user_input_data = load_setup(
+            args.config,
+            files,
+            {
+                "n_workers": args.workers,
+                "video_frame_stride": args.stride,
+                "video_start_s": args.start,
+                "video_end_s": args.end,
+            },
+        )
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    n_frames = user_input_data.number_of_frames
+    if not n_frames:
+        print(f"No images found for {args.input}", file=sys.stderr)
+        return 1
+
+    from opendrop_ml.utils.result_writer import default_output_path
+
+    output_file_path = args.output or default_output_path(
+        function_type, user_input_data
+    )
+    if os.path.dirname(output_file_path):
+        os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+
+    start = time.perf_counter()
+    run = run_ca if function_type == FunctionType.CONTACT_ANGLE else run_ift
+    try:
+        done, lines = run(user_input_data, output_file_path)
+    except Exception as e:
+        # rows of the frames finished before the failure are in the file
+        print(f"\nAnalysis failed: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"\nAnalysed {done} of {n_frames} frames in {elapsed:.1f} s"
+        f"\nResults saved to {output_file_path}"
+    )
+    for line in lines:
+        print(line)
+    return 0 if done == n_frames else 1
+
+
+def run_ca(user_input_data, output_file_path: str):
+    """Frames analysed and summary lines of a contact angle run"""
+    from opendrop_ml.modules.contact_angle.ca_data_processor import (
+        CaDataProcessor,
+        result_columns,
+    )
+    from opendrop_ml.modules.core.classes import DropData
+
+    processor = CaDataProcessor()
+    processor.process_data(
+        DropData(), user_input_data, None, output_file_path=output_file_path
+    )
+    processor.save_result(user_input_data, output_file_path)
+
+    angle_paths = processor.results.angle_paths()
+    names = result_columns(angle_paths)[2:]
+    lines = [
+        summary_line(name, processor.results.column(*path))
+        for name, path in zip(names, angle_paths)
+    ]
+    return len(processor.results), lines
+
+
+def run_ift(user_input_data, output_file_path: str):
+    """Frames analysed and summary lines of an interfacial tension run"""
+    from opendrop_ml.modules.ift.ift_data_processor import (
+        IftDataProcessor,
+        is_result,
+    )
+
+    processor = IftDataProcessor()
+    # drop and needle regions, found in the preparation step of the GUI
+    processor.process_preparation(user_input_data)
+    processor.process_data(user_input_data, output_file_path=output_file_path)
+    processor.save_result(user_input_data, output_file_path)
+
+    results = [r for r in user_input_data.ift_results if is_result(r)]
+    return len(results), [summary_line("IFT (mN/m)", [r[0] for r in results])]
+
+
+def summary_line(name: str, values) -> str:
+    """``name``: mean, min and max of the finite ``values``"""
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return f"{name}: no results"
+    return (
+        f"{name}: mean {values.mean():.2f}, "
+        f"min {values.min():.2f}, max {values.max():.2f}"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "batch":
+        return run_batch(args)
+
+    # the GUI is only imported when it is opened
+    from opendrop_ml import main as gui
+
+    gui.main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
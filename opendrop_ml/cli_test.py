@@ -0,0 +1,106 @@
+from opendrop_ml.cli import find_images, load_setup, summary_line, main
+from opendrop_ml.utils.enums import RegionSelect
+from opendrop_ml.utils.os import resource_path
+
+import numpy as np
+import subprocess
+import pytest
+import cv2
+import sys
+import os
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), "..")
+CA_DIR = os.path.join(os.path.dirname(__file__), "experimental_data_set", "ca")
+
+
+def test_find_images(tmp_path):
+    for name in ["b.png", "a.BMP", "notes.txt"]:
+        (tmp_path / name).write_bytes(b"")
+    (tmp_path / "sub.png").mkdir()
+
+    assert find_images(str(tmp_path)) == [
+        str(tmp_path / "a.BMP"),
+        str(tmp_path / "b.png"),
+    ]
+    assert find_images(str(tmp_path / "b*")) == [str(tmp_path / "b.png")]
+    assert find_images(str(tmp_path / "missing")) == []
+
+
+def test_load_setup_turns_off_display():
+    user_input_data = load_setup(resource_path("user_config.yaml"), ["a.png"])
+
+    assert user_input_data.import_files == ["a.png"]
+    assert user_input_data.number_of_frames == 1
+    assert user_input_data.screen_resolution is not None
+    assert not user_input_data.original_boole
+    assert user_input_data.drop_id_method == RegionSelect.AUTOMATED
+
+
+def test_load_setup_needs_automated_regions(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("drop_id_method: Automated\nbaseline_method: User-selected\n")
+
+    with pytest.raises(ValueError, match="baseline_method"):
+        load_setup(str(config), ["a.png"])
+
+
+def test_load_setup_selects_video_frames(tmp_path):
+    video = str(tmp_path / "drop.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 24))
+    for i in range(10):
+        writer.write(np.full((24, 32, 3), i, np.uint8))
+    writer.release()
+    assert find_images(str(tmp_path)) == [video]
+
+    user_input_data = load_setup(
+        resource_path("user_config.yaml"),
+        [video],
+        {"video_frame_stride": 3, "video_start_s": 0.2, "video_end_s": None},
+    )
+
+    assert user_input_data.import_files == [f"{video}#frame={i}" for i in (2, 5, 8)]
+    assert user_input_data.number_of_frames == 3
+
+
+def test_summary_line():
+    assert summary_line("IFT", [70, float("nan"), 72]) == (
+        "IFT: mean 71.00, min 70.00, max 72.00"
+    )
+    assert summary_line("IFT", []) == "IFT: no results"
+
+
+def test_no_images(tmp_path, capsys):
+    assert main(["batch", "ca", str(tmp_path)]) == 1
+    assert "No images found" in capsys.readouterr().err
+
+
+def test_batch_runs_without_gui_modules(tmp_path):
+    output_file_path = str(tmp_path / "results.csv")
+    pattern = os.path.join(CA_DIR, "20171112JT4_[12].BMP")
+    script = (
+        "import sys\n"
+        "from opendrop_ml.cli import main\n"
+        f"code = main(['batch', 'ca', {pattern!r}, '-o', {output_file_path!r}])\n"
+        "gui = [name for name in sys.modules\n"
+        "       if 'tkinter' in name or name == 'matplotlib.pyplot']\n"
+        "print('GUI MODULES', gui)\n"
+        "sys.exit(code)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "DISPLAY": ""},
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "GUI MODULES []" in result.stdout
+    assert "Analysed 2 of 2 frames" in result.stdout
+    with open(output_file_path) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 3
+    assert [os.path.basename(line.split(",")[0]) for line in lines[1:]] == [
+        "20171112JT4_1.BMP",
+        "20171112JT4_2.BMP",
+    ]
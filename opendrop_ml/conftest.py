@@ -0,0 +1,15 @@
+from opendrop_ml.modules.fitting import BA_library
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def profile_library_in_tmp_path(tmp_path_factory):
+    """Keep the Bashforth-Adams profile library built by the tests out of the
+    home directory; it is built once per session and reloaded from there"""
+    path = str(tmp_path_factory.mktemp("cache") / "ba_profiles.npz")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(BA_library, "library_path", lambda: path)
+        BA_library.clear_profile_library()
+        yield
+    BA_library.clear_profile_library()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""Process-wide cache for the Conan-ML SavedModel.
+
+Loading the SavedModel takes far longer than running it, so the model and its
+``serving_default`` signature are deserialised once per process and kept warm
+across frames, batches and GUI sessions. ``evict_if_memory_low`` can be used to
+drop the cached model again when the machine runs short of memory.
+"""
+
+from opendrop_ml.utils.os import resource_path
+
+from typing import Callable, Dict, Optional
+import os
+import threading
+
+DEFAULT_MODEL_PATH = "modules/ML_model/"
+SERVING_SIGNATURE = "serving_default"
+
+_lock = threading.Lock()
+_models: Dict[str, object] = {}
+_signatures: Dict[str, Callable] = {}
+
+
+def _resolve_path(model_path: Optional[str]) -> str:
+    if model_path is None:
+        model_path = resource_path(DEFAULT_MODEL_PATH)
+    return os.path.normpath(os.path.abspath(model_path))
+
+
+def _load_saved_model(model_path: str):
+    import tensorflow as tf
+
+    tf.compat.v1.logging.set_verbosity(
+        tf.compat.v1.logging.ERROR
+    )  # to minimise tf warnings
+    return tf.keras.models.load_model(model_path)
+
+
+def get_model(model_path: Optional[str] = None):
+    """Return the cached Conan-ML model, loading it on first use.
+
+    Args:
+        model_path: Directory of the SavedModel. Defaults to the bundled model.
+
+    Returns:
+        The loaded Keras model.
+    """
+    path = _resolve_path(model_path)
+    with _lock:
+        model = _models.get(path)
+        if model is None:
+            model = _load_saved_model(path)
+            _models[path] = model
+            _signatures[path] = model.signatures[SERVING_SIGNATURE]
+        return model
+
+
+def get_serving_function(model_path: Optional[str] = None) -> Callable:
+    """Return the resolved ``serving_default`` signature of the cached model."""
+    path = _resolve_path(model_path)
+    get_model(path)
+    with _lock:
+        return _signatures[path]
+
+
+def serving_function_for(model) -> Callable:
+    """Return the ``serving_default`` signature for an already loaded model.
+
+    Models obtained through ``get_model`` reuse the signature resolved at load
+    time; any other model falls back to a lookup on ``model.signatures``.
+    """
+    with _lock:
+        for path, cached in _models.items():
+            if cached is model:
+                return _signatures[path]
+    return model.signatures[SERVING_SIGNATURE]
+
+
+def is_model_loaded(model_path: Optional[str] = None) -> bool:
+    with _lock:
+        return _resolve_path(model_path) in _models
+
+
+def clear_model_cache(model_path: Optional[str] = None) -> None:
+    """Drop one cached model, or every cached model if no path is given."""
+    with _lock:
+        if model_path is None:
+            _models.clear()
+            _signatures.clear()
+        else:
+            path = _resolve_path(model_path)
+            _models.pop(path, None)
+            _signatures.pop(path, None)
+
+
+def available_memory_mb() -> Optional[float]:
+    """Return the available system memory in MB, or None if it is unknown."""
+    try:
+        import psutil
+
+        return psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        pages = os.sysconf("SC_AVPHYS_PAGES")
+        page_size = os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+    return pages * page_size / (1024 * 1024)
+
+
+def evict_if_memory_low(min_available_mb: Optional[float]) -> bool:
+    """Clear the model cache if available memory is below ``min_available_mb``.
+
+    Args:
+        min_available_mb: Threshold in MB. ``None`` disables eviction.
+
+    Returns:
+        True if the cache was cleared.
+    """
+    if min_available_mb is None:
+        return False
+    available = available_memory_mb()
+    if available is None or available >= min_available_mb:
+        return False
+    clear_model_cache()
+    return True
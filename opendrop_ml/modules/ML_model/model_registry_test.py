@@ -0,0 +1,65 @@
+from opendrop_ml.modules.ML_model import model_registry
+
+from unittest.mock import MagicMock
+import pytest
+
+
+@pytest.fixture
+def fake_loader(monkeypatch):
+    """Replace the TensorFlow loader with a counting fake"""
+    loads = []
+
+    def _load(path):
+        model = MagicMock()
+        model.signatures = {"serving_default": MagicMock(name="serving_fn")}
+        loads.append(path)
+        return model
+
+    monkeypatch.setattr(model_registry, "_load_saved_model", _load)
+    model_registry.clear_model_cache()
+    yield loads
+    model_registry.clear_model_cache()
+
+
+def test_model_loaded_once_per_path(fake_loader, tmp_path):
+    first = model_registry.get_model(str(tmp_path))
+    second = model_registry.get_model(str(tmp_path))
+
+    assert first is second
+    assert len(fake_loader) == 1
+    assert model_registry.is_model_loaded(str(tmp_path))
+
+
+def test_serving_function_resolved_at_load(fake_loader, tmp_path):
+    model = model_registry.get_model(str(tmp_path))
+    serving_fn = model_registry.get_serving_function(str(tmp_path))
+
+    assert serving_fn is model.signatures["serving_default"]
+    assert model_registry.serving_function_for(model) is serving_fn
+
+
+def test_serving_function_for_uncached_model():
+    model = MagicMock()
+    model.signatures = {"serving_default": "fn"}
+    assert model_registry.serving_function_for(model) == "fn"
+
+
+def test_clear_model_cache_forces_reload(fake_loader, tmp_path):
+    model_registry.get_model(str(tmp_path))
+    model_registry.clear_model_cache(str(tmp_path))
+
+    assert not model_registry.is_model_loaded(str(tmp_path))
+    model_registry.get_model(str(tmp_path))
+    assert len(fake_loader) == 2
+
+
+def test_evict_if_memory_low(fake_loader, tmp_path, monkeypatch):
+    model_registry.get_model(str(tmp_path))
+
+    assert model_registry.evict_if_memory_low(None) is False
+    monkeypatch.setattr(model_registry, "available_memory_mb", lambda: 4096.0)
+    assert model_registry.evict_if_memory_low(1024) is False
+    assert model_registry.is_model_loaded(str(tmp_path))
+
+    assert model_registry.evict_if_memory_low(8192) is True
+    assert not model_registry.is_model_loaded(str(tmp_path))
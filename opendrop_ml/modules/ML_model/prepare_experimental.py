@@ -1,20 +1,24 @@
 #!/usr/bin/env python
 # coding=utf-8
 
+from opendrop_ml.modules.ML_model.model_registry import get_model, serving_function_for
 from opendrop_ml.utils.config import CV2_VERSION
+from opendrop_ml.utils.contour import cluster_optics, optimized_path, unique_points
+from opendrop_ml.utils.profiling import timed
+from opendrop_ml.utils.lazy import lazy_import
 
-from scipy import misc, ndimage  # for tilt_correction
-from sklearn.cluster import OPTICS  # for clustering algorithm
+from scipy import ndimage  # for tilt_correction
 from typing import List
-import matplotlib.pyplot as plt
 import numpy as np
 import cv2
-import tensorflow as tf
 import math  # for tilt_correction
 import time  # for recording timings
 import io  # for saving to memory
 import os
 
+plt = lazy_import("matplotlib.pyplot")
+tf = lazy_import("tensorflow")
+
 
 def auto_crop(
     img: np.ndarray, low=50, high=150, apertureSize=3, verbose=0
@@ -315,114 +319,12 @@ def find_intersection(baseline_coeffs, circ_params):
     return x_t, y_t
 
 
-def cluster_optics(sample, out_style="coords", xi=None, eps=None, verbose=0):
-    """Takes an array (or list) of the form [[x1,y1],[x2,y2],...,[xn,yn]].
-    Clusters are outputted in the form of a dictionary.
-
-    If out_style='coords' each dictionary entry is a group, and points are outputted in coordinate form.
-    If out_xy='xy' there are two dictionary entries for each group, one labeled as nx and one as ny
-    (where n is the label of the group)
-
-    If xi (float between 0 and 1) is not None and eps is None, then the xi clustering method is used.
-    The optics algorithm defines clusters based on the minimum steepness on the reachability plot.
-    For example, an upwards point in the reachability plot is defined by the ratio from one point to
-    its successor being at most 1-xi.
-
-    If eps (float) is not None and xi is None, then the dbscan clustering method is used. Where eps is the
-    maximum distance between two samples for one to be considered as in the neighborhood of the other.
-
-    https://stackoverflow.com/questions/47974874/algorithm-for-grouping-points-in-given-distance
-    https://scikit-learn.org/stable/modules/generated/sklearn.cluster.OPTICS.html
-    """
-    if eps != None and xi == None:
-        clustering = OPTICS(min_samples=2, cluster_method="dbscan", eps=eps).fit(
-            sample
-        )  # cluster_method changed to dbscan (so eps can be set)
-    elif xi != None and eps == None:
-        # original had xi = 0.05, xi as 0.1 in function input
-        clustering = OPTICS(min_samples=2, xi=xi).fit(sample)
-    else:
-        raise "Error: only one of eps and xi can be chosen but not neither nor both"
-    groups = list(set(clustering.labels_))
-
-    if verbose == 2:
-        print(clustering.labels_)
-    elif verbose == 1:
-        print(groups)
-
-    dic = {}
-    for n in groups:
-        if n not in dic:
-            dic[n] = []
-        for i in range(len(sample)):
-            if clustering.labels_[i] == n:
-                dic[n].append(sample[i])
-
-    # separate points and graph
-    dic2 = {}
-    for k in dic.keys():
-        x = []
-        y = []
-        for i in range(len(dic[k])):
-            x.append(dic[k][i][0])
-        dic2[str(k) + "x"] = x
-        for i in range(len(dic[k])):
-            y.append(dic[k][i][1])
-        dic2[str(k) + "y"] = y
-
-    if out_style == "coords":
-        return dic
-    elif out_style == "xy":
-        return dic2
-
-
 def distance1(p1, p2):
     """This function computes the distance between 2 points defined by
     P1 = (x1,y1) and P2 = (x2,y2)"""
     return ((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2) ** 0.5
 
 
-def optimized_path_new(coords, start=None):
-    """This function finds the nearest point to a point
-    coords should be a list in this format coords = [ [x1, y1], [x2, y2] , ...]
-    https://stackoverflow.com/questions/45829155/sort-points-in-order-to-have-a-continuous-curve-using-python
-    """
-    if isinstance(coords, list) == False:
-        coords = coords.tolist()
-    if 0:
-        if isinstance(start, list) == False:
-            try:
-                start = start.tolist()
-            except:
-                start = list(start)
-    if start is None:
-        start = coords[0]
-    pass_by = coords
-    path = [start]
-    pass_by.remove(start)
-    while pass_by:
-        nearest = min(pass_by, key=lambda x: distance1(path[-1], x))
-        path.append(nearest)
-        pass_by.remove(nearest)
-    path = np.array(path)
-
-    # if there are any large jumps in distance, there is likely a mistake
-    # therefore, the points after this jump should be ignored
-    if 1:
-        dists = []
-        for i, point in enumerate(path):
-            if i < len(path) - 1:
-                dists.append(distance1(path[i], path[i + 1]))
-        jump_idx = []
-        for i, dist in enumerate(dists):
-            if dist > 5:
-                jump_idx.append(i)
-        if len(jump_idx) > 0:
-            path = path[: jump_idx[0]]
-
-    return path
-
-
 def prepare_hydrophobic_new(coords, xi=0.8, display=False):
     """takes an array (n,2) of coordinate points, and returns the left and right halfdrops of the contour.
     xi determines the minimum steepness on the reachability plot that constitutes a cluster boundary of the
@@ -1024,32 +926,6 @@ def prepare_hydrophobic_new(coords, xi=0.8, display=False):
     return profile, CPs
 
 
-def optimized_path(coords, start=None):
-    """This function finds the nearest point to a point
-    coords should be a list in this format coords = [ [x1, y1], [x2, y2] , ...]
-    https://stackoverflow.com/questions/45829155/sort-points-in-order-to-have-a-continuous-curve-using-python
-    """
-    if isinstance(coords, list) == False:
-        coords = coords.tolist()
-    if 0:
-        if isinstance(start, list) == False:
-            try:
-                start = start.tolist()
-            except:
-                start = list(start)
-    if start is None:
-        start = coords[0]
-    pass_by = coords
-    path = [start]
-    pass_by.remove(start)
-    while pass_by:
-        nearest = min(pass_by, key=lambda x: distance1(path[-1], x))
-        path.append(nearest)
-        pass_by.remove(nearest)
-    path = np.array(path)
-    return path
-
-
 def prepare_hydrophobic(coords, xi=0.8, display=False):
     """takes an array (n,2) of coordinate points, and returns the left and right halfdrops of the contour.
     xi determines the minimum steepness on the reachability plot that constitutes a cluster boundary of the
@@ -1728,11 +1604,7 @@ def extract_edges_CV(img: np.ndarray) -> np.array:
         )
         drop_profile = drop_profile[mask]
 
-    output = []
-    for coord in drop_profile:
-        if list(coord) not in output:
-            output.append(list(coord))
-    output = np.array(output)
+    output = unique_points(drop_profile)
     return output
 
 
@@ -2128,6 +2000,7 @@ def prepare4model_v03_img(
     return pred_ds
 
 
+@timed("ML preprocessing")
 def prepare4model_v03(coords, input_len=1223, right_only=False, display=False):
     """Take the contour of the whole drop, and chop it into left and right sides ready for model input"""
     coords[:, 1] = -coords[:, 1]  # flip image coords to cartesian coords
@@ -2255,9 +2128,7 @@ def experimental_pred(pred_ds, model, side="both", cluster=True, display=False):
 
         # Use signatures approach instead of predict
         input_tensor = tf.convert_to_tensor(input_left)
-        prediction_left = model.signatures["serving_default"](
-            **{"conv1d_input": input_tensor}
-        )
+        prediction_left = serving_function_for(model)(**{"conv1d_input": input_tensor})
         # Extract from result dictionary if needed
         if isinstance(prediction_left, dict):
             prediction_left = list(prediction_left.values())[0]
@@ -2286,9 +2157,7 @@ def experimental_pred(pred_ds, model, side="both", cluster=True, display=False):
 
         # Use signatures approach instead of predict
         input_tensor = tf.convert_to_tensor(input_right)
-        prediction_right = model.signatures["serving_default"](
-            **{"conv1d_input": input_tensor}
-        )
+        prediction_right = serving_function_for(model)(**{"conv1d_input": input_tensor})
         # Extract from result dictionary if needed
         if isinstance(prediction_right, dict):
             prediction_right = list(prediction_right.values())[0]
@@ -2317,9 +2186,7 @@ def experimental_pred(pred_ds, model, side="both", cluster=True, display=False):
 
         # Use signatures approach instead of predict
         input_tensor = tf.convert_to_tensor(pred_ds_float32)
-        predictions = model.signatures["serving_default"](
-            **{"conv1d_input": input_tensor}
-        )
+        predictions = serving_function_for(model)(**{"conv1d_input": input_tensor})
         # Extract from result dictionary if needed
         if isinstance(predictions, dict):
             predictions = list(predictions.values())[0]
@@ -2346,6 +2213,55 @@ def experimental_pred(pred_ds, model, side="both", cluster=True, display=False):
         return predictions, timings
 
 
+def experimental_pred_batch(pred_ds_list, model, batch_size=64):
+    """Predict left and right contact angles for several frames at once.
+
+    The (2, input_len, 2) inputs produced by prepare4model_v03 for each frame
+    are stacked into a single (2N, input_len, 2) float32 tensor and passed to
+    the serving signature in chunks of at most ``batch_size`` frames, so the
+    per-call TensorFlow overhead is paid once per chunk instead of per frame.
+
+    Args:
+        pred_ds_list: List of N model inputs from prepare4model_v03.
+        model: Loaded Conan-ML model.
+        batch_size: Maximum number of frames per serving call.
+
+    Returns:
+        Tuple of an (N, 2) array of [left, right] angles clipped to [0, 180]
+        and a timings dict with the per-frame share of the batch time.
+    """
+    start_time = time.time()
+
+    n_frames = len(pred_ds_list)
+    stacked = np.concatenate(
+        [np.asarray(pred_ds, dtype=np.float32) for pred_ds in pred_ds_list], axis=0
+    )
+    serving_fn = serving_function_for(model)
+    rows_per_call = 2 * max(1, int(batch_size))
+
+    ML_prediction_start_time = time.time()
+    outputs = []
+    for start in range(0, stacked.shape[0], rows_per_call):
+        input_tensor = tf.convert_to_tensor(stacked[start : start + rows_per_call])
+        predictions = serving_fn(**{"conv1d_input": input_tensor})
+        if isinstance(predictions, dict):
+            predictions = list(predictions.values())[0]
+        if hasattr(predictions, "numpy"):
+            predictions = predictions.numpy()
+        outputs.append(np.asarray(predictions).reshape(-1))
+    ML_prediction_time = time.time() - ML_prediction_start_time
+
+    predictions = np.clip(np.concatenate(outputs), 0, 180).reshape(n_frames, 2)
+    analysis_time = time.time() - start_time
+
+    timings = {}
+    timings["fit time"] = ML_prediction_time / n_frames
+    timings["analysis time"] = analysis_time / n_frames
+    timings["batch size"] = n_frames
+
+    return predictions, timings
+
+
 def experimental_prediction(
     image: np.ndarray, side="both", cluster=True, display=False
 ):
@@ -2357,7 +2273,7 @@ def experimental_prediction(
     start_time = time.time()
 
     model_path = os.path.dirname(__file__)
-    model = tf.keras.models.load_model(model_path)
+    model = get_model(model_path)
 
     if side == "left":
         preprocessing_start_time = time.time()
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("tensorflow")
+
+from opendrop_ml.modules.ML_model.prepare_experimental import (  # noqa: E402
+    experimental_pred_batch,
+)
+
+
+class FakeModel:
+    """Stands in for the SavedModel, predicting the mean x of each contour"""
+
+    def __init__(self):
+        self.calls = []
+        self.signatures = {"serving_default": self._serve}
+
+    def _serve(self, conv1d_input):
+        inputs = conv1d_input.numpy()
+        self.calls.append(inputs.shape)
+        return {"dense": inputs[:, :, 0].mean(axis=1, keepdims=True)}
+
+
+def _frame(left, right, input_len=1223):
+    pred_ds = np.zeros((2, input_len, 2))
+    pred_ds[0, :, 0] = left
+    pred_ds[1, :, 0] = right
+    return pred_ds
+
+
+def test_experimental_pred_batch_scatters_left_right():
+    model = FakeModel()
+    frames = [_frame(10, 20), _frame(30, 40), _frame(250, -5)]
+
+    predictions, timings = experimental_pred_batch(frames, model, batch_size=2)
+
+    assert predictions.shape == (3, 2)
+    np.testing.assert_allclose(predictions, [[10, 20], [30, 40], [180, 0]])
+    assert model.calls == [(4, 1223, 2), (2, 1223, 2)]
+    assert timings["batch size"] == 3
@@ -1,5 +1,6 @@
 from opendrop_ml.modules.core.classes import ExperimentalDrop, ExperimentalSetup, DropData
 from opendrop_ml.modules.image.read_image import get_image
+from opendrop_ml.modules.image.video import frame_time
 from opendrop_ml.modules.image.select_regions import (
     set_drop_region,
     set_surface_line,
@@ -7,158 +8,416 @@ from opendrop_ml.modules.image.select_regions import (
     # run_set_surface_line
 )
 from opendrop_ml.modules.contact_angle.extract_profile import extract_drop_profile
+from opendrop_ml.modules.contact_angle.result_store import ResultStore
 from opendrop_ml.modules.fitting.fits import perform_fits
-from opendrop_ml.utils.enums import FittingMethod, ThresholdSelect
+from opendrop_ml.modules.fitting.warm_start import get_warm_starts
+from opendrop_ml.modules.preprocessing.preprocessing import (
+    DropRegionTracker,
+    get_drop_region_tracker,
+)
+from opendrop_ml.utils.enums import FittingMethod, RegionSelect, ThresholdSelect
 from opendrop_ml.utils.config import LEFT_ANGLE, RIGHT_ANGLE
-from opendrop_ml.utils.os import resource_path
+from opendrop_ml.utils.parallel import (
+    resolve_n_workers,
+    chunksize_for,
+    create_process_pool,
+)
+from opendrop_ml.modules.ML_model.model_registry import (
+    get_model,
+    evict_if_memory_low,
+)
+from opendrop_ml.utils.profiling import StageProfiler, get_profiler
+from opendrop_ml.utils.result_writer import ResultWriter, open_result_writer
 
-from typing import Callable, Dict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 import numpy as np
-import timeit
-import copy
+import threading
+import os
+
+
+def can_process_in_parallel(user_input_data: ExperimentalSetup) -> bool:
+    """Whether frames are independent enough to be farmed out to workers.
+
+    User-selected regions and baselines and the debug image windows all need
+    the display, and cameras have to be read in order, so those runs stay on
+    the serial path.
+    """
+    return user_input_data.image_source == "Local images" and can_run_in_background(
+        user_input_data
+    )
+
+
+def can_run_in_background(user_input_data: ExperimentalSetup) -> bool:
+    """Whether the analysis can run off the GUI thread, i.e. needs no
+    region selection or debug windows"""
+    return (
+        user_input_data.drop_id_method == RegionSelect.AUTOMATED
+        and user_input_data.baseline_method == ThresholdSelect.AUTOMATED
+        and not user_input_data.original_boole
+        and not user_input_data.cropped_boole
+        and not user_input_data.threshold_boole
+    )
+
+
+def analyse_frame(user_input_data: ExperimentalSetup, i: int) -> ExperimentalDrop:
+    """Run the contact-angle pipeline for frame ``i``.
+
+    Every selected fit except the ML model is performed here. The ML model is
+    left to the caller so that predictions can be batched across frames.
+    Stage timings are recorded against frame ``i``.
+    """
+    with get_profiler().frame(i):
+        return _analyse_frame(user_input_data, i)
+
+
+def _analyse_frame(user_input_data: ExperimentalSetup, i: int) -> ExperimentalDrop:
+    analysis_methods: Dict[FittingMethod, bool] = dict(
+        user_input_data.analysis_methods_ca
+    )
+    n_frames: int = user_input_data.number_of_frames
+    warm_starts = get_warm_starts() if user_input_data.warm_start_fits else None
+
+    print(f"\nProcessing frame {i+1} of {n_frames}...")
+    input_file = user_input_data.import_files[i]
+    print(f"\nProcessing {input_file}")
+    raw_experiment = ExperimentalDrop()
+
+    # save image in here...
+    get_image(raw_experiment, user_input_data, i)
+    set_drop_region(raw_experiment, user_input_data, i + 1)
+    # extract_drop_profile(raw_experiment, user_input_data)
+    extract_drop_profile(raw_experiment, user_input_data)
+
+    # fits performed here if baseline_method is User-selected
+    set_surface_line(raw_experiment, user_input_data)
+
+    # these methods don't need tilt correction
+    if user_input_data.baseline_method == ThresholdSelect.AUTOMATED:
+        if (
+            analysis_methods[FittingMethod.TANGENT_FIT]
+            or analysis_methods[FittingMethod.POLYNOMIAL_FIT]
+            or analysis_methods[FittingMethod.CIRCLE_FIT]
+            or analysis_methods[FittingMethod.ELLIPSE_FIT]
+        ):
+            perform_fits(
+                raw_experiment,
+                tangent=analysis_methods[FittingMethod.TANGENT_FIT],
+                polynomial=analysis_methods[FittingMethod.POLYNOMIAL_FIT],
+                circle=analysis_methods[FittingMethod.CIRCLE_FIT],
+                ellipse=analysis_methods[FittingMethod.ELLIPSE_FIT],
+                warm_starts=warm_starts,
+            )
+
+    # YL fit and ML model need tilt correction
+    if (
+        analysis_methods[FittingMethod.ML_MODEL]
+        or analysis_methods[FittingMethod.YL_FIT]
+    ):
+        correct_tilt(raw_experiment, user_input_data)
+        automated = user_input_data.baseline_method == ThresholdSelect.AUTOMATED
+        # a profile rotated in contour space is already level
+        if not (automated and user_input_data.contour_tilt_correction):
+            extract_drop_profile(raw_experiment, user_input_data)
+            if automated:
+                set_surface_line(raw_experiment, user_input_data)
+        # experimental_setup.baseline_method == 'User-selected' should work as is
+
+        if analysis_methods[FittingMethod.YL_FIT]:
+            print("Performing YL fit...")
+            perform_fits(
+                raw_experiment,
+                yl=analysis_methods[FittingMethod.YL_FIT],
+                warm_starts=warm_starts,
+            )
+
+    return raw_experiment
+
+
+_worker_setup: Optional[ExperimentalSetup] = None
+
+
+def _init_worker(
+    user_input_data: ExperimentalSetup, drop_tracker: DropRegionTracker
+) -> None:
+    # the setup is sent once per worker instead of once per frame
+    global _worker_setup
+    _worker_setup = user_input_data
+    # workers start tracking from the drop region of the first frame
+    get_drop_region_tracker().copy_from(drop_tracker)
+
+
+def release_frame_images(raw_experiment: ExperimentalDrop) -> None:
+    """Drop what is only needed while a frame is analysed, the full frame and
+    its uncropped contour, keeping the cropped image and the drop profile"""
+    raw_experiment.image = None
+    raw_experiment.contour = None
+
+
+def _analyse_frame_in_worker(i: int) -> Tuple[ExperimentalDrop, List[Dict]]:
+    raw_experiment = analyse_frame(_worker_setup, i)
+    # the full frame is not needed by the caller, only the cropped image
+    raw_experiment.image = None
+    return raw_experiment, get_profiler().drain()
+
+
+def _analyse_frames_in_worker(
+    indices: range,
+) -> List[Tuple[ExperimentalDrop, List[Dict]]]:
+    return [_analyse_frame_in_worker(i) for i in indices]
 
-# import os
+
+def result_columns(angle_paths: List[Tuple]) -> List[str]:
+    """Column names of the saved results for the given angle paths"""
+    return ["Filename", "Time (s)"] + [
+        method + " " + key for method, key in angle_paths
+    ]
+
+
+def enabled_angle_paths(analysis_methods: Dict[FittingMethod, bool]) -> List[Tuple]:
+    """``(method, key)`` paths of the angles the enabled methods give, in
+    the order they are fitted"""
+    return [
+        (method, key)
+        for method, enabled in analysis_methods.items()
+        if enabled
+        for key in (LEFT_ANGLE, RIGHT_ANGLE)
+    ]
 
 
 class CaDataProcessor:
+    def __init__(self):
+        # kept across runs so views can hold on to it
+        self.results = ResultStore()
+        # file the last run's rows were written to as its frames finished
+        self.streamed_path: Optional[str] = None
+        self._writer: Optional[ResultWriter] = None
+        # whether the last run was stopped before its last frame
+        self.cancelled = False
+        self._cancel: Optional[threading.Event] = None
+
     def process_data(
         self,
         fitted_drop_data: DropData,
         user_input_data: ExperimentalSetup,
         callback: Callable,
+        output_file_path: Optional[str] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> None:
+        """Analyse every frame, writing each frame's row to
+        ``output_file_path`` as soon as it is finished if given.
+
+        Setting ``cancel`` stops the run between frames; the frames finished
+        by then are kept.
+        """
+        self.streamed_path = output_file_path
+        self.cancelled = False
+        self._cancel = cancel
+        self._setup = user_input_data
+        try:
+            self._process_frames(user_input_data, callback)
+        finally:
+            # rows of the frames done so far are kept if the run fails
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def _process_frames(
+        self, user_input_data: ExperimentalSetup, callback: Callable
     ) -> None:
 
         analysis_methods: Dict[FittingMethod, bool] = dict(
             user_input_data.analysis_methods_ca
         )
+
+        bounded_memory = user_input_data.bounded_memory
+        self.results.reset(
+            user_input_data.number_of_frames,
+            keep_arrays=not (user_input_data.drop_result_arrays or bounded_memory),
+        )
+        profiler = get_profiler()
+        profiler.clear()
+        # frames of an earlier run say nothing about where this drop is
+        get_drop_region_tracker().reset()
+        get_warm_starts().reset()
+
+        # frames per ML model call; 1 predicts every frame on its own
+        ml_batch_size: int = max(1, int(user_input_data.ml_batch_size or 1))
+        ml_pending = []
+
+        for i, raw_experiment in self._iter_frames(user_input_data):
+            if bounded_memory:
+                # frames waiting for the ML model hold no full images
+                release_frame_images(raw_experiment)
+            if analysis_methods[FittingMethod.ML_MODEL]:
+                from opendrop_ml.modules.ML_model.prepare_experimental import (
+                    prepare4model_v03,
+                )
+
+                # ML predictions are deferred and run for several frames
+                # at once; the frame is finished when its batch is flushed
+                with profiler.frame(i):
+                    pred_ds = prepare4model_v03(raw_experiment.drop_contour)
+                ml_pending.append((i, raw_experiment, pred_ds))
+                if len(ml_pending) >= ml_batch_size:
+                    self._flush_ml_batch(ml_pending, callback)
+                    ml_pending = []
+                continue
+
+            self._finish_frame(i, raw_experiment, callback)
+
+        if ml_pending:
+            self._flush_ml_batch(ml_pending, callback)
+
+        # the model stays warm for the next batch unless memory is short
+        evict_if_memory_low(user_input_data.ml_model_min_free_mb)
+
+        self.stage_timings = profiler.records()
+        if user_input_data.save_timings_boole:
+            profiler.print_summary()
+
+    def _iter_frames(
+        self, user_input_data: ExperimentalSetup
+    ) -> Iterator[Tuple[int, ExperimentalDrop]]:
+        """Yield ``(index, drop)`` for every frame, in frame order."""
         n_frames: int = user_input_data.number_of_frames
+        n_workers = resolve_n_workers(user_input_data.n_workers, n_frames)
 
-        self.results = []
+        if (
+            n_workers <= 1
+            or n_frames <= 1
+            or not can_process_in_parallel(user_input_data)
+        ):
+            for i in range(n_frames):
+                if self._cancel_requested():
+                    return
+                yield i, analyse_frame(user_input_data, i)
+            return
 
-        for i in range(n_frames):
-            print(f"\nProcessing frame {i+1} of {n_frames}...")
-            input_file = user_input_data.import_files[i]
-            print(f"\nProcessing {input_file}")
-            time_start = timeit.default_timer()
-            raw_experiment = ExperimentalDrop()
+        # the first frame runs here so its side effects on the setup
+        # (e.g. the output time stamp) land in this process
+        yield 0, analyse_frame(user_input_data, 0)
+        if self._cancel_requested():
+            return
 
-            # save image in here...
-            get_image(raw_experiment, user_input_data, i)
-            set_drop_region(raw_experiment, user_input_data, i + 1)
-            # extract_drop_profile(raw_experiment, user_input_data)
-            extract_drop_profile(raw_experiment, user_input_data)
+        print(f"\nProcessing frames 2 to {n_frames} on {n_workers} workers...")
+        with create_process_pool(
+            n_workers,
+            initializer=_init_worker,
+            initargs=(user_input_data, get_drop_region_tracker()),
+        ) as executor:
+            chunksize = chunksize_for(n_frames - 1, n_workers)
+            futures = [
+                executor.submit(
+                    _analyse_frames_in_worker,
+                    range(start, min(start + chunksize, n_frames)),
+                )
+                for start in range(1, n_frames, chunksize)
+            ]
+            try:
+                i = 1
+                for future in futures:
+                    for raw_experiment, stage_timings in future.result():
+                        get_profiler().extend(stage_timings)
+                        yield i, raw_experiment
+                        i += 1
+                        if self._cancel_requested():
+                            return
+            finally:
+                # chunks not started yet are dropped when the run stops
+                # early; those already running on the workers are waited
+                # for and discarded
+                for future in futures:
+                    future.cancel()
 
-            # result_queue = Queue()
-            # p = Process(target=run_set_surface_line, args=(raw_experiment, user_input_data,result_queue))
-            # fits performed here if baseline_method is User-selected
-            set_surface_line(raw_experiment, user_input_data)
-            # p.start()
-            # p.join()
-
-            # Retrieve result
-            # raw_experiment.contact_angles = result_queue.get()
-            # these methods don't need tilt correction
-            if user_input_data.baseline_method == ThresholdSelect.AUTOMATED:
-                if (
-                    analysis_methods[FittingMethod.TANGENT_FIT]
-                    or analysis_methods[FittingMethod.POLYNOMIAL_FIT]
-                    or analysis_methods[FittingMethod.CIRCLE_FIT]
-                    or analysis_methods[FittingMethod.ELLIPSE_FIT]
-                ):
-                    perform_fits(
-                        raw_experiment,
-                        tangent=analysis_methods[FittingMethod.TANGENT_FIT],
-                        polynomial=analysis_methods[FittingMethod.POLYNOMIAL_FIT],
-                        circle=analysis_methods[FittingMethod.CIRCLE_FIT],
-                        ellipse=analysis_methods[FittingMethod.ELLIPSE_FIT],
-                    )
-
-            # YL fit and ML model need tilt correction
-            if (
-                analysis_methods[FittingMethod.ML_MODEL]
-                or analysis_methods[FittingMethod.YL_FIT]
-            ):
-                correct_tilt(raw_experiment, user_input_data)
-                extract_drop_profile(raw_experiment, user_input_data)
-                if user_input_data.baseline_method == ThresholdSelect.AUTOMATED:
-                    set_surface_line(raw_experiment, user_input_data)
-                # experimental_setup.baseline_method == 'User-selected' should work as is
-
-                # raw_experiment.contour = extract_edges_CV(raw_experiment.cropped_image, threshold_val=raw_experiment.ret, return_thresholed_value=False)
-                # experimental_drop.drop_contour, experimental_drop.contact_points = prepare_hydrophobic(experimental_drop.contour)
-
-                if analysis_methods[FittingMethod.YL_FIT]:
-                    print("Performing YL fit...")
-                    perform_fits(
-                        raw_experiment, yl=analysis_methods[FittingMethod.YL_FIT]
-                    )
-                if analysis_methods[FittingMethod.ML_MODEL]:
-
-                    from opendrop_ml.modules.ML_model.prepare_experimental import (
-                        prepare4model_v03,
-                        experimental_pred,
-                    )
-                    import tensorflow as tf
-
-                    tf.compat.v1.logging.set_verbosity(
-                        tf.compat.v1.logging.ERROR
-                    )  # to minimise tf warnings
-                    model_path = resource_path("modules/ML_model/")
-                    model = tf.keras.models.load_model(model_path)
+    def _cancel_requested(self) -> bool:
+        if self._cancel is None or not self._cancel.is_set():
+            return False
+        if not self.cancelled:
+            print("\nAnalysis cancelled")
+        self.cancelled = True
+        return True
 
-                    pred_ds = prepare4model_v03(raw_experiment.drop_contour)
-                    ML_predictions, timings = experimental_pred(pred_ds, model)
-                    raw_experiment.contact_angles[FittingMethod.ML_MODEL] = {}
-                    # raw_experiment.contact_angles[ML_MODEL]['angles'] = [ML_predictions[0,0],ML_predictions[1,0]]
-                    raw_experiment.contact_angles[FittingMethod.ML_MODEL][
-                        LEFT_ANGLE
-                    ] = ML_predictions[0, 0]
-                    raw_experiment.contact_angles[FittingMethod.ML_MODEL][
-                        RIGHT_ANGLE
-                    ] = ML_predictions[1, 0]
-                    raw_experiment.contact_angles[FittingMethod.ML_MODEL][
-                        "timings"
-                    ] = timings
-
-            self.results.append(copy.deepcopy(raw_experiment.contact_angles))
-
-            print("Extracted outputs:")
-            for key1 in raw_experiment.contact_angles.keys():
-                for key2 in raw_experiment.contact_angles[key1].keys():
-                    print(key1 + " " + key2 + ": ")
-                    print("    ", raw_experiment.contact_angles[key1][key2])
-                    print()
-
-            if callback:
-                callback(i + 1, raw_experiment)
+    def _flush_ml_batch(self, ml_pending: List[Tuple], callback: Callable) -> None:
+        from opendrop_ml.modules.ML_model.prepare_experimental import (
+            experimental_pred_batch,
+        )
+
+        # cached per process, only the first batch pays for loading
+        model = get_model()
+
+        with get_profiler().stage("ML prediction"):
+            ML_predictions, timings = experimental_pred_batch(
+                [pred_ds for _, _, pred_ds in ml_pending], model
+            )
+        for (i, raw_experiment, _), (left, right) in zip(ml_pending, ML_predictions):
+            raw_experiment.contact_angles[FittingMethod.ML_MODEL] = {}
+            raw_experiment.contact_angles[FittingMethod.ML_MODEL][LEFT_ANGLE] = left
+            raw_experiment.contact_angles[FittingMethod.ML_MODEL][RIGHT_ANGLE] = right
+            raw_experiment.contact_angles[FittingMethod.ML_MODEL]["timings"] = dict(
+                timings
+            )
+            self._finish_frame(i, raw_experiment, callback)
+
+    def _finish_frame(
+        self, i: int, raw_experiment: ExperimentalDrop, callback: Callable
+    ) -> None:
+        self.results.add(i, raw_experiment.contact_angles)
+        if raw_experiment.frame_time is not None:
+            # frames decoded in workers bring their timestamps back
+            self._setup.frame_times[i] = raw_experiment.frame_time
+        if self.streamed_path:
+            self._stream_row(i)
+
+        print("Extracted outputs:")
+        for key1 in raw_experiment.contact_angles.keys():
+            for key2 in raw_experiment.contact_angles[key1].keys():
+                print(key1 + " " + key2 + ": ")
+                print("    ", raw_experiment.contact_angles[key1][key2])
+                print()
+
+        if callback:
+            callback(i + 1, raw_experiment)
+
+    def _stream_row(self, i: int) -> None:
+        if self._writer is None:
+            # a column for every enabled method, as one failing on the
+            # first frames may still give angles for later ones
+            self._stream_paths = enabled_angle_paths(self._setup.analysis_methods_ca)
+            self._writer = open_result_writer(
+                self.streamed_path, result_columns(self._stream_paths)
+            )
+        self._writer.write_row(self._result_row(self._setup, i, self._stream_paths))
+
+    def _result_row(
+        self, user_input_data: ExperimentalSetup, index: int, angle_paths: List
+    ) -> List[Any]:
+        filepath = user_input_data.import_files[index]
+        if isinstance(filepath, tuple):
+            filepath = filepath[0]
+        row = [str(filepath), frame_time(user_input_data, index)]
+        row += [self.results.get(index, *path) for path in angle_paths]
+        return row
 
     def save_result(self, user_input_data: ExperimentalSetup, output_file_path: str):
-        for index, contact_angles in enumerate(self.results):
-            out = []
-            filepath = user_input_data.import_files[index]
-            if isinstance(filepath, tuple):
-                filepath = filepath[0]
-            out.append(str(filepath))
-            out.append(user_input_data.frame_interval * index)
-            header = []
-            header.append("Filename,")
-            header.append("Time (s),")
-            for key1 in contact_angles.keys():
-                for key2 in contact_angles[key1].keys():
-                    if "angle" in key2:
-                        header.append(key1 + " " + key2 + ",")
-                        out.append(str(contact_angles[key1][key2]))
-            string = ""
-            for heading in header:
-                string = string + heading
-            string = string[:-1]
-            array = np.array(out)
-            array = array.reshape(1, array.shape[0])
-
-            with open(output_file_path, "a") as f:
-                if index == 0:
-                    f.write(string + "\n")
-                # for val in array[0]:
-                for val in out:
-                    f.write(str(val) + ",")
-                f.write("\n")
+        if user_input_data.save_timings_boole:
+            self.save_timings(output_file_path)
+        if output_file_path == self.streamed_path or not len(self.results):
+            # already written frame by frame
+            return
+
+        angle_paths = self.results.angle_paths()
+        with open_result_writer(
+            output_file_path, result_columns(angle_paths)
+        ) as writer:
+            for index in range(len(self.results)):
+                writer.write_row(self._result_row(user_input_data, index, angle_paths))
+
+    def save_timings(self, output_file_path: str):
+        """Write the stage timings of the last run next to the results, as
+        ``<name>_timings.csv`` (one row per stage per frame) and
+        ``<name>_timings.json`` (summary across frames and every record)"""
+        profiler = StageProfiler()
+        profiler.extend(getattr(self, "stage_timings", []))
+        base = os.path.splitext(output_file_path)[0]
+        profiler.to_csv(base + "_timings.csv")
+        profiler.to_json(base + "_timings.json")
@@ -0,0 +1,297 @@
+from opendrop_ml.modules.contact_angle import ca_data_processor
+from opendrop_ml.modules.contact_angle.ca_data_processor import (
+    CaDataProcessor,
+    can_process_in_parallel,
+)
+from opendrop_ml.modules.core.classes import (
+    ExperimentalDrop,
+    ExperimentalSetup,
+    DropData,
+)
+from opendrop_ml.modules.image.video import set_import_files
+from opendrop_ml.modules.fitting.warm_start import get_warm_starts
+from opendrop_ml.utils.enums import FittingMethod, RegionSelect, ThresholdSelect
+from opendrop_ml.utils.config import LEFT_ANGLE, RIGHT_ANGLE
+
+import matplotlib
+import pytest
+import threading
+import json
+import cv2
+import glob
+import os
+
+matplotlib.use("Agg")
+
+DATA_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "..", "experimental_data_set", "ca"
+)
+
+
+@pytest.fixture
+def setup():
+    user_input_data = ExperimentalSetup()
+    user_input_data.screen_resolution = [1920, 1080]
+    user_input_data.import_files = sorted(
+        glob.glob(os.path.join(DATA_DIR, "20171112JT4_*.BMP"))
+    )[:3]
+    user_input_data.number_of_frames = len(user_input_data.import_files)
+    user_input_data.analysis_methods_ca[FittingMethod.TANGENT_FIT] = True
+    return user_input_data
+
+
+def test_can_process_in_parallel(setup):
+    assert can_process_in_parallel(setup)
+
+    setup.drop_id_method = RegionSelect.USER_SELECTED
+    assert not can_process_in_parallel(setup)
+
+    setup.drop_id_method = RegionSelect.AUTOMATED
+    setup.baseline_method = ThresholdSelect.USER_SELECTED
+    assert not can_process_in_parallel(setup)
+
+    setup.baseline_method = ThresholdSelect.AUTOMATED
+    setup.cropped_boole = 1
+    assert not can_process_in_parallel(setup)
+
+
+def test_worker_pool_matches_serial(setup):
+    def run(n_workers):
+        setup.n_workers = n_workers
+        processor = CaDataProcessor()
+        received = []
+        processor.process_data(DropData(), setup, lambda i, drop: received.append(i))
+        return processor, received
+
+    serial, serial_order = run(1)
+    pool, pool_order = run(2)
+    serial_results, pool_results = serial.results, pool.results
+
+    assert serial_order == pool_order == [1, 2, 3]
+    # stage timings from the workers are merged back into the parent
+    for processor in (serial, pool):
+        timed_frames = {
+            record["frame"]
+            for record in processor.stage_timings
+            if record["stage"] == "extract_drop_profile"
+        }
+        assert timed_frames == {0, 1, 2}
+    for s, p in zip(serial_results, pool_results):
+        for side in (LEFT_ANGLE, RIGHT_ANGLE):
+            assert (
+                s[FittingMethod.TANGENT_FIT][side] == p[FittingMethod.TANGENT_FIT][side]
+            )
+
+
+def test_save_timings_next_to_results(setup, tmp_path):
+    setup.import_files = setup.import_files[:1]
+    setup.number_of_frames = 1
+    setup.save_timings_boole = True
+    processor = CaDataProcessor()
+    processor.process_data(DropData(), setup, None)
+
+    processor.save_result(setup, str(tmp_path / "results.csv"))
+
+    assert (tmp_path / "results.csv").exists()
+    assert (tmp_path / "results_timings.csv").exists()
+    with open(tmp_path / "results_timings.json") as f:
+        summary = json.load(f)["summary"]
+    assert {"get_image", "auto_crop", "extract_drop_profile"} <= set(summary)
+
+
+def test_contour_tilt_correction_extracts_the_profile_once(setup):
+    setup.import_files = setup.import_files[:1]
+    setup.number_of_frames = 1
+    setup.analysis_methods_ca[FittingMethod.TANGENT_FIT] = False
+    setup.analysis_methods_ca[FittingMethod.YL_FIT] = True
+
+    def run(contour_tilt_correction):
+        setup.contour_tilt_correction = contour_tilt_correction
+        processor = CaDataProcessor()
+        processor.process_data(DropData(), setup, None)
+        extractions = [
+            record
+            for record in processor.stage_timings
+            if record["stage"] == "extract_drop_profile"
+        ]
+        return processor.results[0][FittingMethod.YL_FIT], len(extractions)
+
+    image_space, image_extractions = run(False)
+    contour_space, contour_extractions = run(True)
+
+    assert (image_extractions, contour_extractions) == (2, 1)
+    for side in (LEFT_ANGLE, RIGHT_ANGLE):
+        assert contour_space[side] == pytest.approx(image_space[side], abs=2)
+
+
+def test_warm_started_fits_match_cold_fits(setup):
+    setup.analysis_methods_ca[FittingMethod.TANGENT_FIT] = False
+    setup.analysis_methods_ca[FittingMethod.CIRCLE_FIT] = True
+    setup.analysis_methods_ca[FittingMethod.YL_FIT] = True
+
+    def run(warm_start_fits):
+        setup.warm_start_fits = warm_start_fits
+        processor = CaDataProcessor()
+        processor.process_data(DropData(), setup, None)
+        return processor.results, get_warm_starts().counts()
+
+    cold, cold_counts = run(False)
+    warm, warm_counts = run(True)
+
+    assert cold_counts == {}
+    assert warm_counts["yl"] == {"warm": 2, "cold": 1}
+    for cold_result, warm_result in zip(cold, warm):
+        for method in (FittingMethod.CIRCLE_FIT, FittingMethod.YL_FIT):
+            for side in (LEFT_ANGLE, RIGHT_ANGLE):
+                assert warm_result[method][side] == pytest.approx(
+                    cold_result[method][side], abs=1
+                )
+
+
+def test_save_result_writes_angles_by_frame(setup, tmp_path):
+    processor = CaDataProcessor()
+    processor.results.reset(3)
+    for i in (0, 2):
+        processor.results.add(
+            i,
+            {
+                FittingMethod.TANGENT_FIT: {
+                    LEFT_ANGLE: 40.0 + i,
+                    RIGHT_ANGLE: 50.0 + i,
+                    "tangent lines": [(0, 1), (2, 3)],
+                }
+            },
+        )
+
+    processor.save_result(setup, str(tmp_path / "results.csv"))
+
+    with open(tmp_path / "results.csv") as f:
+        lines = f.read().splitlines()
+    assert (
+        lines[0] == "Filename,Time (s),tangent fit left angle,tangent fit right angle"
+    )
+    assert lines[1].split(",")[2:] == ["40.0", "50.0"]
+    assert lines[2].split(",")[2:] == ["", ""]
+    assert lines[3].split(",")[2:] == ["42.0", "52.0"]
+
+
+def test_rows_are_streamed_as_frames_finish(setup, tmp_path):
+    output_file_path = str(tmp_path / "results.csv")
+
+    def callback(n, drop):
+        if n == 2:
+            raise RuntimeError("stopped")
+
+    processor = CaDataProcessor()
+    with pytest.raises(RuntimeError):
+        processor.process_data(DropData(), setup, callback, output_file_path)
+
+    with open(output_file_path) as f:
+        lines = f.read().splitlines()
+    # the frames finished before the failure are kept
+    assert lines[0].startswith("Filename,Time (s),tangent fit left angle")
+    assert [line.split(",")[0] for line in lines[1:]] == setup.import_files[:2]
+
+    # saving to the streamed file leaves it as it is
+    processor.save_result(setup, output_file_path)
+    with open(output_file_path) as f:
+        assert f.read().splitlines() == lines
+
+
+def test_streamed_columns_include_methods_failing_on_the_first_frame(
+    setup, tmp_path, monkeypatch
+):
+    setup.n_workers = 1
+    setup.analysis_methods_ca[FittingMethod.CIRCLE_FIT] = True
+
+    def analyse_frame(user_input_data, i):
+        drop = ExperimentalDrop()
+        drop.contact_angles[FittingMethod.TANGENT_FIT] = {
+            LEFT_ANGLE: 40.0 + i,
+            RIGHT_ANGLE: 50.0 + i,
+        }
+        # the circle fit only succeeds from the second frame on
+        if i > 0:
+            drop.contact_angles[FittingMethod.CIRCLE_FIT] = {
+                LEFT_ANGLE: 60.0 + i,
+                RIGHT_ANGLE: 70.0 + i,
+            }
+        return drop
+
+    monkeypatch.setattr(ca_data_processor, "analyse_frame", analyse_frame)
+    output_file_path = str(tmp_path / "results.csv")
+    processor = CaDataProcessor()
+    processor.process_data(DropData(), setup, None, output_file_path)
+
+    with open(output_file_path) as f:
+        lines = f.read().splitlines()
+    assert lines[0].split(",")[2:] == [
+        "tangent fit left angle",
+        "tangent fit right angle",
+        "circle fit left angle",
+        "circle fit right angle",
+    ]
+    assert lines[1].split(",")[2:] == ["40.0", "50.0", "", ""]
+    assert lines[2].split(",")[2:] == ["41.0", "51.0", "61.0", "71.0"]
+    assert lines[3].split(",")[2:] == ["42.0", "52.0", "62.0", "72.0"]
+
+
+def test_bounded_memory_releases_frame_images(setup):
+    setup.import_files = setup.import_files[:2]
+    setup.number_of_frames = 2
+    setup.bounded_memory = True
+    received = []
+
+    processor = CaDataProcessor()
+    processor.process_data(DropData(), setup, lambda i, drop: received.append(drop))
+
+    for drop in received:
+        assert drop.image is None and drop.contour is None
+        assert drop.cropped_image is not None and drop.drop_contour is not None
+    # only the scalar results are kept
+    assert "tangent lines" not in processor.results[0][FittingMethod.TANGENT_FIT]
+    assert "tangent lines" in received[0].contact_angles[FittingMethod.TANGENT_FIT]
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_cancel_stops_between_frames(setup, n_workers):
+    setup.n_workers = n_workers
+    cancel = threading.Event()
+    received = []
+
+    def callback(n, drop):
+        received.append(n)
+        # the second frame comes from the worker pool when there is one
+        if n == 2:
+            cancel.set()
+
+    processor = CaDataProcessor()
+    processor.process_data(DropData(), setup, callback, cancel=cancel)
+
+    assert processor.cancelled
+    assert received == [1, 2]
+    assert len(processor.results) == 2
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_video_frames_are_timed_by_the_container(setup, tmp_path, n_workers):
+    images = [cv2.imread(path) for path in setup.import_files]
+    height, width = images[0].shape[:2]
+    video = str(tmp_path / "drop.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 4, (width, height))
+    for image in images:
+        writer.write(image)
+    writer.release()
+    output_file_path = str(tmp_path / "results.csv")
+
+    set_import_files(setup, [video])
+    setup.n_workers = n_workers
+    processor = CaDataProcessor()
+    processor.process_data(DropData(), setup, None, output_file_path)
+
+    assert len(processor.results) == 3
+    with open(output_file_path) as f:
+        rows = [line.split(",") for line in f.read().splitlines()[1:]]
+    assert [row[0] for row in rows] == [video + f"#frame={i}" for i in range(3)]
+    # 4 frames per second, not frame_interval apart
+    assert [float(row[1]) for row in rows] == [0, 0.25, 0.5]
@@ -3,12 +3,15 @@
 from opendrop_ml.modules.core.classes import ExperimentalDrop, ExperimentalSetup
 from opendrop_ml.modules.preprocessing.preprocessing import extract_edges_cv
 from opendrop_ml.utils.enums import ThresholdSelect
+from opendrop_ml.utils.contour import cluster_optics, optimized_path
+from opendrop_ml.utils.profiling import timed
+from opendrop_ml.utils.lazy import lazy_import
 
-from sklearn.cluster import OPTICS  # DS 7/6/21 - for clustering algorithm
-import matplotlib.pyplot as plt
 import numpy as np
 import cv2
 
+plt = lazy_import("matplotlib.pyplot")
+
 # from __future__ import print_function
 # from typing import List, Tuple
 # import time
@@ -18,6 +21,7 @@ BLUR_SIZE = 3
 VERSION_CV2 = cv2.__version__
 
 
+@timed("extract_drop_profile")
 def extract_drop_profile(
     raw_experiment: ExperimentalDrop, user_inputs: ExperimentalSetup
 ) -> None:
@@ -251,32 +255,6 @@ def distance(P1, P2):
     return ((P1[0] - P2[0]) ** 2 + (P1[1] - P2[1]) ** 2) ** 0.5
 
 
-def optimized_path(coords, start=None):
-    """This function finds the nearest point to a point
-    coords should be a list in this format coords = [ [x1, y1], [x2, y2] , ...]
-    https://stackoverflow.com/questions/45829155/sort-points-in-order-to-have-a-continuous-curve-using-python
-    """
-    if isinstance(coords, list) == False:
-        coords = coords.tolist()
-    if 0:
-        if isinstance(start, list) == False:
-            try:
-                start = start.tolist()
-            except:
-                start = list(start)
-    if start is None:
-        start = coords[0]
-    pass_by = coords
-    path = [start]
-    pass_by.remove(start)
-    while pass_by:
-        nearest = min(pass_by, key=lambda x: distance(path[-1], x))
-        path.append(nearest)
-        pass_by.remove(nearest)
-    path = np.array(path)
-    return path
-
-
 def prepare_hydrophobic(coords, xi: float = 0.8):
     """takes an array (n,2) of coordinate points, and returns the left and right halfdrops of the contour.
     xi determines the minimum steepness on the reachability plot that constitutes a cluster boundary of the
@@ -874,97 +852,3 @@ def distance(P1, P2):
     """This function computes the distance between 2 points defined by
     P1 = (x1,y1) and P2 = (x2,y2)"""
     return ((P1[0] - P2[0]) ** 2 + (P1[1] - P2[1]) ** 2) ** 0.5
-
-
-def optimized_path(coords, start=None):
-    """This function finds the nearest point to a point
-    coords should be a list in this format coords = [ [x1, y1], [x2, y2] , ...]
-
-    https://stackoverflow.com/questions/45829155/sort-points-in-order-to-have-a-continuous-curve-using-python
-    """
-    if isinstance(coords, list) == False:
-        coords = coords.tolist()
-    if 0:
-        if isinstance(start, list) == False:
-            try:
-                start = start.tolist()
-            except:
-                start = list(start)
-
-    if start is None:
-        start = coords[0]
-    pass_by = coords
-    path = [start]
-    pass_by.remove(start)
-    while pass_by:
-        nearest = min(pass_by, key=lambda x: distance(path[-1], x))
-        path.append(nearest)
-        pass_by.remove(nearest)
-
-    path = np.array(path)
-    return path
-
-
-def cluster_optics(sample, out_style="coords", xi=None, eps=None, verbose=0):
-    """Takes an array (or list) of the form [[x1,y1],[x2,y2],...,[xn,yn]].
-    Clusters are outputted in the form of a dictionary.
-
-    If out_style='coords' each dictionary entry is a group, and points are outputted in coordinate form.
-    If out_xy='xy' there are two dictionary entries for each group, one labeled as nx and one as ny
-    (where n is the label of the group)
-
-    If xi (float between 0 and 1) is not None and eps is None, then the xi clustering method is used.
-    The optics algorithm defines clusters based on the minimum steepness on the reachability plot.
-    For example, an upwards point in the reachability plot is defined by the ratio from one point to
-    its successor being at most 1-xi.
-
-    If eps (float) is not None and xi is None, then the dbscan clustering method is used. Where eps is the
-    maximum distance between two samples for one to be considered as in the neighborhood of the other.
-
-    https://stackoverflow.com/questions/47974874/algorithm-for-grouping-points-in-given-distance
-    https://scikit-learn.org/stable/modules/generated/sklearn.cluster.OPTICS.html
-    """
-    if eps != None and xi == None:
-        clustering = OPTICS(min_samples=2, cluster_method="dbscan", eps=eps).fit(
-            sample
-        )  # cluster_method changed to dbscan (so eps can be set)
-    elif xi != None and eps == None:
-        # original had xi = 0.05, xi as 0.1 in function input
-        clustering = OPTICS(min_samples=2, xi=xi).fit(sample)
-    else:
-        raise ValueError(
-            "only one of eps and xi can be chosen but not neither nor both"
-        )
-    groups = list(set(clustering.labels_))
-
-    if verbose == 2:
-        print(clustering.labels_)
-    elif verbose == 1:
-        print(groups)
-    # elif verbose == 0:
-    #     pass
-
-    dic = {}
-    for n in groups:
-        if n not in dic:
-            dic[n] = []
-        for i in range(len(sample)):
-            if clustering.labels_[i] == n:
-                dic[n].append(sample[i])
-
-    # separate points and graph
-    dic2 = {}
-    for k in dic.keys():
-        x = []
-        y = []
-        for i in range(len(dic[k])):
-            x.append(dic[k][i][0])
-        dic2[str(k) + "x"] = x
-        for i in range(len(dic[k])):
-            y.append(dic[k][i][1])
-        dic2[str(k) + "y"] = y
-
-    if out_style == "coords":
-        return dic
-    elif out_style == "xy":
-        return dic2
@@ -0,0 +1,160 @@
+"""Columnar storage of the contact angle results of a run.
+
+Each frame's ``contact_angles`` is a nested dict of fit outputs. Keeping a
+deep copy of it per frame makes long time series slow and large, so the
+scalars (angles, radii, errors, timings, ...) are written into preallocated
+NumPy columns instead, named by their key path, e.g.
+``(FittingMethod.CIRCLE_FIT, LEFT_ANGLE)``. Arrays and any other values, such
+as fitted shapes and tangent lines, are kept per frame beside the columns, or
+dropped if only the scalars are wanted.
+"""
+
+from typing import Any, Dict, Iterator, List, Tuple
+import numpy as np
+
+Path = Tuple[Any, ...]
+
+
+def is_scalar(value) -> bool:
+    """Whether ``value`` is stored in a column"""
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(
+        value, (bool, np.bool_)
+    )
+
+
+def flatten(contact_angles: Dict, prefix: Path = ()) -> Iterator[Tuple[Path, Any]]:
+    """``(path, value)`` of every leaf of a nested dict"""
+    for key, value in contact_angles.items():
+        if isinstance(value, dict) and value:
+            yield from flatten(value, prefix + (key,))
+        else:
+            yield prefix + (key,), value
+
+
+class ResultStore:
+    """The ``contact_angles`` of every frame of a run, stored by column.
+
+    ``store[i]`` rebuilds the ``contact_angles`` dict of frame ``i`` and
+    ``store.column(*path)`` gives one output across all frames.
+    """
+
+    def __init__(self, capacity: int = 0, keep_arrays: bool = True):
+        self.reset(capacity, keep_arrays)
+
+    def reset(self, capacity: int = 0, keep_arrays: bool = True) -> None:
+        """Forget all frames, making room for ``capacity`` of them"""
+        self.keep_arrays = keep_arrays
+        self._capacity = max(int(capacity), 1)
+        self._length = 0
+        # every path in the order first seen, so frames rebuild in the
+        # order their keys were set
+        self._paths: Dict[Path, None] = {}
+        self._columns: Dict[Path, np.ndarray] = {}
+        self._set: Dict[Path, np.ndarray] = {}
+        self._objects: Dict[Path, Dict[int, Any]] = {}
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self._length):
+            yield self[i]
+
+    def add(self, i: int, contact_angles: Dict) -> None:
+        """Store the ``contact_angles`` of frame ``i``"""
+        self._reserve(i + 1)
+        self._length = max(self._length, i + 1)
+        for path, value in flatten(contact_angles):
+            if is_scalar(value):
+                self._store_scalar(path, i, value)
+            elif self.keep_arrays:
+                self._paths.setdefault(path)
+                self._objects.setdefault(path, {})[i] = value
+
+    def __getitem__(self, i: int) -> Dict:
+        if not 0 <= i < self._length:
+            raise IndexError(f"frame {i} out of range")
+        contact_angles: Dict = {}
+        for path in self._paths:
+            found, value = self._lookup(path, i)
+            if not found:
+                continue
+            node = contact_angles
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = value
+        return contact_angles
+
+    def get(self, i: int, *path, default=None):
+        """Value at ``path`` in frame ``i``, or ``default`` if it has none"""
+        found, value = self._lookup(path, i)
+        return value if found else default
+
+    def column(self, *path) -> np.ndarray:
+        """The scalar at ``path`` across all frames, NaN where unset"""
+        if path not in self._columns:
+            return np.full(self._length, np.nan)
+        values = self._columns[path][: self._length].astype(float)
+        values[~self._set[path][: self._length]] = np.nan
+        return values
+
+    def paths(self) -> List[Path]:
+        return list(self._paths)
+
+    def angle_paths(self) -> List[Path]:
+        """``(method, key)`` paths of the contact angles, in first-seen order"""
+        return [
+            path
+            for path in self._paths
+            if len(path) == 2 and isinstance(path[1], str) and "angle" in path[1]
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns, not counting the per-frame arrays"""
+        return sum(
+            column.nbytes + self._set[path].nbytes
+            for path, column in self._columns.items()
+        )
+
+    def _lookup(self, path: Path, i: int) -> Tuple[bool, Any]:
+        if not 0 <= i < self._length:
+            return False, None
+        if path in self._columns and self._set[path][i]:
+            return True, self._columns[path][i]
+        objects = self._objects.get(path)
+        if objects is not None and i in objects:
+            return True, objects[i]
+        return False, None
+
+    def _store_scalar(self, path: Path, i: int, value) -> None:
+        column = self._columns.get(path)
+        if column is None:
+            self._paths.setdefault(path)
+            column = self._columns[path] = np.zeros(
+                self._capacity, dtype=np.result_type(value)
+            )
+            self._set[path] = np.zeros(self._capacity, dtype=bool)
+        elif column.dtype != np.float64:
+            dtype = np.result_type(value)
+            if not np.can_cast(dtype, column.dtype, casting="safe"):
+                # e.g. a float in a column of ints
+                column = self._columns[path] = column.astype(
+                    np.promote_types(column.dtype, dtype)
+                )
+        column[i] = value
+        self._set[path][i] = True
+
+    def _reserve(self, n: int) -> None:
+        if n <= self._capacity:
+            return
+        self._capacity = max(n, 2 * self._capacity)
+        for path in self._columns:
+            self._columns[path] = _grown(self._columns[path], self._capacity)
+            self._set[path] = _grown(self._set[path], self._capacity)
+
+
+def _grown(array: np.ndarray, capacity: int) -> np.ndarray:
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
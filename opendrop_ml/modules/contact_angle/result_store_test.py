@@ -0,0 +1,109 @@
+from opendrop_ml.modules.contact_angle.result_store import ResultStore
+from opendrop_ml.utils.config import LEFT_ANGLE, RIGHT_ANGLE
+from opendrop_ml.utils.enums import FittingMethod
+
+import numpy as np
+import pytest
+
+
+def frame(left, right, radius=100):
+    return {
+        FittingMethod.CIRCLE_FIT: {
+            LEFT_ANGLE: left,
+            RIGHT_ANGLE: right,
+            "circle center": np.array([10.0, 20.0]),
+            "circle radius": radius,
+            "errors": {"MAE": 0.5, "RMSE": 0.75},
+            "timings": {"fit time": 0.01},
+        },
+        FittingMethod.ML_MODEL: {LEFT_ANGLE: np.float32(left), RIGHT_ANGLE: right},
+    }
+
+
+def assert_same(actual, expected):
+    assert list(actual) == list(expected)
+    for key, value in expected.items():
+        if isinstance(value, dict):
+            assert_same(actual[key], value)
+        else:
+            np.testing.assert_array_equal(actual[key], value)
+            assert type(actual[key]) is type(value) or np.isscalar(actual[key])
+
+
+def test_frames_round_trip():
+    store = ResultStore(capacity=2)
+    frames = [frame(40.5, 41.5), frame(42.0, 43.0, radius=101)]
+    for i, contact_angles in enumerate(frames):
+        store.add(i, contact_angles)
+
+    assert len(store) == 2
+    for contact_angles, expected in zip(store, frames):
+        assert_same(contact_angles, expected)
+    # the precision of the ML model output is kept
+    assert store[0][FittingMethod.ML_MODEL][LEFT_ANGLE] == np.float32(40.5)
+    assert str(store[1][FittingMethod.CIRCLE_FIT]["circle radius"]) == "101"
+
+
+def test_columns_grow_past_capacity():
+    store = ResultStore(capacity=1)
+    for i in range(10):
+        store.add(i, frame(40 + i, 50 + i))
+
+    np.testing.assert_array_equal(
+        store.column(FittingMethod.CIRCLE_FIT, LEFT_ANGLE), 40 + np.arange(10)
+    )
+    assert store.column(FittingMethod.CIRCLE_FIT, "errors", "RMSE").shape == (10,)
+
+
+def test_missing_values_and_frames():
+    store = ResultStore()
+    store.add(0, frame(40, 50))
+    store.add(2, {FittingMethod.CIRCLE_FIT: {LEFT_ANGLE: 1.5}})
+
+    assert len(store) == 3
+    assert store[1] == {}
+    assert store[2] == {FittingMethod.CIRCLE_FIT: {LEFT_ANGLE: 1.5}}
+    np.testing.assert_array_equal(
+        store.column(FittingMethod.CIRCLE_FIT, RIGHT_ANGLE), [50, np.nan, np.nan]
+    )
+    assert store.get(1, FittingMethod.CIRCLE_FIT, LEFT_ANGLE, default="") == ""
+    assert np.isnan(store.column(FittingMethod.YL_FIT, LEFT_ANGLE)).all()
+    with pytest.raises(IndexError):
+        store[3]
+
+
+def test_int_column_takes_floats():
+    store = ResultStore()
+    store.add(0, {"fit": {"value": 1}})
+    store.add(1, {"fit": {"value": 2.5}})
+
+    np.testing.assert_array_equal(store.column("fit", "value"), [1, 2.5])
+
+
+def test_arrays_can_be_dropped():
+    store = ResultStore(keep_arrays=False)
+    store.add(0, frame(40, 50))
+
+    circle = store[0][FittingMethod.CIRCLE_FIT]
+    assert "circle center" not in circle
+    assert circle[LEFT_ANGLE] == 40 and circle["errors"]["RMSE"] == 0.75
+
+
+def test_angle_paths():
+    store = ResultStore()
+    store.add(0, frame(40, 50))
+
+    assert store.angle_paths() == [
+        (FittingMethod.CIRCLE_FIT, LEFT_ANGLE),
+        (FittingMethod.CIRCLE_FIT, RIGHT_ANGLE),
+        (FittingMethod.ML_MODEL, LEFT_ANGLE),
+        (FittingMethod.ML_MODEL, RIGHT_ANGLE),
+    ]
+
+
+def test_reset():
+    store = ResultStore()
+    store.add(0, frame(40, 50))
+    store.reset(capacity=5)
+
+    assert len(store) == 0 and store.paths() == [] and store.nbytes == 0
@@ -4,7 +4,6 @@ from opendrop_ml.modules.fitting.de_YoungLaplace import ylderiv
 from opendrop_ml.utils.config import INTERFACIAL_TENSION
 from opendrop_ml.utils.enums import RegionSelect, ThresholdSelect, FittingMethod
 
-from scipy.integrate import odeint
 from typing import Dict, List, Optional, Tuple
 import yaml
 import numpy as np
@@ -58,6 +57,11 @@ class ExperimentalSetup(object):
         self.needle_region = None
         self.import_files: Optional[List[str]] = None
         self.frame_interval: float = 1
+        self.video_frame_stride: int = 1
+        self.video_start_s: Optional[float] = None
+        self.video_end_s: Optional[float] = None
+        # container timestamps (s) of the video frames decoded, by index
+        self.frame_times: Dict[int, float] = {}
         self.analysis_methods_ca: Dict[FittingMethod, bool] = {
             FittingMethod.TANGENT_FIT: False,
             FittingMethod.POLYNOMIAL_FIT: False,
@@ -67,8 +71,20 @@ class ExperimentalSetup(object):
             FittingMethod.ML_MODEL: False,
         }
         self.analysis_methods_pd: Dict[str, bool] = {INTERFACIAL_TENSION: True}
+        self.ml_model_min_free_mb: Optional[float] = None
+        self.ml_batch_size: int = 1
+        self.n_workers: Optional[int] = 1
+        self.track_drop_region: bool = False
+        self.contour_tilt_correction: bool = False
+        self.warm_start_fits: bool = False
+        self.drop_result_arrays: bool = False
+        self.bounded_memory: bool = False
+        self.image_cache_mb: float = 256
 
         self.save_images_boole: bool = False
+        self.save_timings_boole: bool = False
+        self.stream_results: bool = False
+        self.result_format: str = "csv"
         self.create_folder_boole: bool = False
         self.output_directory: Optional[str] = None
         self.filename: Optional[str] = None
@@ -125,6 +141,8 @@ class ExperimentalDrop(object):
         self.surface_data = None
         self.ret = None
         self.time = None
+        # timestamp (s) in the video the frame was decoded from
+        self.frame_time: Optional[float] = None
         self.pixels_to_mm = None
 
         # self.time_full = None
@@ -187,6 +205,8 @@ class DropData(object):
 
     # generates a new drop profile
     def generate_profile_data(self):
+        from scipy.integrate import odeint
+
         if (
             (self._max_s is not None)
             and (self._s_points is not None)
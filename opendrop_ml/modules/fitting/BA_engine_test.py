@@ -0,0 +1,54 @@
+from opendrop_ml.modules.fitting.BA_engine import (
+    fit_profile,
+    profile_distances,
+    simulate_profile,
+)
+from opendrop_ml.modules.fitting.BA_fit import bashforth_adams
+
+from scipy.integrate import solve_ivp
+import numpy as np
+import pytest
+
+
+def test_simulate_profile_mirrors_right_branch():
+    h, a, b = 100, 10, 50
+    angles, pred = simulate_profile(h, a, b)
+
+    def height(t, y, a, b):
+        return y[1] - h
+
+    height.terminal = True
+    sol = solve_ivp(
+        bashforth_adams,
+        (0, 180),
+        (1e-5, 0),
+        args=(a, b),
+        method="RK45",
+        t_eval=np.linspace(0, 180, num=500),
+        events=height,
+        rtol=1e-9,
+        atol=1e-10,
+    )
+    n = len(sol.t)
+    assert len(pred) == 2 * n
+    np.testing.assert_allclose(pred[n:][::-1], sol.y.T, atol=0.01)
+    np.testing.assert_allclose(pred[:n], sol.y.T * [-1, 1], atol=0.01)
+    np.testing.assert_allclose(angles, np.hstack((-sol.t, sol.t[::-1])))
+    assert np.max(pred[:, 1]) == pytest.approx(h, abs=1)
+
+
+def test_profile_distances_to_segments():
+    pred = np.array([[0.0, 0.0], [10.0, 0.0], [10.0, 10.0]])
+    data = np.array([[5.0, 2.0], [12.0, 5.0], [-3.0, 0.0]])
+    np.testing.assert_allclose(profile_distances(data, pred), [2, 2, 3])
+
+
+@pytest.mark.parametrize("a, b", [(10, 50), (8, 120), (15, 90)])
+def test_fit_profile_recovers_parameters(a, b):
+    rng = np.random.default_rng(0)
+    _, pred = simulate_profile(100, a, b, num=2000)
+    data = np.round(pred[::4] + rng.normal(0, 0.3, pred[::4].shape))
+    data[:, 1] -= data[:, 1].min()
+
+    result = fit_profile(data)
+    np.testing.assert_allclose(result.x, (a, b), rtol=0.02)
@@ -10,91 +10,28 @@ conan-ML_v1.1/modules/BA_fit.py
 This was based on the BA fit of DropPy.
 """
 
+from opendrop_ml.modules.fitting.BA_engine import fit_profile, simulate_profile
+from opendrop_ml.modules.fitting.BA_library import get_profile_library
+from opendrop_ml.modules.fitting.fit_errors import error_measures, polyline_distances
+from opendrop_ml.modules.fitting.warm_start import warm_fit
 from opendrop_ml.utils.config import CV2_VERSION
+from opendrop_ml.utils.contour import (
+    cluster_optics,
+    optimized_path as order_contour,
+    unique_points,
+)
 from opendrop_ml.utils.enums import FitType
-
-from sklearn.cluster import OPTICS  # for clustering algorithm
-from scipy.spatial import distance
-from scipy.integrate import solve_ivp
+from opendrop_ml.utils.lazy import lazy_import
 
 # from scipy.spatial.distance import cdist
-from sklearn.metrics import r2_score
 import scipy.optimize as opt
 
 # import numba
 import numpy as np
-import matplotlib.pyplot as plt
 import cv2
 import time
 
-
-def cluster_optics(
-    sample,
-    out_style: str = "coords",
-    xi: float = None,
-    eps: float = None,
-    verbose: int = 0,
-):
-    """Takes an array (or list) of the form [[x1,y1],[x2,y2],...,[xn,yn]].
-    Clusters are outputted in the form of a dictionary.
-
-    If out_style='coords' each dictionary entry is a group, and points are outputted in coordinate form.
-    If out_xy='xy' there are two dictionary entries for each group, one labeled as nx and one as ny
-    (where n is the label of the group)
-
-    If xi (float between 0 and 1) is not None and eps is None, then the xi clustering method is used.
-    The optics algorithm defines clusters based on the minimum steepness on the reachability plot.
-    For example, an upwards point in the reachability plot is defined by the ratio from one point to
-    its successor being at most 1-xi.
-
-    If eps (float) is not None and xi is None, then the dbscan clustering method is used. Where eps is the
-    maximum distance between two samples for one to be considered as in the neighborhood of the other.
-
-    https://stackoverflow.com/questions/47974874/algorithm-for-grouping-points-in-given-distance
-    https://scikit-learn.org/stable/modules/generated/sklearn.cluster.OPTICS.html
-    """
-    if eps is not None and xi is None:
-        clustering = OPTICS(min_samples=2, cluster_method="dbscan", eps=eps).fit(
-            sample
-        )  # cluster_method changed to dbscan (so eps can be set)
-    elif xi is not None and eps is None:
-        # original had xi = 0.05, xi as 0.1 in function input
-        clustering = OPTICS(min_samples=2, xi=xi).fit(sample)
-    else:
-        raise ValueError(
-            "only one of eps and xi can be chosen but not neither nor both"
-        )
-    groups = list(set(clustering.labels_))
-
-    if verbose == 2:
-        print(clustering.labels_)
-    elif verbose == 1:
-        print(groups)
-
-    dic = {}
-    for n in groups:
-        if n not in dic:
-            dic[n] = []
-        for i in range(len(sample)):
-            if clustering.labels_[i] == n:
-                dic[n].append(sample[i])
-
-    # separate points and graph
-    dic2 = {}
-    for k in dic.keys():
-        x = []
-        y = []
-        for i in range(len(dic[k])):
-            x.append(dic[k][i][0])
-        dic2[str(k) + "x"] = x
-        for i in range(len(dic[k])):
-            y.append(dic[k][i][1])
-        dic2[str(k) + "y"] = y
-
-    if out_style == "coords":
-        return dic
-    elif out_style == "xy":
-        return dic2
+plt = lazy_import("matplotlib.pyplot")
 
 
 def distance1(p1, p2):
@@ -103,6 +40,12 @@ def distance1(p1, p2):
     return ((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2) ** 0.5
 
 
+def optimized_path(coords, start=None):
+    """Order the contour points into a continuous path, ignoring the points
+    after the first jump of more than 5 pixels, as it is likely a mistake"""
+    return order_contour(coords, start, max_jump=5)
+
+
 def dist(param, points):
     """
     Calculate the total distance from the calculated circle to the points
@@ -114,52 +57,11 @@ def dist(param, points):
              the provided parameters
     """
     *z, r = param
-    ar = [(np.linalg.norm(np.array(z) - np.array(point)) - r)
-          ** 2 for point in points]
+    points = np.asarray(points, dtype=float)
+    ar = (np.hypot(points[:, 0] - z[0], points[:, 1] - z[1]) - r) ** 2
     return np.sum(ar)
 
 
-def optimized_path(coords, start=None):
-    """This function finds the nearest point to a point
-    coords should be a list in this format coords = [ [x1, y1], [x2, y2] , ...]
-    https://stackoverflow.com/questions/45829155/sort-points-in-order-to-have-a-continuous-curve-using-python
-    """
-    if isinstance(coords, list) == False:
-        coords = coords.tolist()
-    if 0:
-        if isinstance(start, list) == False:
-            try:
-                start = start.tolist()
-            except:
-                start = list(start)
-    if start is None:
-        start = coords[0]
-    pass_by = coords
-    path = [start]
-    pass_by.remove(start)
-    while pass_by:
-        nearest = min(pass_by, key=lambda x: distance1(path[-1], x))
-        path.append(nearest)
-        pass_by.remove(nearest)
-    path = np.array(path)
-
-    # if there are any large jumps in distance, there is likely a mistake
-    # therefore, the points after this jump should be ignored
-    if 1:
-        dists = []
-        for i, point in enumerate(path):
-            if i < len(path) - 1:
-                dists.append(distance1(path[i], path[i + 1]))
-        jump_idx = []
-        for i, dist in enumerate(dists):
-            if dist > 5:
-                jump_idx.append(i)
-        if len(jump_idx) > 0:
-            path = path[: jump_idx[0]]
-
-    return path
-
-
 def prepare_hydrophobic(coords, xi=0.8, cluster=False, display=False):
     """takes an array (n,2) of coordinate points, and returns the left and right halfdrops of the contour.
     xi determines the minimum steepness on the reachability plot that constitutes a cluster boundary of the
@@ -844,11 +746,7 @@ def extract_edges_cv(img):
         )
         drop_profile = drop_profile[mask]
 
-    output = []
-    for coord in drop_profile:
-        if list(coord) not in output:
-            output.append(list(coord))
-    output = np.array(output)
+    output = unique_points(drop_profile)
     return output
 
 
@@ -878,8 +776,9 @@ def sim_bashforth_adams(h, a=1, b=1, num=500, all_the_way=False):
     """
     Simulates the full profile of the Bashforth-Adams droplet from the apex
 
-    Starts at x = +-1e-5, z = 0 and integrates to z = h along the curve
-    defined by the ``bashforth-adams`` function
+    Starts at x = 1e-5, z = 0 and integrates to z = h along the curve
+    defined by the ``bashforth-adams`` function. The left branch is the
+    mirror image of the right, so only the right branch is integrated.
 
     :param h: Height of the droplet in px
     :param a: Capillary length of the fluid
@@ -888,97 +787,29 @@ def sim_bashforth_adams(h, a=1, b=1, num=500, all_the_way=False):
     :param all_the_way: Boolean to determine whether to stop at z==h or ϕ==180
     :return: List of ϕ and (x, z) coordinates where the solver executed
     """
-
-    def height(t, y, a, b):
-        return y[1] - h
-
-    height.terminal = True
-    if all_the_way:
-        height.terminal = False
-
-    sol_l = solve_ivp(
-        bashforth_adams,
-        (0, -180),
-        (1e-5, 0),
-        args=(
-            a,
-            b,
-        ),
-        method="BDF",
-        t_eval=np.linspace(0, -180, num=num),
-        events=height,
-    )
-    sol_r = solve_ivp(
-        bashforth_adams,
-        (0, 180),
-        (1e-5, 0),
-        args=(
-            a,
-            b,
-        ),
-        method="BDF",
-        t_eval=np.linspace(0, 180, num=num),
-        events=height,
-    )
-
-    angles = np.hstack((sol_l.t, sol_r.t[::-1])).T
-    pred = np.vstack(
-        [
-            np.hstack((sol_l.y[0], sol_r.y[0][::-1])),
-            np.hstack((sol_l.y[1], sol_r.y[1][::-1])),
-        ]
-    ).T
-    if 1:  # DS
-        # print('angles: ', angles)
-        # Bo = (b*b)/(a*a)
-        # print('a is: ',a)
-        # print('b is: ',b)
-        # print('h is: ',h)
-        # *) # Bond number out by a factor of 18 for some reason
-        Bo = 18 * (b * b) / (a * a)
+    angles, pred = simulate_profile(h, a, b, num, all_the_way)
+    # Bond number out by a factor of 18 for some reason
+    Bo = 18 * (b * b) / (a * a)
     return angles, pred, Bo
 
 
-def fit_bashforth_adams(data):  # a=0.1,b= 3
+def fit_bashforth_adams(data, x0=None):
     """
     Calculates the best-fit capillary length and curvature at the apex given
     the provided data for the points on the edge of the droplet
 
     :param data: list of (x, y) points of the droplet edges
-    :param a: initial guess of capillary length
-    :param b: initial guess of curvature at the apex
-    :return: solution structure from scipy.opt.minimize
+    :param x0: initial guess of (capillary length, curvature at the apex),
+        by default found by fitting the interpolated profiles of the profile
+        library, which needs no integration
+    :return: solution structure from scipy.optimize.least_squares
     """
-
-    def calc_error(h, params):
-        """
-        Calulate the sum-squared error between the points on the curve and
-        the measured data points
-
-        :param h: Height of the droplet in pixels
-        :param params: tuple of capillary length and curvature at apex
-        :return: sum-squared error between points on the curve and data
-        """
-        a, b = params
-
-        _, pred, Bo = sim_bashforth_adams(h, a=a, b=b)
-
-        # print('a is: ',a)
-        # print('b is: ',b)
-
-        dist = distance.cdist(data, pred)
-        return np.linalg.norm(np.min(dist, axis=1))
-
-    h = np.max(data[:, 1])
-    b = h / 2
-    a = h / 10
-    x_0 = (a, b)
-    bounds = [[0, 10], [0, 100]]
-
-    optimum = opt.minimize(
-        lambda x: calc_error(h, x), x_0, method="Nelder-Mead", options={"disp": False}
-    )
-    return optimum
+    if x0 is None:
+        library = get_profile_library()
+        x0 = fit_profile(data, library.initial_guess(data), simulate=library.profile).x
+    # the integrated profile has the last word, so the library's
+    # interpolation error never reaches the result
+    return fit_profile(data, x0)
 
 
 def calculate_angle(v1, v2):
@@ -1168,23 +999,12 @@ def yl_fit_errors(contour, yl_points, display=False):
         YL fit.
     """
 
-    errors = []
-
-    for point in contour:
-        dist2edge, edge_point = yl_closest_point(
-            point[0], point[1], yl_points, display=display
-        )
-        errors.append(dist2edge)
-
-    error_measures = {}
+    errors = polyline_distances(contour, yl_points)
 
-    error_measures["MAE"] = sum([abs(error) for error in errors]) / len(errors)
-    error_measures["MSE"] = sum([error**2 for error in errors]) / len(errors)
-    error_measures["RMSE"] = np.sqrt(
-        sum([error**2 for error in errors]) / len(errors))
-    error_measures["Maximum error"] = max(errors)
+    if display:
+        print("YL fit errors: ", errors)
 
-    return error_measures
+    return error_measures(errors)
 
 
 def analyze_frame(img, lim=10, fit_type=FitType.BASHFORTH_ADAMS, display=False):
@@ -1428,9 +1248,14 @@ def analyze_frame(img, lim=10, fit_type=FitType.BASHFORTH_ADAMS, display=False):
     )
 
 
-def yl_fit(profile, lim=10, fit_type=FitType.BASHFORTH_ADAMS, display=False):
+def yl_fit(
+    profile, lim=10, fit_type=FitType.BASHFORTH_ADAMS, display=False, warm_start=None
+):
     """This is the function which must be called to perform the BA fit.
     For best results, preprocessing must be perfromed before calling this function.
+
+    ``warm_start``, a ``WarmStart``, starts the Bashforth-Adams fit from the
+    capillary length and apex curvature found on the previous frame.
     """
     # begin with method specific preprocessing of img data
     start_time = time.time()
@@ -1555,7 +1380,13 @@ def yl_fit(profile, lim=10, fit_type=FitType.BASHFORTH_ADAMS, display=False):
 
             if display:
                 print("Running Bashforth-Adams fit...\n")
-            cap_length, curv = fit_bashforth_adams(points).x
+            cap_length, curv = warm_fit(
+                warm_start,
+                lambda x0: fit_bashforth_adams(points, x0),
+                None,
+                cost=lambda result: 2 * result.cost / len(points),
+                params=lambda result: result.x,
+            ).x
             thetas, pred, Bo = sim_bashforth_adams(
                 h, cap_length, curv, profile.shape[0])
             phi["left"] = -np.min(thetas)
@@ -79,7 +79,7 @@ def test_bashforth_adams():
     assert len(result) == 2
 
 
-@patch("opendrop_ml.modules.fitting.BA_fit.solve_ivp")
+@patch("opendrop_ml.modules.fitting.BA_engine.solve_ivp")
 def test_sim_bashforth_adams(mock_solve_ivp):
     mock_solve_ivp.return_value = MagicMock(
         t=np.array([0, 1]), y=np.array([[1, 1], [2, 2]])
@@ -90,9 +90,11 @@ def test_sim_bashforth_adams(mock_solve_ivp):
     assert isinstance(Bo, float)
 
 
-@patch("opendrop_ml.modules.fitting.BA_fit.opt.minimize")
-def test_fit_bashforth_adams(mock_minimize, sample_profile):
-    mock_minimize.return_value = MagicMock(x=[1, 1])
+@patch("opendrop_ml.modules.fitting.BA_fit.get_profile_library")
+@patch("opendrop_ml.modules.fitting.BA_engine.least_squares")
+def test_fit_bashforth_adams(mock_least_squares, mock_library, sample_profile):
+    mock_least_squares.return_value = MagicMock(x=[1, 1])
+    mock_library.return_value.initial_guess.return_value = (1, 1)
     result = fit_bashforth_adams(sample_profile)
     assert isinstance(result, MagicMock)
 
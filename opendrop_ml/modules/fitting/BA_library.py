@@ -0,0 +1,181 @@
+"""Precomputed library of dimensionless Bashforth-Adams profiles.
+
+Scaled by the apex curvature ``b``, the profile only depends on
+``beta = (b / a)**2``, so a table of profiles over a grid of ``beta`` can
+stand in for the ODE solve: profiles are interpolated between neighbouring
+grid values and scaled by ``b``. The table is built once, saved under
+``~/OpenDrop/cache`` and loaded by later sessions.
+"""
+
+from opendrop_ml.modules.fitting.BA_engine import (
+    profile_distances,
+    simulate_branch,
+    simulate_profile,
+)
+
+from typing import Optional
+import numpy as np
+import threading
+import tempfile
+import zipfile
+import os
+
+LIBRARY_VERSION = 1
+BETA_RANGE = (1e-4, 100.0)
+BETA_SAMPLES = 96
+ANGLE_SAMPLES = 721
+GUESS_POINTS = 200
+
+_library = None
+_lock = threading.Lock()
+
+
+def library_path() -> str:
+    # (cross-platform)
+    return os.path.join(os.path.expanduser("~"), "OpenDrop", "cache", "ba_profiles.npz")
+
+
+class ProfileLibrary:
+    """Right-hand branches of the profile for ``b == 1``, sampled at the same
+    parametric angles for every ``beta``"""
+
+    def __init__(self, betas: np.ndarray, angles: np.ndarray, profiles: np.ndarray):
+        self.betas = betas
+        self.angles = angles
+        self.profiles = profiles
+        self._log_betas = np.log(betas)
+
+    @classmethod
+    def build(cls, betas=None, num=ANGLE_SAMPLES) -> "ProfileLibrary":
+        if betas is None:
+            betas = np.geomspace(*BETA_RANGE, BETA_SAMPLES)
+        profiles = np.empty((len(betas), num, 2))
+        for i, beta in enumerate(betas):
+            angles, profiles[i] = simulate_branch(
+                np.inf, 1 / np.sqrt(beta), 1.0, num, all_the_way=True
+            )
+        return cls(np.asarray(betas, dtype=float), angles, profiles)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ProfileLibrary"]:
+        """The library saved at ``path``, or None if it is missing, stale or
+        unreadable"""
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != LIBRARY_VERSION:
+                    return None
+                return cls(data["betas"], data["angles"], data["profiles"])
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            # a truncated file is rebuilt like a stale one
+            return None
+
+    def save(self, path: str):
+        """Write the library to ``path`` through a temporary file, so worker
+        processes saving at the same time never leave a partial file"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(path), suffix=".npz", delete=False
+        ) as f:
+            temp_path = f.name
+            try:
+                np.savez(
+                    f,
+                    version=LIBRARY_VERSION,
+                    betas=self.betas,
+                    angles=self.angles,
+                    profiles=self.profiles,
+                )
+            except BaseException:
+                f.close()
+                os.remove(temp_path)
+                raise
+        os.replace(temp_path, path)
+
+    def covers(self, a, b) -> bool:
+        return self.betas[0] <= (b / a) ** 2 <= self.betas[-1]
+
+    def branch(self, beta):
+        """Right-hand branch for ``b == 1``, interpolated linearly in log beta"""
+        position = np.interp(np.log(beta), self._log_betas, np.arange(len(self.betas)))
+        i = min(int(position), len(self.betas) - 2)
+        w = position - i
+        return (1 - w) * self.profiles[i] + w * self.profiles[i + 1]
+
+    def profile(self, h, a, b, num=500):
+        """Both branches of the profile, as returned by ``simulate_profile``.
+
+        Outside the range of the library the profile is integrated instead.
+        """
+        if not self.covers(a, b):
+            return simulate_profile(h, a, b, num)
+
+        unit = self.branch((b / a) ** 2)
+        angles = np.linspace(0, 180, num)
+        right = b * np.column_stack(
+            [
+                np.interp(angles, self.angles, unit[:, 0]),
+                np.interp(angles, self.angles, unit[:, 1]),
+            ]
+        )
+        below = right[:, 1] <= h
+        # the integration stops once the profile reaches the top of the drop
+        n = len(below) if below.all() else int(np.argmin(below))
+        angles, right = angles[:n], right[:n]
+        left = right * [-1, 1]
+        return np.hstack((-angles, angles[::-1])), np.vstack((left, right[::-1]))
+
+    def initial_guess(self, data):
+        """Estimate (a, b) for drop edge points with the apex at the origin.
+
+        For each library profile, ``b`` is chosen so that the profile passes
+        through the widest point near the top of the drop, and the profile
+        closest to the data is kept.
+        """
+        data = np.asarray(data, dtype=float)
+        h = np.max(data[:, 1])
+        top = data[data[:, 1] >= 0.95 * h]
+        width = np.max(np.abs(top[:, 0]))
+        # a subset of the points is enough to rank the candidates
+        data = data[:: max(1, len(data) // GUESS_POINTS)]
+
+        best, best_error = None, np.inf
+        for beta, unit in zip(self.betas, self.profiles):
+            # x / z falls from the apex outwards, find where it matches
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = unit[:, 0] / unit[:, 1]
+            matches = np.flatnonzero(ratio[1:] <= width / h)
+            if len(matches) == 0:
+                continue
+            b = h / unit[matches[0] + 1, 1]
+            pred = b * unit[: matches[0] + 2]
+            pred = np.vstack((pred[::-1] * [-1, 1], pred))
+            error = np.mean(profile_distances(data, pred) ** 2)
+            if error < best_error:
+                best, best_error = (b / np.sqrt(beta), b), error
+
+        if best is None:
+            return (h / 10, h / 2)
+        return best
+
+
+def get_profile_library(path: Optional[str] = None) -> ProfileLibrary:
+    """The profile library for this process, loaded from disk or built and
+    saved on first use"""
+    global _library
+    with _lock:
+        if _library is None:
+            path = path or library_path()
+            _library = ProfileLibrary.load(path)
+            if _library is None:
+                _library = ProfileLibrary.build()
+                try:
+                    _library.save(path)
+                except OSError as e:
+                    print(f"Could not save the Bashforth-Adams profile library: {e}")
+        return _library
+
+
+def clear_profile_library():
+    global _library
+    with _lock:
+        _library = None
@@ -0,0 +1,80 @@
+from opendrop_ml.modules.fitting import BA_library
+from opendrop_ml.modules.fitting.BA_engine import fit_profile, simulate_profile
+from opendrop_ml.modules.fitting.BA_fit import fit_bashforth_adams
+from opendrop_ml.modules.fitting.BA_library import ProfileLibrary
+
+import numpy as np
+import pytest
+import os
+
+
+@pytest.fixture(scope="module")
+def library():
+    return ProfileLibrary.build()
+
+
+@pytest.mark.parametrize("h, a, b", [(100, 10, 50), (60, 30, 40), (80, 15, 90)])
+def test_profile_matches_integration(library, h, a, b):
+    angles, pred = library.profile(h, a, b)
+    expected_angles, expected = simulate_profile(h, a, b)
+
+    assert len(pred) == len(expected)
+    np.testing.assert_allclose(angles, expected_angles)
+    np.testing.assert_allclose(pred, expected, atol=0.2)
+
+
+@pytest.mark.parametrize("a, b", [(10, 50), (15, 90)])
+def test_initial_guess_is_close(library, a, b):
+    _, pred = simulate_profile(100, a, b, num=2000)
+    guess = library.initial_guess(pred[::4])
+    np.testing.assert_allclose(guess, (a, b), rtol=0.1)
+
+
+@pytest.mark.parametrize("a, b", [(10, 50), (30, 40), (15, 90)])
+def test_fit_through_library_matches_integrated_fit(library, monkeypatch, a, b):
+    monkeypatch.setattr(BA_library, "_library", library)
+    _, pred = simulate_profile(100, a, b, num=2000)
+    data = pred[::5] + np.random.default_rng(0).normal(0, 0.3, pred[::5].shape)
+    data[:, 1] -= data[:, 1].min()
+
+    result = fit_bashforth_adams(data)
+    integrated = fit_profile(data, library.initial_guess(data))
+
+    # the library only moves the start of the integrated fit
+    assert result.cost <= integrated.cost * (1 + 1e-6)
+    np.testing.assert_allclose(result.x, (a, b), rtol=0.1)
+
+
+def test_library_saved_and_reloaded(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache" / "ba_profiles.npz")
+    monkeypatch.setattr(BA_library, "library_path", lambda: path)
+    BA_library.clear_profile_library()
+
+    built = BA_library.get_profile_library()
+    BA_library.clear_profile_library()
+    loaded = BA_library.get_profile_library()
+    BA_library.clear_profile_library()
+
+    assert built is not loaded
+    # nothing is left behind but the library itself
+    assert os.listdir(os.path.dirname(path)) == ["ba_profiles.npz"]
+    np.testing.assert_array_equal(built.profiles, loaded.profiles)
+    np.testing.assert_array_equal(built.betas, loaded.betas)
+
+
+def test_stale_library_is_ignored(tmp_path, monkeypatch):
+    path = str(tmp_path / "ba_profiles.npz")
+    ProfileLibrary.build(betas=[0.1, 1.0], num=10).save(path)
+    monkeypatch.setattr(BA_library, "LIBRARY_VERSION", BA_library.LIBRARY_VERSION + 1)
+    assert ProfileLibrary.load(path) is None
+
+
+def test_truncated_library_is_ignored(tmp_path):
+    path = str(tmp_path / "ba_profiles.npz")
+    ProfileLibrary.build(betas=[0.1, 1.0], num=10).save(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    for size in (0, len(data) // 2):
+        with open(path, "wb") as f:
+            f.write(data[:size])
+        assert ProfileLibrary.load(path) is None
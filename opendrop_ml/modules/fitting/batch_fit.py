@@ -0,0 +1,251 @@
+"""Algebraic fits of the drop contours of many frames at once.
+
+The tangent, polynomial, circle and ellipse fits all reduce to small linear
+least-squares problems, so the problems of every frame are set up from
+per-frame sums and solved together instead of one call at a time:
+
+- polynomials by least squares on stacked Vandermonde matrices,
+- circles by Taubin's method, from the moments of each contour,
+- ellipses by Halir and Flusser's stable form of the direct least-squares
+  fit, instead of the eigenproblem of ``inv(S) @ C`` in ``fit_ellipse``.
+
+Contours are centred and scaled frame by frame before they are fitted. The
+contact angles, intercepts and errors of each frame are then worked out as by
+the single-frame fits, whose results these functions return.
+"""
+
+from opendrop_ml.modules.fitting.circular_fit import circular_fit_result
+from opendrop_ml.modules.fitting.ellipse_fit import ell_parameters, ellipse_fit_result
+from opendrop_ml.modules.fitting.polynomial_fit import (
+    contact_regions,
+    polynomial_fit_result,
+)
+
+from typing import List, Sequence, Tuple
+from math import comb
+import numpy as np
+import time
+
+TAUBIN_ITERATIONS = 20
+TAUBIN_TOLERANCE = 1e-12
+
+# columns of the design matrices of the ellipse fit, as powers of (x, y)
+QUADRATIC_TERMS = ((2, 0), (1, 1), (0, 2))
+LINEAR_TERMS = ((1, 0), (0, 1), (0, 0))
+
+
+class ContourStack:
+    """The points of many contours, centred on the mean of their contour and
+    scaled to unit RMS distance from it"""
+
+    def __init__(self, contours: Sequence[np.ndarray]):
+        self.counts = np.array([len(contour) for contour in contours])
+        if len(self.counts) == 0 or (self.counts == 0).any():
+            raise ValueError("cannot fit an empty contour")
+        self.starts = np.concatenate(([0], np.cumsum(self.counts)[:-1]))
+        self.frames = np.repeat(np.arange(len(self.counts)), self.counts)
+
+        points = np.concatenate(contours).astype(float)
+        self.center = self.mean(points)
+        points = points - self.center[self.frames]
+        self.scale = np.sqrt(self.mean((points**2).sum(axis=1)) / 2)
+        self.scale[self.scale == 0] = 1
+        self.x, self.y = (points / self.scale[self.frames, None]).T
+
+    def __len__(self):
+        return len(self.counts)
+
+    def mean(self, values: np.ndarray) -> np.ndarray:
+        """Mean of ``values`` over the points of each contour"""
+        sums = np.add.reduceat(values, self.starts, axis=0)
+        return sums / self.counts.reshape((-1,) + (1,) * (values.ndim - 1))
+
+    def moments(self, degree: int):
+        """Means of ``x**i * y**j`` for ``i + j <= degree``, by (i, j)"""
+        x_powers = [np.ones_like(self.x)]
+        y_powers = [np.ones_like(self.y)]
+        for _ in range(degree):
+            x_powers.append(x_powers[-1] * self.x)
+            y_powers.append(y_powers[-1] * self.y)
+        return {
+            (i, j): self.mean(x_powers[i] * y_powers[j])
+            for i in range(degree + 1)
+            for j in range(degree + 1 - i)
+        }
+
+    def unscale(self, points: np.ndarray) -> np.ndarray:
+        """Points of each frame, (frames, 2), back in pixel coordinates"""
+        return points * self.scale[:, None] + self.center
+
+
+def taubin_centers(stack: ContourStack) -> np.ndarray:
+    """Centers of the circles fitted to each contour by Taubin's method.
+
+    Follows Chernov's CircleFitByTaubin, with the Newton iterations on the
+    characteristic polynomial run for all frames together.
+    """
+    m = stack.moments(4)
+    Mxx, Myy, Mxy = m[2, 0], m[0, 2], m[1, 1]
+    Mxz = m[3, 0] + m[1, 2]
+    Myz = m[2, 1] + m[0, 3]
+    Mzz = m[4, 0] + 2 * m[2, 2] + m[0, 4]
+
+    Mz = Mxx + Myy
+    Cov_xy = Mxx * Myy - Mxy**2
+    Var_z = Mzz - Mz**2
+    A3 = 4 * Mz
+    A2 = -3 * Mz**2 - Mzz
+    A1 = Var_z * Mz + 4 * Cov_xy * Mz - Mxz**2 - Myz**2
+    A0 = Mxz * (Mxz * Myy - Myz * Mxy) + Myz * (Myz * Mxx - Mxz * Mxy) - Var_z * Cov_xy
+
+    x = np.zeros(len(stack))
+    y = np.full(len(stack), np.inf)
+    active = np.ones(len(stack), dtype=bool)
+    for _ in range(TAUBIN_ITERATIONS):
+        y_new = A0 + x * (A1 + x * (A2 + x * A3))
+        # moving away from the root, fall back to x = 0
+        wrong_way = active & (np.abs(y_new) > np.abs(y))
+        x[wrong_way] = 0
+        active &= ~wrong_way
+
+        dy = A1 + x * (2 * A2 + x * 3 * A3)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_new = np.where(active, x - y_new / dy, x)
+            converged = np.abs((x_new - x) / x_new) < TAUBIN_TOLERANCE
+        x, y = x_new, np.where(active, y_new, y)
+        active &= ~converged
+        if not active.any():
+            break
+    # no convergence, or a negative root
+    x[active | ~(x >= 0)] = 0
+
+    det = x**2 - x * Mz + Cov_xy
+    center = np.column_stack(
+        [Mxz * (Myy - x) - Myz * Mxy, Myz * (Mxx - x) - Mxz * Mxy]
+    ) / (2 * det[:, None])
+    return stack.unscale(center)
+
+
+def halir_flusser_conics(stack: ContourStack) -> np.ndarray:
+    """Coefficients of the ellipses ``a x^2 + b xy + c y^2 + d x + e y + f``
+    fitted to each (scaled) contour by Halir and Flusser's direct
+    least-squares method, as (frames, 6)"""
+    m = stack.moments(4)
+
+    def scatter(rows, columns):
+        return np.stack(
+            [
+                np.stack([m[r[0] + c[0], r[1] + c[1]] for c in columns], axis=-1)
+                for r in rows
+            ],
+            axis=-2,
+        )
+
+    S1 = scatter(QUADRATIC_TERMS, QUADRATIC_TERMS)
+    S2 = scatter(QUADRATIC_TERMS, LINEAR_TERMS)
+    S3 = scatter(LINEAR_TERMS, LINEAR_TERMS)
+
+    T = -np.linalg.solve(S3, np.swapaxes(S2, 1, 2))
+    M = S1 + S2 @ T
+    # premultiply by the inverse of the constraint matrix
+    M = np.stack([M[:, 2] / 2, -M[:, 1], M[:, 0] / 2], axis=1)
+    _, vectors = np.linalg.eig(M)
+    vectors = vectors.real
+
+    # the ellipse is the eigenvector with 4ac - b^2 > 0
+    constraint = 4 * vectors[:, 0] * vectors[:, 2] - vectors[:, 1] ** 2
+    best = np.argmax(constraint, axis=1)
+    quadratic = vectors[np.arange(len(stack)), :, best]
+    linear = (T @ quadratic[:, :, None])[:, :, 0]
+    return np.hstack((quadratic, linear))
+
+
+def polynomial_coefficients(regions: np.ndarray, degree: int) -> np.ndarray:
+    """Least-squares polynomials through stacked contact regions.
+
+    :param regions: (frames, points, 2) contact regions, contact point first
+    :param degree: degree of the polynomials
+    :return: (frames, degree + 1) coefficients, highest power first as
+        returned by ``np.polyfit``
+    """
+    x, y = regions[:, :, 0], regions[:, :, 1]
+    # fitted in powers of (x - x0) / scale, which keeps the problem well
+    # conditioned
+    x0 = x[:, 0]
+    scale = np.abs(x - x0[:, None]).max(axis=1)
+    scale[scale == 0] = 1
+    u = (x - x0[:, None]) / scale[:, None]
+    vandermonde = u[:, :, None] ** np.arange(degree + 1)
+    c = (np.linalg.pinv(vandermonde) @ y[:, :, None])[:, :, 0]
+
+    # expand back into powers of x
+    coefficients = np.zeros_like(c)
+    for k in range(degree + 1):
+        for n in range(k + 1):
+            coefficients[:, n] += c[:, k] * comb(k, n) * (-x0) ** (k - n) / scale**k
+    return coefficients[:, ::-1]
+
+
+def _frame_start_times(n_frames: int, solve_start: float) -> List[float]:
+    """Start times giving each frame an equal share of the batch solve"""
+    share = (time.time() - solve_start) / n_frames
+    return [time.time() - share] * n_frames
+
+
+def batch_polynomial_fit(
+    profiles: Sequence[np.ndarray], num_points=15, polynomial_degree=2
+) -> List[Tuple]:
+    """``polynomial_fit`` of every profile, from one stacked solve"""
+    solve_start = time.time()
+    regions = [contact_regions(profile, num_points) for profile in profiles]
+    fits = [None] * len(regions)
+    full = [i for i, (pts1, pts2) in enumerate(regions) if len(pts1) == num_points]
+    if full:
+        stacked = np.stack([side for i in full for side in regions[i]])
+        coefficients = polynomial_coefficients(stacked, polynomial_degree)
+        for n, i in enumerate(full):
+            fits[i] = coefficients[2 * n], coefficients[2 * n + 1]
+    # profiles shorter than num_points cannot be stacked with the rest
+    for i, (pts1, pts2) in enumerate(regions):
+        if fits[i] is None:
+            fits[i] = (
+                np.polyfit(pts1[:, 0], pts1[:, 1], polynomial_degree),
+                np.polyfit(pts2[:, 0], pts2[:, 1], polynomial_degree),
+            )
+
+    start_times = _frame_start_times(len(profiles), solve_start)
+    return [
+        polynomial_fit_result(profile, pts1, pts2, *fit, start_time)
+        for profile, (pts1, pts2), fit, start_time in zip(
+            profiles, regions, fits, start_times
+        )
+    ]
+
+
+def batch_circular_fit(drops: Sequence[np.ndarray]) -> List[Tuple]:
+    """``circular_fit`` of every drop, with the circles found algebraically
+    by Taubin's method rather than by geometric least squares"""
+    solve_start = time.time()
+    centers = taubin_centers(ContourStack(drops))
+    start_times = _frame_start_times(len(drops), solve_start)
+    return [
+        circular_fit_result(drop, center, start_time)
+        for drop, center, start_time in zip(drops, centers, start_times)
+    ]
+
+
+def batch_ellipse_fit(drops: Sequence[np.ndarray]) -> List[Tuple]:
+    """``ellipse_fit`` of every drop, from one stacked solve"""
+    solve_start = time.time()
+    stack = ContourStack(drops)
+    ellipses = []
+    for conic, scale, center in zip(
+        halir_flusser_conics(stack), stack.scale, stack.center
+    ):
+        axes, phi_deg, t = ell_parameters(conic)
+        ellipses.append((axes * scale, phi_deg, t * scale + center))
+    start_times = _frame_start_times(len(drops), solve_start)
+    return [
+        ellipse_fit_result(drop, axes, phi_deg, t, start_time)
+        for drop, (axes, phi_deg, t), start_time in zip(drops, ellipses, start_times)
+    ]
@@ -0,0 +1,103 @@
+from opendrop_ml.modules.fitting.batch_fit import (
+    ContourStack,
+    batch_circular_fit,
+    batch_ellipse_fit,
+    batch_polynomial_fit,
+    polynomial_coefficients,
+    taubin_centers,
+)
+from opendrop_ml.modules.fitting.circular_fit import circular_fit
+from opendrop_ml.modules.fitting.ellipse_fit import ellipse_fit
+from opendrop_ml.modules.fitting.fits import perform_batch_fits
+from opendrop_ml.modules.fitting.polynomial_fit import polynomial_fit
+from opendrop_ml.utils.config import LEFT_ANGLE, RIGHT_ANGLE
+from opendrop_ml.utils.enums import FittingMethod
+
+import numpy as np
+import pytest
+import os
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "test_data", "test_drop_data.npz")
+
+
+@pytest.fixture(scope="module")
+def drop_contours():
+    """The test drop, shifted, enlarged and thinned out into frames of
+    different lengths"""
+    contour = np.load(TEST_DATA, allow_pickle=True)["drop_contour"]
+    return [contour, contour + [3, 1], contour * 1.1, contour[::2]]
+
+
+def test_polynomial_coefficients_match_polyfit():
+    rng = np.random.default_rng(0)
+    x = 200 + np.cumsum(rng.uniform(0.5, 1.5, (4, 15)), axis=1)
+    y = 0.01 * (x - 210) ** 2 - 3 * x + rng.normal(0, 0.5, x.shape)
+    regions = np.stack([x, y], axis=-1)
+
+    for degree in (1, 2):
+        coefficients = polynomial_coefficients(regions, degree)
+        for frame, c in zip(regions, coefficients):
+            np.testing.assert_allclose(
+                c, np.polyfit(frame[:, 0], frame[:, 1], degree), rtol=1e-6
+            )
+
+
+@pytest.mark.parametrize("degree", [1, 2])
+def test_batch_polynomial_fit_matches_single_fits(drop_contours, degree):
+    for contour, batch in zip(
+        drop_contours, batch_polynomial_fit(drop_contours, polynomial_degree=degree)
+    ):
+        single = polynomial_fit(contour, polynomial_degree=degree)
+        np.testing.assert_allclose(batch[0], single[0], atol=1e-6)
+        np.testing.assert_allclose(batch[1], single[1])
+        assert batch[3]["RMSE"] == pytest.approx(single[3]["RMSE"])
+
+
+def test_taubin_centers_of_exact_circles():
+    theta = np.linspace(0.3, 2.8, 60)
+    circles = [(150, -120, 100), (20, 30, 5), (-400, 800, 2000)]
+    contours = [
+        np.column_stack([a + r * np.cos(theta[::k]), b + r * np.sin(theta[::k])])
+        for k, (a, b, r) in enumerate(circles, start=1)
+    ]
+
+    centers = taubin_centers(ContourStack(contours))
+    np.testing.assert_allclose(centers, [c[:2] for c in circles], atol=1e-6)
+
+
+def test_batch_circular_fit_is_close_to_geometric_fit(drop_contours):
+    for contour, batch in zip(drop_contours, batch_circular_fit(drop_contours)):
+        single = circular_fit(contour)
+        np.testing.assert_allclose(batch[0], single[0], atol=1)
+        assert abs(batch[2] - single[2]) <= 1
+
+
+def test_batch_ellipse_fit_matches_single_fits(drop_contours):
+    for contour, batch in zip(drop_contours, batch_ellipse_fit(drop_contours)):
+        single = ellipse_fit(contour)
+        np.testing.assert_allclose(batch[0], single[0], atol=1e-6)
+        np.testing.assert_allclose(batch[2], single[2], rtol=1e-9)
+        np.testing.assert_allclose(batch[3], single[3], rtol=1e-9)
+
+
+def test_perform_batch_fits(drop_contours):
+    results = perform_batch_fits(
+        drop_contours, tangent=True, polynomial=True, circle=True, ellipse=True
+    )
+
+    assert len(results) == len(drop_contours)
+    for contact_angles in results:
+        assert set(contact_angles) == {
+            FittingMethod.TANGENT_FIT,
+            FittingMethod.POLYNOMIAL_FIT,
+            FittingMethod.CIRCLE_FIT,
+            FittingMethod.ELLIPSE_FIT,
+        }
+        for result in contact_angles.values():
+            assert {LEFT_ANGLE, RIGHT_ANGLE, "errors", "timings"} <= set(result)
+    assert perform_batch_fits([], circle=True) == []
+
+
+def test_empty_contour_is_rejected():
+    with pytest.raises(ValueError):
+        ContourStack([np.ones((5, 2)), np.empty((0, 2))])
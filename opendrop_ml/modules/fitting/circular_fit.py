@@ -8,9 +8,15 @@ Circular fit code taken from the most recent version of conan -
 conan-ML_cv1.1/modules/select_regions.py"""
 
 # Circular fit from the most recent version of conan - conan-ML_v1.1/modules/select_regions.py
+from opendrop_ml.modules.fitting.fit_errors import circle_distances, error_measures
+from opendrop_ml.modules.fitting.warm_start import warm_fit
 from opendrop_ml.utils.config import CV2_VERSION
-
-from sklearn.cluster import OPTICS  # for clustering algorithm
+from opendrop_ml.utils.contour import (
+    cluster_optics,
+    optimized_path as order_contour,
+    unique_points,
+)
+from opendrop_ml.utils.lazy import lazy_import
 
 # from scipy.spatial import distance
 # from scipy.integrate import solve_ivp
@@ -18,75 +24,13 @@ import scipy.optimize as opt
 
 # import numba
 import numpy as np
-import matplotlib.pyplot as plt
 
 # import matplotlib
 import cv2
 import math
 import time
 
-
-def cluster_optics(sample, out_style="coords", xi=None, eps=None, verbose=0):
-    """Takes an array (or list) of the form [[x1,y1],[x2,y2],...,[xn,yn]].
-    Clusters are outputted in the form of a dictionary.
-
-    If out_style='coords' each dictionary entry is a group, and points are outputted in coordinate form.
-    If out_xy='xy' there are two dictionary entries for each group, one labeled as nx and one as ny
-    (where n is the label of the group)
-
-    If xi (float between 0 and 1) is not None and eps is None, then the xi clustering method is used.
-    The optics algorithm defines clusters based on the minimum steepness on the reachability plot.
-    For example, an upwards point in the reachability plot is defined by the ratio from one point to
-    its successor being at most 1-xi.
-
-    If eps (float) is not None and xi is None, then the dbscan clustering method is used. Where eps is the
-    maximum distance between two samples for one to be considered as in the neighborhood of the other.
-
-    https://stackoverflow.com/questions/47974874/algorithm-for-grouping-points-in-given-distance
-    https://scikit-learn.org/stable/modules/generated/sklearn.cluster.OPTICS.html
-    """
-    if eps is not None and xi is None:
-        clustering = OPTICS(min_samples=2, cluster_method="dbscan", eps=eps).fit(
-            sample
-        )  # cluster_method changed to dbscan (so eps can be set)
-    elif xi is not None and eps is None:
-        # original had xi = 0.05, xi as 0.1 in function input
-        clustering = OPTICS(min_samples=2, xi=xi).fit(sample)
-    else:
-        raise ValueError(
-            "only one of eps and xi can be chosen but not neither nor both"
-        )
-    groups = list(set(clustering.labels_))
-
-    if verbose == 2:
-        print(clustering.labels_)
-    elif verbose == 1:
-        print(groups)
-
-    dic = {}
-    for n in groups:
-        if n not in dic:
-            dic[n] = []
-        for i in range(len(sample)):
-            if clustering.labels_[i] == n:
-                dic[n].append(sample[i])
-
-    # separate points and graph
-    dic2 = {}
-    for k in dic.keys():
-        x = []
-        y = []
-        for i in range(len(dic[k])):
-            x.append(dic[k][i][0])
-        dic2[str(k) + "x"] = x
-        for i in range(len(dic[k])):
-            y.append(dic[k][i][1])
-        dic2[str(k) + "y"] = y
-
-    if out_style == "coords":
-        return dic
-    elif out_style == "xy":
-        return dic2
+plt = lazy_import("matplotlib.pyplot")
 
 
 def distance1(p1, p2):
@@ -96,44 +40,9 @@ def distance1(p1, p2):
 
 
 def optimized_path(coords, start=None):
-    """This function finds the nearest point to a point
-    coords should be a list in this format coords = [ [x1, y1], [x2, y2] , ...]
-    https://stackoverflow.com/questions/45829155/sort-points-in-order-to-have-a-continuous-curve-using-python
-    """
-    if isinstance(coords, list) == False:
-        coords = coords.tolist()
-    if 0:
-        if isinstance(start, list) == False:
-            try:
-                start = start.tolist()
-            except:
-                start = list(start)
-    if start is None:
-        start = coords[0]
-    pass_by = coords
-    path = [start]
-    pass_by.remove(start)
-    while pass_by:
-        nearest = min(pass_by, key=lambda x: distance1(path[-1], x))
-        path.append(nearest)
-        pass_by.remove(nearest)
-    path = np.array(path)
-
-    # if there are any large jumps in distance, there is likely a mistake
-    # therefore, the points after this jump should be ignored
-    if 1:
-        dists = []
-        for i, point in enumerate(path):
-            if i < len(path) - 1:
-                dists.append(distance1(path[i], path[i + 1]))
-        jump_idx = []
-        for i, dist in enumerate(dists):
-            if dist > 5:
-                jump_idx.append(i)
-        if len(jump_idx) > 0:
-            path = path[: jump_idx[0]]
-
-    return path
+    """Order the contour points into a continuous path, ignoring the points
+    after the first jump of more than 5 pixels, as it is likely a mistake"""
+    return order_contour(coords, start, max_jump=5)
 
 
 def prepare_hydrophobic(coords, xi=0.8, cluster=False, display=False):
@@ -820,11 +729,7 @@ def extract_edges_cv(img):
         )
         drop_profile = drop_profile[mask]
 
-    output = []
-    for coord in drop_profile:
-        if list(coord) not in output:
-            output.append(list(coord))
-    output = np.array(output)
+    output = unique_points(drop_profile)
     return output
 
 
@@ -928,23 +833,12 @@ def circle_fit_errors(contour, h, k, r, display=False):
         fitted circle.
     """
 
-    errors = []
+    errors = circle_distances(contour, h, k, r)
 
-    for point in contour:
-        dist2edge, edge_point = circle_closest_point(
-            point[0], point[1], h, k, r, display=display
-        )
-        errors.append(dist2edge)
-
-    error_measures = {}
-
-    error_measures["MAE"] = sum([abs(error) for error in errors]) / len(errors)
-    error_measures["MSE"] = sum([error**2 for error in errors]) / len(errors)
-    error_measures["RMSE"] = np.sqrt(
-        sum([error**2 for error in errors]) / len(errors))
-    error_measures["Maximum error"] = max(errors)
+    if display:
+        print("Circle fit errors: ", errors)
 
-    return error_measures
+    return error_measures(errors)
 
 
 def circular_fit_img(img, display=False):
@@ -1104,26 +998,16 @@ def circular_fit_img(img, display=False):
     return CA, center_2, R_2, intercepts, errors, timings
 
 
-def circular_fit(drop, display=False):
+def circular_fit(drop, display=False, warm_start=None):
     """Call this function to perform the circular fit.
     For best results, peprocessing must be done before calling this function.
+
+    ``warm_start``, a ``WarmStart``, starts the fit from the center found on
+    the previous frame.
     """
     # begin with method specific preprocessing of img data
     start_time = time.time()
-    CPs = [drop[0], drop[-1]]
-    # of form [first y value of baseline, gradient]
-    a = [CPs[0][1], (CPs[1][1] - CPs[0][1]) / (CPs[1][0] - CPs[0][0])]
-
-    # define baseline as between the two contact points
-
     x, y = drop[:, 0], drop[:, 1]
-    rise = CPs[1][1] - CPs[0][1]
-    run = CPs[1][0] - CPs[0][0]
-    slope = rise / run
-    baseline = [(CPs[0][0], CPs[0][1]), slope]
-    c = CPs[0][1] - (slope * CPs[0][0])
-    baseline_x = np.linspace(1, max(drop[:, 0]), 100)
-    baseline_y = slope * baseline_x + c
 
     # Center estimates
     # x estimate is where between the lowest and highest points of the top section for a hydrophobic drop
@@ -1142,9 +1026,36 @@ def circular_fit(drop, display=False):
         return Ri - Ri.mean()
 
     center_estimate = x_m, y_m
-    center_2, ier = opt.leastsq(f_2, center_estimate)
+    center_2, ier = warm_fit(
+        warm_start,
+        lambda c: opt.leastsq(f_2, c),
+        center_estimate,
+        cost=lambda fit: np.mean(f_2(fit[0]) ** 2),
+        params=lambda fit: fit[0],
+    )
 
-    xc_2, yc_2 = center_2
+    return circular_fit_result(drop, center_2, start_time, display)
+
+
+def circular_fit_result(drop, center, start_time, display=False):
+    """Contact angles, intercepts and errors of the circle about ``center``
+    through ``drop``, in the form returned by ``circular_fit``"""
+    CPs = [drop[0], drop[-1]]
+    # of form [first y value of baseline, gradient]
+    a = [CPs[0][1], (CPs[1][1] - CPs[0][1]) / (CPs[1][0] - CPs[0][0])]
+
+    # define baseline as between the two contact points
+
+    x, y = drop[:, 0], drop[:, 1]
+    rise = CPs[1][1] - CPs[0][1]
+    run = CPs[1][0] - CPs[0][0]
+    slope = rise / run
+    baseline = [(CPs[0][0], CPs[0][1]), slope]
+    c = CPs[0][1] - (slope * CPs[0][0])
+    baseline_x = np.linspace(1, max(drop[:, 0]), 100)
+    baseline_y = slope * baseline_x + c
+
+    xc_2, yc_2 = center
     # Ri_2       = calc_R(*center_2)
     Ri_2 = np.sqrt((x - xc_2) ** 2 + (y - yc_2) ** 2)
     R_2 = Ri_2.mean()
@@ -4,9 +4,14 @@ contact angle analysis.
 This is base on the circular fit code taken from the most recent version
 of conan - conan-ML_cv1.1/modules/select_regions.py"""
 
+from opendrop_ml.modules.fitting.fit_errors import ellipse_distances, error_measures
 from opendrop_ml.utils.config import CV2_VERSION
+from opendrop_ml.utils.contour import (
+    cluster_optics,
+    optimized_path as order_contour,
+    unique_points,
+)
 
-from sklearn.cluster import OPTICS  # for clustering algorithm
 from skimage.measure import EllipseModel
 from matplotlib.patches import Ellipse
 import numpy as np
@@ -16,71 +21,6 @@ import math
 import time
 
 
-def cluster_optics(sample, out_style="coords", xi=None, eps=None, verbose=0):
-    """Takes an array (or list) of the form [[x1,y1],[x2,y2],...,[xn,yn]].
-    Clusters are outputted in the form of a dictionary.
-
-    If out_style='coords' each dictionary entry is a group, and points are outputted in coordinate form.
-    If out_xy='xy' there are two dictionary entries for each group, one labeled as nx and one as ny
-    (where n is the label of the group)
-
-    If xi (float between 0 and 1) is not None and eps is None, then the xi clustering method is used.
-    The optics algorithm defines clusters based on the minimum steepness on the reachability plot.
-    For example, an upwards point in the reachability plot is defined by the ratio from one point to
-    its successor being at most 1-xi.
-
-    If eps (float) is not None and xi is None, then the dbscan clustering method is used. Where eps is the
-    maximum distance between two samples for one to be considered as in the neighborhood of the other.
-
-    https://stackoverflow.com/questions/47974874/algorithm-for-grouping-points-in-given-distance
-    https://scikit-learn.org/stable/modules/generated/sklearn.cluster.OPTICS.html
-    """
-    if eps != None and xi == None:
-        clustering = OPTICS(min_samples=2, cluster_method="dbscan", eps=eps).fit(
-            sample
-        )  # cluster_method changed to dbscan (so eps can be set)
-    elif xi != None and eps == None:
-        # original had xi = 0.05, xi as 0.1 in function input
-        clustering = OPTICS(min_samples=2, xi=xi).fit(sample)
-    else:
-        raise ValueError(
-            "only one of eps and xi can be chosen but not neither nor both"
-        )
-    groups = list(set(clustering.labels_))
-
-    if verbose == 2:
-        print(clustering.labels_)
-    elif verbose == 1:
-        print(groups)
-    elif verbose == 0:
-        pass
-
-    dic = {}
-    for n in groups:
-        if n not in dic:
-            dic[n] = []
-        for i in range(len(sample)):
-            if clustering.labels_[i] == n:
-                dic[n].append(sample[i])
-
-    # separate points and graph
-    dic2 = {}
-    for k in dic.keys():
-        x = []
-        y = []
-        for i in range(len(dic[k])):
-            x.append(dic[k][i][0])
-        dic2[str(k) + "x"] = x
-        for i in range(len(dic[k])):
-            y.append(dic[k][i][1])
-        dic2[str(k) + "y"] = y
-
-    if out_style == "coords":
-        return dic
-    elif out_style == "xy":
-        return dic2
-
-
 def distance1(P1, P2):
     """This function computes the distance between 2 points defined by
     P1 = (x1,y1) and P2 = (x2,y2)"""
@@ -88,44 +28,9 @@ def distance1(P1, P2):
 
 
 def optimized_path(coords, start=None):
-    """This function finds the nearest point to a point
-    coords should be a list in this format coords = [ [x1, y1], [x2, y2] , ...]
-    https://stackoverflow.com/questions/45829155/sort-points-in-order-to-have-a-continuous-curve-using-python
-    """
-    if isinstance(coords, list) == False:
-        coords = coords.tolist()
-    if 0:
-        if isinstance(start, list) == False:
-            try:
-                start = start.tolist()
-            except:
-                start = list(start)
-    if start is None:
-        start = coords[0]
-    pass_by = coords
-    path = [start]
-    pass_by.remove(start)
-    while pass_by:
-        nearest = min(pass_by, key=lambda x: distance1(path[-1], x))
-        path.append(nearest)
-        pass_by.remove(nearest)
-    path = np.array(path)
-
-    # if there are any large jumps in distance, there is likely a mistake
-    # therefore, the points after this jump should be ignored
-    if 1:
-        dists = []
-        for i, point in enumerate(path):
-            if i < len(path) - 1:
-                dists.append(distance1(path[i], path[i + 1]))
-        jump_idx = []
-        for i, dist in enumerate(dists):
-            if dist > 5:
-                jump_idx.append(i)
-        if len(jump_idx) > 0:
-            path = path[: jump_idx[0]]
-
-    return path
+    """Order the contour points into a continuous path, ignoring the points
+    after the first jump of more than 5 pixels, as it is likely a mistake"""
+    return order_contour(coords, start, max_jump=5)
 
 
 def prepare_hydrophobic(coords, xi=0.8, cluster=False, display=False):
@@ -804,11 +709,7 @@ def extract_edges_CV(img):
         )
         drop_profile = drop_profile[mask]
 
-    output = []
-    for coord in drop_profile:
-        if list(coord) not in output:
-            output.append(list(coord))
-    output = np.array(output)
+    output = unique_points(drop_profile)
     return output
 
 
@@ -1042,23 +943,12 @@ def ellipse_fit_errors(contour, h, k, a, b, theta, display):
         fitted ellipse.
     """
 
-    errors = []
+    errors = ellipse_distances(contour, h, k, a, b, theta)
 
-    for point in contour:
-        dist2edge, edge_point = ellipse_closest_point(
-            point[0], point[1], h, k, a, b, theta
-        )
-        errors.append(dist2edge)
-
-    error_measures = {}
-
-    error_measures["MAE"] = sum([abs(error) for error in errors]) / len(errors)
-    error_measures["MSE"] = sum([error**2 for error in errors]) / len(errors)
-    error_measures["RMSE"] = np.sqrt(
-        sum([error**2 for error in errors]) / len(errors))
-    error_measures["Maximum error"] = max(errors)
+    if display:
+        print("Ellipse fit errors: ", errors)
 
-    return error_measures
+    return error_measures(errors)
 
 
 def ellipse_fit_img(img, display=False):
@@ -0,0 +1,79 @@
+"""Residuals of the fitted contact angle curves against the drop contour.
+
+Each ``*_distances`` function returns, for every contour point, the distance
+to the fitted curve, computed for all points at once. ``error_measures``
+turns those distances into the MAE, MSE, RMSE and maximum error reported by
+the fitting modules.
+"""
+
+from scipy.spatial import cKDTree
+import numpy as np
+
+# samples per point used to bracket the closest point on an ellipse before
+# it is refined with Newton's method
+_ELLIPSE_SEED_SAMPLES = 64
+_ELLIPSE_NEWTON_ITERATIONS = 6
+
+
+def error_measures(distances, suffix=""):
+    """The MAE, MSE, RMSE and maximum error of ``distances``.
+
+    ``suffix`` is appended to each key, e.g. ``" left"`` gives ``"MAE left"``.
+    """
+    distances = np.abs(np.asarray(distances, dtype=float))
+    mse = float(np.mean(distances**2))
+    return {
+        "MAE" + suffix: float(np.mean(distances)),
+        "MSE" + suffix: mse,
+        "RMSE" + suffix: float(np.sqrt(mse)),
+        "Maximum error" + suffix: float(np.max(distances)),
+    }
+
+
+def circle_distances(points, h, k, r):
+    """Exact distance of each point to the circle centred at (h, k)"""
+    points = np.asarray(points, dtype=float)
+    return np.abs(np.hypot(points[:, 0] - h, points[:, 1] - k) - r)
+
+
+def ellipse_distances(points, h, k, a, b, theta):
+    """Distance of each point to the ellipse centred at (h, k) with semi-axes
+    a and b, rotated by theta degrees.
+
+    The closest point is first located on a coarse sampling of the ellipse
+    and then refined with Newton's method on the ellipse parameter.
+    """
+    points = np.asarray(points, dtype=float)
+    th = np.deg2rad(theta)
+    dx, dy = points[:, 0] - h, points[:, 1] - k
+    # points in the frame of the ellipse, where it is (a cos t, b sin t)
+    u = dx * np.cos(th) + dy * np.sin(th)
+    v = -dx * np.sin(th) + dy * np.cos(th)
+
+    seeds = np.linspace(0, 2 * np.pi, _ELLIPSE_SEED_SAMPLES, endpoint=False)
+    seed_dist2 = (a * np.cos(seeds) - u[:, None]) ** 2 + (
+        b * np.sin(seeds) - v[:, None]
+    ) ** 2
+    t = seeds[np.argmin(seed_dist2, axis=1)]
+
+    for _ in range(_ELLIPSE_NEWTON_ITERATIONS):
+        cos_t, sin_t = np.cos(t), np.sin(t)
+        # first and second derivatives of half the squared distance
+        g = (b**2 - a**2) * sin_t * cos_t + u * a * sin_t - v * b * cos_t
+        dg = (b**2 - a**2) * (cos_t**2 - sin_t**2) + u * a * cos_t + v * b * sin_t
+        # only step where the distance is locally convex, so Newton heads to
+        # a minimum rather than a maximum
+        step = np.where(dg > 0, g / np.where(dg > 0, dg, 1), 0)
+        t = t - np.clip(
+            step, -np.pi / _ELLIPSE_SEED_SAMPLES, np.pi / _ELLIPSE_SEED_SAMPLES
+        )
+
+    return np.hypot(a * np.cos(t) - u, b * np.sin(t) - v)
+
+
+def polyline_distances(points, curve_points):
+    """Distance of each point to the nearest of ``curve_points``"""
+    distances, _ = cKDTree(np.asarray(curve_points, dtype=float)).query(
+        np.asarray(points, dtype=float)
+    )
+    return distances
@@ -0,0 +1,54 @@
+from opendrop_ml.modules.fitting.fit_errors import (
+    circle_distances,
+    ellipse_distances,
+    error_measures,
+    polyline_distances,
+)
+from opendrop_ml.modules.fitting.ellipse_fit import ellipse_closest_point
+from opendrop_ml.modules.fitting.BA_fit import yl_closest_point
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def noisy_points():
+    rng = np.random.default_rng(0)
+    return rng.uniform(-60, 60, (200, 2)) + [120, 80]
+
+
+def test_error_measures():
+    errors = error_measures([1, -2, 3], " left")
+    assert errors == pytest.approx(
+        {
+            "MAE left": 2,
+            "MSE left": 14 / 3,
+            "RMSE left": np.sqrt(14 / 3),
+            "Maximum error left": 3,
+        }
+    )
+
+
+def test_circle_distances_are_exact():
+    points = np.array([[10, 0], [0, 3], [-8, 0], [3, 4]])
+    np.testing.assert_allclose(circle_distances(points, 0, 0, 5), [5, 2, 3, 0])
+
+
+@pytest.mark.parametrize("theta", [0, 30, 125])
+def test_ellipse_distances_match_dense_sampling(noisy_points, theta):
+    h, k, a, b = 120, 80, 50, 30
+    # dense sampling is slow, a few dozen points are enough
+    points = noisy_points[:30]
+    expected = [
+        ellipse_closest_point(x, y, h, k, a, b, theta, n=20000)[0] for x, y in points
+    ]
+    np.testing.assert_allclose(
+        ellipse_distances(points, h, k, a, b, theta), expected, atol=1e-2
+    )
+
+
+def test_polyline_distances_match_closest_point(noisy_points):
+    t = np.linspace(0, np.pi, 300)
+    curve = np.column_stack([120 + 40 * np.cos(t), 80 + 40 * np.sin(t)])
+    expected = [yl_closest_point(x, y, curve)[0] for x, y in noisy_points]
+    np.testing.assert_allclose(polyline_distances(noisy_points, curve), expected)
@@ -1,12 +1,17 @@
 #!/usr/bin/env python
 # coding=utf-8
 from opendrop_ml.modules.core.classes import ExperimentalDrop
+from opendrop_ml.modules.fitting.warm_start import WarmStarts
 from opendrop_ml.utils.config import LEFT_ANGLE, RIGHT_ANGLE
 from opendrop_ml.utils.enums import FittingMethod
+from opendrop_ml.utils.profiling import timed
+from typing import Dict, List, Optional, Sequence
+import numpy as np
 
 # from __future__ import print_function
 
 
+@timed("perform_fits")
 def perform_fits(
     experimental_drop: ExperimentalDrop,
     tangent=False,
@@ -14,140 +19,42 @@ def perform_fits(
     circle=False,
     ellipse=False,
     yl=False,
+    warm_starts: Optional[WarmStarts] = None,
 ):
+    # the iterative fits start from the previous frame's parameters if given
+    # the warm starts of a time series
     if tangent == True:
         from opendrop_ml.modules.fitting.polynomial_fit import polynomial_fit
 
-        tangent_angles, tangent_CPs, tangent_lines, tangent_errors, tangent_timings = (
-            polynomial_fit(experimental_drop.drop_contour, polynomial_degree=1)
+        experimental_drop.contact_angles[FittingMethod.TANGENT_FIT] = polynomial_result(
+            *polynomial_fit(experimental_drop.drop_contour, polynomial_degree=1)
         )
-        experimental_drop.contact_angles[FittingMethod.TANGENT_FIT] = {}
-        experimental_drop.contact_angles[FittingMethod.TANGENT_FIT][LEFT_ANGLE] = (
-            tangent_angles[0]
-        )
-        experimental_drop.contact_angles[FittingMethod.TANGENT_FIT][RIGHT_ANGLE] = (
-            tangent_angles[1]
-        )
-        experimental_drop.contact_angles[FittingMethod.TANGENT_FIT][
-            "contact points"
-        ] = tangent_CPs
-        experimental_drop.contact_angles[FittingMethod.TANGENT_FIT][
-            "tangent lines"
-        ] = tangent_lines
-        experimental_drop.contact_angles[FittingMethod.TANGENT_FIT][
-            "errors"
-        ] = tangent_errors
-        experimental_drop.contact_angles[FittingMethod.TANGENT_FIT][
-            "timings"
-        ] = tangent_timings
 
     if polynomial == True:
         from opendrop_ml.modules.fitting.polynomial_fit import polynomial_fit
 
-        (
-            polynomial_angles,
-            polynomial_CPs,
-            polynomial_lines,
-            polynomial_errors,
-            polynomial_timings,
-        ) = polynomial_fit(experimental_drop.drop_contour, polynomial_degree=2)
-        experimental_drop.contact_angles[FittingMethod.POLYNOMIAL_FIT] = {}
-        experimental_drop.contact_angles[FittingMethod.POLYNOMIAL_FIT][LEFT_ANGLE] = (
-            polynomial_angles[0]
-        )
-        experimental_drop.contact_angles[FittingMethod.POLYNOMIAL_FIT][RIGHT_ANGLE] = (
-            polynomial_angles[1]
+        experimental_drop.contact_angles[FittingMethod.POLYNOMIAL_FIT] = (
+            polynomial_result(
+                *polynomial_fit(experimental_drop.drop_contour, polynomial_degree=2)
+            )
         )
-        experimental_drop.contact_angles[FittingMethod.POLYNOMIAL_FIT][
-            "contact points"
-        ] = polynomial_CPs
-        experimental_drop.contact_angles[FittingMethod.POLYNOMIAL_FIT][
-            "tangent lines"
-        ] = polynomial_lines
-        experimental_drop.contact_angles[FittingMethod.POLYNOMIAL_FIT][
-            "errors"
-        ] = polynomial_errors
-        experimental_drop.contact_angles[FittingMethod.POLYNOMIAL_FIT][
-            "timings"
-        ] = polynomial_timings
 
     if circle == True:
         from opendrop_ml.modules.fitting.circular_fit import circular_fit
 
-        (
-            circle_angles,
-            circle_center,
-            circle_radius,
-            circle_intercepts,
-            circle_errors,
-            circle_timings,
-        ) = circular_fit(experimental_drop.drop_contour)
-        experimental_drop.contact_angles[FittingMethod.CIRCLE_FIT] = {}
-        experimental_drop.contact_angles[FittingMethod.CIRCLE_FIT][LEFT_ANGLE] = (
-            circle_angles[0]
-        )
-        experimental_drop.contact_angles[FittingMethod.CIRCLE_FIT][RIGHT_ANGLE] = (
-            circle_angles[1]
+        experimental_drop.contact_angles[FittingMethod.CIRCLE_FIT] = circle_result(
+            *circular_fit(
+                experimental_drop.drop_contour,
+                warm_start=warm_starts.get("circle") if warm_starts else None,
+            )
         )
-        experimental_drop.contact_angles[FittingMethod.CIRCLE_FIT][
-            "baseline intercepts"
-        ] = circle_intercepts
-        experimental_drop.contact_angles[FittingMethod.CIRCLE_FIT][
-            "circle center"
-        ] = circle_center
-        experimental_drop.contact_angles[FittingMethod.CIRCLE_FIT][
-            "circle radius"
-        ] = circle_radius
-        experimental_drop.contact_angles[FittingMethod.CIRCLE_FIT][
-            "errors"
-        ] = circle_errors
-        experimental_drop.contact_angles[FittingMethod.CIRCLE_FIT][
-            "timings"
-        ] = circle_timings
 
     if ellipse == True:
         from opendrop_ml.modules.fitting.ellipse_fit import ellipse_fit
 
-        (
-            ellipse_angles,
-            ellipse_intercepts,
-            ellipse_center,
-            ellipse_ab,
-            ellipse_rotation,
-            ellipse_errors,
-            ellipse_timings,
-        ) = ellipse_fit(experimental_drop.drop_contour)
-
-        if ellipse_angles and len(ellipse_angles) == 2:
-            experimental_drop.contact_angles[FittingMethod.ELLIPSE_FIT] = {}
-            experimental_drop.contact_angles[FittingMethod.ELLIPSE_FIT][LEFT_ANGLE] = (
-                ellipse_angles[0]
-            )
-            experimental_drop.contact_angles[FittingMethod.ELLIPSE_FIT][RIGHT_ANGLE] = (
-                ellipse_angles[1]
-            )
-            experimental_drop.contact_angles[FittingMethod.ELLIPSE_FIT][
-                "baseline intercepts"
-            ] = ellipse_intercepts
-            experimental_drop.contact_angles[FittingMethod.ELLIPSE_FIT][
-                "ellipse center"
-            ] = ellipse_center
-            experimental_drop.contact_angles[FittingMethod.ELLIPSE_FIT][
-                "ellipse a and b"
-            ] = ellipse_ab
-            experimental_drop.contact_angles[FittingMethod.ELLIPSE_FIT][
-                "ellipse rotation"
-            ] = ellipse_rotation
-            experimental_drop.contact_angles[FittingMethod.ELLIPSE_FIT][
-                "errors"
-            ] = ellipse_errors
-            experimental_drop.contact_angles[FittingMethod.ELLIPSE_FIT][
-                "timings"
-            ] = ellipse_timings
-        else:
-            print(
-                "Warning: ellipse_fit failed or returned incomplete results. Skipping ELLIPSE_FIT."
-            )
+        result = ellipse_result(*ellipse_fit(experimental_drop.drop_contour))
+        if result is not None:
+            experimental_drop.contact_angles[FittingMethod.ELLIPSE_FIT] = result
 
     if yl:
         from opendrop_ml.modules.fitting.BA_fit import yl_fit
@@ -162,7 +69,10 @@ def perform_fits(
             yl_errors,
             sym_errors,
             yl_timings,
-        ) = yl_fit(experimental_drop.drop_contour)
+        ) = yl_fit(
+            experimental_drop.drop_contour,
+            warm_start=warm_starts.get("yl") if warm_starts else None,
+        )
         experimental_drop.contact_angles[FittingMethod.YL_FIT] = {}
         experimental_drop.contact_angles[FittingMethod.YL_FIT][LEFT_ANGLE] = yl_angles[
             0
@@ -182,3 +92,113 @@ def perform_fits(
             "symmetry errors"
         ] = sym_errors
         experimental_drop.contact_angles[FittingMethod.YL_FIT]["timings"] = yl_timings
+
+
+@timed("perform_batch_fits")
+def perform_batch_fits(
+    drop_contours: Sequence[np.ndarray],
+    tangent=False,
+    polynomial=False,
+    circle=False,
+    ellipse=False,
+) -> List[Dict]:
+    """The algebraic fits of many frames' drop contours, solved together.
+
+    Returns the ``contact_angles`` entries of each frame, as ``perform_fits``
+    would set them. Circles are fitted by Taubin's method, which agrees with
+    the geometric fit of ``circular_fit`` to a fraction of a degree on drop
+    contours.
+    """
+    from opendrop_ml.modules.fitting.batch_fit import (
+        batch_circular_fit,
+        batch_ellipse_fit,
+        batch_polynomial_fit,
+    )
+
+    results = [{} for _ in drop_contours]
+    if not results:
+        return results
+
+    fits = []
+    if tangent:
+        fits.append(
+            (
+                FittingMethod.TANGENT_FIT,
+                polynomial_result,
+                batch_polynomial_fit(drop_contours, polynomial_degree=1),
+            )
+        )
+    if polynomial:
+        fits.append(
+            (
+                FittingMethod.POLYNOMIAL_FIT,
+                polynomial_result,
+                batch_polynomial_fit(drop_contours, polynomial_degree=2),
+            )
+        )
+    if circle:
+        fits.append(
+            (FittingMethod.CIRCLE_FIT, circle_result, batch_circular_fit(drop_contours))
+        )
+    if ellipse:
+        fits.append(
+            (
+                FittingMethod.ELLIPSE_FIT,
+                ellipse_result,
+                batch_ellipse_fit(drop_contours),
+            )
+        )
+
+    for method, to_result, frame_fits in fits:
+        for contact_angles, fit in zip(results, frame_fits):
+            result = to_result(*fit)
+            if result is not None:
+                contact_angles[method] = result
+    return results
+
+
+def polynomial_result(angles, CPs, lines, errors, timings) -> Dict:
+    """Entry of a tangent or polynomial fit in ``contact_angles``"""
+    return {
+        LEFT_ANGLE: angles[0],
+        RIGHT_ANGLE: angles[1],
+        "contact points": CPs,
+        "tangent lines": lines,
+        "errors": errors,
+        "timings": timings,
+    }
+
+
+def circle_result(angles, center, radius, intercepts, errors, timings) -> Dict:
+    """Entry of a circle fit in ``contact_angles``"""
+    return {
+        LEFT_ANGLE: angles[0],
+        RIGHT_ANGLE: angles[1],
+        "baseline intercepts": intercepts,
+        "circle center": center,
+        "circle radius": radius,
+        "errors": errors,
+        "timings": timings,
+    }
+
+
+def ellipse_result(
+    angles, intercepts, center, ab, rotation, errors, timings
+) -> Optional[Dict]:
+    """Entry of an ellipse fit in ``contact_angles``, or None if the fit
+    failed"""
+    if not (angles and len(angles) == 2):
+        print(
+            "Warning: ellipse_fit failed or returned incomplete results. Skipping ELLIPSE_FIT."
+        )
+        return None
+    return {
+        LEFT_ANGLE: angles[0],
+        RIGHT_ANGLE: angles[1],
+        "baseline intercepts": intercepts,
+        "ellipse center": center,
+        "ellipse a and b": ab,
+        "ellipse rotation": rotation,
+        "errors": errors,
+        "timings": timings,
+    }
@@ -9,9 +9,17 @@ conan-ML_cv1.1/modules/select_regions.py"""
 
 # Polynomial fit from the most recent version of conan - conan-ML_v1.1/modules/select_regions.py
 
+from opendrop_ml.modules.fitting.fit_errors import (
+    error_measures as fit_error_measures,
+    polyline_distances,
+)
 from opendrop_ml.utils.config import CV2_VERSION
-
-from sklearn.cluster import OPTICS  # for clustering algorithm
+from opendrop_ml.utils.contour import (
+    cluster_optics,
+    optimized_path as order_contour,
+    unique_points,
+)
+from opendrop_ml.utils.lazy import lazy_import
 
 # from scipy.spatial import distance
 # from scipy.integrate import solve_ivp
@@ -19,72 +27,10 @@ from sklearn.cluster import OPTICS  # for clustering algorithm
 # import numba
 # import math
 import numpy as np
-import matplotlib.pyplot as plt
 import cv2
 import time
 
-
-def cluster_optics(sample, out_style="coords", xi=None, eps=None, verbose=0):
-    """Takes an array (or list) of the form [[x1,y1],[x2,y2],...,[xn,yn]].
-    Clusters are outputted in the form of a dictionary.
-
-    If out_style='coords' each dictionary entry is a group, and points are outputted in coordinate form.
-    If out_xy='xy' there are two dictionary entries for each group, one labeled as nx and one as ny
-    (where n is the label of the group)
-
-    If xi (float between 0 and 1) is not None and eps is None, then the xi clustering method is used.
-    The optics algorithm defines clusters based on the minimum steepness on the reachability plot.
-    For example, an upwards point in the reachability plot is defined by the ratio from one point to
-    its successor being at most 1-xi.
-
-    If eps (float) is not None and xi is None, then the dbscan clustering method is used. Where eps is the
-    maximum distance between two samples for one to be considered as in the neighborhood of the other.
-
-    https://stackoverflow.com/questions/47974874/algorithm-for-grouping-points-in-given-distance
-    https://scikit-learn.org/stable/modules/generated/sklearn.cluster.OPTICS.html
-    """
-    if eps is not None and xi is None:
-        clustering = OPTICS(min_samples=2, cluster_method="dbscan", eps=eps).fit(
-            sample
-        )  # cluster_method changed to dbscan (so eps can be set)
-    elif xi is not None and eps is None:
-        # original had xi = 0.05, xi as 0.1 in function input
-        clustering = OPTICS(min_samples=2, xi=xi).fit(sample)
-    else:
-        raise ValueError(
-            "only one of eps and xi can be chosen but not neither nor both"
-        )
-    groups = list(set(clustering.labels_))
-
-    if verbose == 2:
-        print(clustering.labels_)
-    elif verbose == 1:
-        print(groups)
-
-    dic = {}
-    for n in groups:
-        if n not in dic:
-            dic[n] = []
-        for i in range(len(sample)):
-            if clustering.labels_[i] == n:
-                dic[n].append(sample[i])
-
-    # separate points and graph
-    dic2 = {}
-    for k in dic.keys():
-        x = []
-        y = []
-        for i in range(len(dic[k])):
-            x.append(dic[k][i][0])
-        dic2[str(k) + "x"] = x
-        for i in range(len(dic[k])):
-            y.append(dic[k][i][1])
-        dic2[str(k) + "y"] = y
-
-    if out_style == "coords":
-        return dic
-    elif out_style == "xy":
-        return dic2
+plt = lazy_import("matplotlib.pyplot")
 
 
 def distance1(p1, p2):
@@ -94,44 +40,9 @@ def distance1(p1, p2):
 
 
 def optimized_path(coords, start=None):
-    """This function finds the nearest point to a point
-    coords should be a list in this format coords = [ [x1, y1], [x2, y2] , ...]
-    https://stackoverflow.com/questions/45829155/sort-points-in-order-to-have-a-continuous-curve-using-python
-    """
-    if isinstance(coords, list) == False:
-        coords = coords.tolist()
-    if 0:
-        if isinstance(start, list) == False:
-            try:
-                start = start.tolist()
-            except:
-                start = list(start)
-    if start is None:
-        start = coords[0]
-    pass_by = coords
-    path = [start]
-    pass_by.remove(start)
-    while pass_by:
-        nearest = min(pass_by, key=lambda x: distance1(path[-1], x))
-        path.append(nearest)
-        pass_by.remove(nearest)
-    path = np.array(path)
-
-    # if there are any large jumps in distance, there is likely a mistake
-    # therefore, the points after this jump should be ignored
-    if 1:
-        dists = []
-        for i, point in enumerate(path):
-            if i < len(path) - 1:
-                dists.append(distance1(path[i], path[i + 1]))
-        jump_idx = []
-        for i, dist in enumerate(dists):
-            if dist > 5:
-                jump_idx.append(i)
-        if len(jump_idx) > 0:
-            path = path[: jump_idx[0]]
-
-    return path
+    """Order the contour points into a continuous path, ignoring the points
+    after the first jump of more than 5 pixels, as it is likely a mistake"""
+    return order_contour(coords, start, max_jump=5)
 
 
 def prepare_hydrophobic(coords, xi=0.8, cluster=False, display=False):
@@ -813,11 +724,7 @@ def extract_edges_CV(img):
         )
         drop_profile = drop_profile[mask]
 
-    output = []
-    for coord in drop_profile:
-        if list(coord) not in output:
-            output.append(list(coord))
-    output = np.array(output)
+    output = unique_points(drop_profile)
     return output
 
 
@@ -885,64 +792,26 @@ def polynomial_fit_errors(pts1, pts2, fit_left, fit_right, display=False):
     """
     highresx_left = np.linspace(pts1[0, 0], pts1[-1, 0], 5 * pts1.shape[0])
     highresx_right = np.linspace(pts2[0, 0], pts2[-1, 0], 5 * pts2.shape[0])
-    highres_fit_left = fit_left(highresx_left)
-    highres_fit_right = fit_right(highresx_right)
-
-    poly_points_left = np.array(list(zip(highresx_left, highres_fit_left)))
-    poly_points_right = np.array(list(zip(highresx_right, highres_fit_right)))
-
-    error_measures = {}
-
-    # for left
-    errors_left = []
-    for point in pts1:
-        dist2edge, edge_point = polynomial_closest_point(
-            point[0], point[1], poly_points_left, display=display
-        )
-        errors_left.append(dist2edge)
-
-    error_measures["MAE left"] = sum([abs(error) for error in errors_left]) / len(
-        errors_left
-    )
-    error_measures["MSE left"] = sum([error**2 for error in errors_left]) / len(
-        errors_left
-    )
-    error_measures["RMSE left"] = np.sqrt(
-        sum([error**2 for error in errors_left]) / len(errors_left)
-    )
-    error_measures["Maximum error left"] = max(errors_left)
-
-    # for right
-    errors_right = []
-    for point in pts2:
-        dist2edge, edge_point = polynomial_closest_point(
-            point[0], point[1], poly_points_right, display=display
-        )
-        errors_right.append(dist2edge)
+    poly_points_left = np.column_stack([highresx_left, fit_left(highresx_left)])
+    poly_points_right = np.column_stack([highresx_right, fit_right(highresx_right)])
 
-    error_measures["MAE right"] = sum([abs(error) for error in errors_right]) / len(
-        errors_right
-    )
-    error_measures["MSE right"] = sum([error**2 for error in errors_right]) / len(
-        errors_right
-    )
-    error_measures["RMSE right"] = np.sqrt(
-        sum([error**2 for error in errors_right]) / len(errors_right)
-    )
-    error_measures["Maximum error right"] = max(errors_right)
+    errors_left = polyline_distances(pts1, poly_points_left)
+    errors_right = polyline_distances(pts2, poly_points_right)
 
-    error_measures["MAE"] = (
-        sum([error_measures["MAE left"], error_measures["MAE right"]]) / 2
-    )
-    error_measures["MSE"] = (
-        sum([error_measures["MSE left"], error_measures["MSE right"]]) / 2
-    )
-    error_measures["RMSE"] = (
-        sum([error_measures["RMSE left"], error_measures["RMSE right"]]) / 2
-    )
+    if display:
+        print("Polynomial fit errors left: ", errors_left)
+        print("Polynomial fit errors right: ", errors_right)
+
+    error_measures = {
+        **fit_error_measures(errors_left, " left"),
+        **fit_error_measures(errors_right, " right"),
+    }
+    for measure in ["MAE", "MSE", "RMSE"]:
+        error_measures[measure] = (
+            error_measures[measure + " left"] + error_measures[measure + " right"]
+        ) / 2
     error_measures["Maximum error"] = max(
-        [error_measures["Maximum error left"],
-            error_measures["Maximum error right"]]
+        error_measures["Maximum error left"], error_measures["Maximum error right"]
     )
 
     return error_measures
@@ -1093,17 +962,37 @@ def polynomial_fit(profile, num_points=15, polynomial_degree=2, display=False):
     display can be set to "True" to output figures."""
 
     start_time = time.time()
-    CPs = [profile[0], profile[-1]]
 
     # start the fit
+    pts1, pts2 = contact_regions(profile, num_points)
+
+    fit_local1 = np.polyfit(pts1[:, 0], pts1[:, 1], polynomial_degree)
+    fit_local2 = np.polyfit(pts2[:, 0], pts2[:, 1], polynomial_degree)
+
+    return polynomial_fit_result(
+        profile, pts1, pts2, fit_local1, fit_local2, start_time, display
+    )
+
+
+def contact_regions(profile, num_points=15):
+    """The first and last ``num_points`` points of the profile, each starting
+    from its contact point"""
     tangent_drop = profile.copy()
-    Ndrop = np.shape(tangent_drop)[0]
     pts1 = tangent_drop[:num_points]
     pts2 = tangent_drop[-num_points:]
     pts2 = pts2[::-1]  # reverse so that CP is first
+    return pts1, pts2
 
-    fit_local1 = np.polyfit(pts1[:, 0], pts1[:, 1], polynomial_degree)
-    fit_local2 = np.polyfit(pts2[:, 0], pts2[:, 1], polynomial_degree)
+
+def polynomial_fit_result(
+    profile, pts1, pts2, fit_local1, fit_local2, start_time, display=False
+):
+    """Contact angles, tangent lines and errors of the polynomials
+    ``fit_local1`` and ``fit_local2`` (highest power first, as returned by
+    np.polyfit) fitted to the contact regions ``pts1`` and ``pts2``, in the
+    form returned by ``polynomial_fit``"""
+    CPs = [profile[0], profile[-1]]
+    polynomial_degree = len(fit_local1) - 1
 
     line_local1 = np.poly1d(fit_local1)
     line_local2 = np.poly1d(fit_local2)
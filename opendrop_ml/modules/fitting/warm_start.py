@@ -0,0 +1,114 @@
+"""Warm starts of the iterative fits across the frames of a time series.
+
+Consecutive frames of a spreading or evaporating drop have nearly the same
+fit parameters, so each fitter can start from where it converged on the
+previous frame. A ``WarmStart`` keeps those parameters together with the
+cost they reached, and falls back to the fitter's usual cold start when the
+cost of a warm-started fit jumps, e.g. because a different drop came into
+view.
+"""
+
+from typing import Callable, Dict, Optional
+import numpy as np
+
+# a warm-started fit whose cost per point is this many times that of the
+# previous frame is repeated from a cold start
+JUMP_RATIO = 4.0
+# costs (square pixels per point) below this are never a jump, whatever the
+# previous frame reached
+MIN_COST = 1.0
+
+
+class WarmStart:
+    """Converged parameters of one fitter, carried from frame to frame"""
+
+    def __init__(self, jump_ratio: float = JUMP_RATIO, min_cost: float = MIN_COST):
+        self.jump_ratio = jump_ratio
+        self.min_cost = min_cost
+        self.reset()
+
+    def reset(self):
+        self.params: Optional[np.ndarray] = None
+        self.cost: Optional[float] = None
+        self.warm_fits = 0
+        self.cold_fits = 0
+
+    def is_jump(self, cost: float) -> bool:
+        """Whether ``cost`` is too far above the previous frame's to trust"""
+        if self.cost is None:
+            return False
+        return cost > self.jump_ratio * max(self.cost, self.min_cost)
+
+    def fit(
+        self,
+        solve: Callable,
+        cold_guess,
+        cost: Callable[..., float],
+        params: Callable,
+    ):
+        """Run ``solve`` from the previous parameters, or from ``cold_guess``
+        on the first frame or when the cost jumps, keeping the better fit.
+
+        :param solve: function of the initial guess returning the fit
+        :param cold_guess: initial guess without a previous frame, passed to
+            ``solve`` as is (None for the fitter's own estimate)
+        :param cost: function of a fit returning its cost per point
+        :param params: function of a fit returning the parameters to keep
+        :return: the fit
+        """
+        if self.params is None:
+            result = solve(cold_guess)
+            self.cold_fits += 1
+        else:
+            result = solve(self.params.copy())
+            self.warm_fits += 1
+            if self.is_jump(cost(result)):
+                cold = solve(cold_guess)
+                self.cold_fits += 1
+                if cost(cold) < cost(result):
+                    result = cold
+
+        self.params = np.array(params(result), dtype=float)
+        self.cost = float(cost(result))
+        return result
+
+
+def warm_fit(
+    warm_start: Optional[WarmStart],
+    solve: Callable,
+    cold_guess,
+    cost: Callable[..., float],
+    params: Callable,
+):
+    """``warm_start.fit``, or a cold start if there is no ``warm_start``"""
+    if warm_start is None:
+        return solve(cold_guess)
+    return warm_start.fit(solve, cold_guess, cost, params)
+
+
+class WarmStarts:
+    """The warm start of every fitter, by name"""
+
+    def __init__(self):
+        self._states: Dict[str, WarmStart] = {}
+
+    def get(self, name: str) -> WarmStart:
+        return self._states.setdefault(name, WarmStart())
+
+    def reset(self):
+        self._states.clear()
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Number of warm and cold starts of each fitter"""
+        return {
+            name: {"warm": state.warm_fits, "cold": state.cold_fits}
+            for name, state in self._states.items()
+        }
+
+
+_warm_starts = WarmStarts()
+
+
+def get_warm_starts() -> WarmStarts:
+    """The warm starts shared by the frames of this process"""
+    return _warm_starts
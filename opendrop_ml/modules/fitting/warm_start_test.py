@@ -0,0 +1,81 @@
+from opendrop_ml.modules.fitting.BA_engine import fit_profile, simulate_profile
+from opendrop_ml.modules.fitting.warm_start import WarmStart, WarmStarts, warm_fit
+
+import numpy as np
+
+
+def profile_fitter(data):
+    """``solve``, ``cost`` and ``params`` of the Bashforth-Adams fit of ``data``"""
+    return (
+        lambda x0: fit_profile(data, x0),
+        lambda result: 2 * result.cost / len(data),
+        lambda result: result.x,
+    )
+
+
+def drop_edge(h, a, b):
+    _, pred = simulate_profile(h, a, b, num=400)
+    return pred[::2]
+
+
+def test_first_fit_is_cold_and_later_fits_warm():
+    state = WarmStart()
+    frames = [drop_edge(100, 20, 60), drop_edge(99, 20.2, 59.5)]
+
+    for data in frames:
+        solve, cost, params = profile_fitter(data)
+        result = state.fit(solve, None, cost, params)
+        np.testing.assert_allclose(state.params, result.x)
+
+    assert (state.cold_fits, state.warm_fits) == (1, 1)
+    np.testing.assert_allclose(state.params, (20.2, 59.5), rtol=0.02)
+
+
+def test_warm_start_needs_fewer_evaluations():
+    previous, data = drop_edge(100, 20, 60), drop_edge(99, 20.2, 59.5)
+    state = WarmStart()
+    solve, cost, params = profile_fitter(previous)
+    state.fit(solve, None, cost, params)
+
+    solve, cost, params = profile_fitter(data)
+    cold = solve(None)
+    warm = state.fit(solve, None, cost, params)
+
+    assert warm.nfev < cold.nfev
+    np.testing.assert_allclose(warm.x, cold.x, rtol=1e-3)
+
+
+def test_cost_jump_falls_back_to_cold_start():
+    calls = []
+
+    def solve(x0):
+        calls.append(x0)
+        # starting from the stale parameters ends in a poor fit
+        return {"x": np.array(x0, dtype=float), "cost": 100.0 if x0 == [5] else 1.0}
+
+    state = WarmStart()
+    state.params, state.cost = np.array([5.0]), 1.0
+    result = state.fit(
+        lambda x0: solve(list(x0)), [1], lambda r: r["cost"], lambda r: r["x"]
+    )
+
+    assert calls == [[5], [1]]
+    assert result["cost"] == 1.0
+    assert (state.warm_fits, state.cold_fits) == (1, 1)
+    np.testing.assert_array_equal(state.params, [1])
+
+
+def test_warm_fit_without_state_is_cold():
+    assert warm_fit(None, lambda x0: x0, "guess", None, None) == "guess"
+
+
+def test_warm_starts_by_name():
+    warm_starts = WarmStarts()
+    assert warm_starts.get("yl") is warm_starts.get("yl")
+    assert warm_starts.get("yl") is not warm_starts.get("circle")
+
+    warm_starts.get("yl").fit(lambda x0: 2.0, None, lambda r: r, lambda r: [r])
+    assert warm_starts.counts()["yl"] == {"warm": 0, "cold": 1}
+
+    warm_starts.reset()
+    assert warm_starts.counts() == {}
@@ -8,36 +8,242 @@ from opendrop_ml.modules.image.select_regions import (
 from opendrop_ml.modules.ift.younglaplace.younglaplace import young_laplace_fit
 from opendrop_ml.modules.ift.younglaplace.shape import YoungLaplaceShape
 from opendrop_ml.modules.ift.pendant import extract_pendant_features, analyze_ift
+from opendrop_ml.modules.image.video import (
+    frame_file_name,
+    frame_time,
+    read_frame,
+    read_frame_image,
+)
 from opendrop_ml.utils.misc import rotation_mat2d
 from opendrop_ml.utils.enums import RegionSelect
 from opendrop_ml.utils.config import MAX_ARCLENGTH
 from opendrop_ml.utils.geometry import Rect2
+from opendrop_ml.utils.parallel import (
+    resolve_n_workers,
+    chunksize_for,
+    create_process_pool,
+)
+from opendrop_ml.utils.result_writer import open_result_writer
 
 from PIL import Image
-from typing import Callable
+from typing import Callable, Iterator, List, Optional, Tuple
 import cv2
 import os
-import csv
 import numpy as np
+import threading
 import timeit
 
 # from opendrop_ml.modules.PlotManager import PlotManager
 
+# longest side of the region previews built by worker processes
+REGIONS_PREVIEW_SIZE = 1024
+
+RESULT_COLUMNS = [
+    "Filename",
+    "Time",
+    "IFT (mN/m)",
+    "Volume (mm^3)",
+    "Surface Area (mm^2)",
+    "Bond",
+    "Worth",
+]
+# precision of each column in CSV files
+RESULT_FORMATS = [None, "{:.1f}", "{:.1f}", "{:.2f}", "{:.2f}", "{:.4f}", "{:.4f}"]
+
+
+def can_prepare_in_parallel(user_input_data: ExperimentalSetup) -> bool:
+    """Whether the preparation can run without user interaction."""
+    return (
+        user_input_data.drop_id_method == RegionSelect.AUTOMATED
+        and user_input_data.needle_region_method == RegionSelect.AUTOMATED
+    )
+
+
+def render_regions(image: np.ndarray, drop_region, needle_region) -> Image.Image:
+    """Draw the drop (blue) and needle (red) regions onto a copy of ``image``."""
+    regions_image = image.copy()
+    # Draw drop_region (blue)
+    if drop_region is not None:
+        regions_image = cv2.rectangle(
+            regions_image,
+            (int(drop_region.x0), int(drop_region.y0)),
+            (int(drop_region.x1), int(drop_region.y1)),
+            (255, 0, 0),
+            2,
+        )
+    # Draw needle_region (red)
+    if needle_region is not None:
+        regions_image = cv2.rectangle(
+            regions_image,
+            (int(needle_region.x0), int(needle_region.y0)),
+            (int(needle_region.x1), int(needle_region.y1)),
+            (0, 0, 255),
+            2,
+        )
+    return Image.fromarray(cv2.cvtColor(regions_image, cv2.COLOR_BGR2RGB))
+
+
+def prepare_frame(image_file: str) -> Optional[Tuple]:
+    """Extract the pendant features of one image and fit the Young-Laplace shape.
+
+    Runs in a worker process for automated regions. Only the fit result, the
+    drop points and regions and a downscaled preview of the regions are
+    returned, so no full-size images are sent back to the parent process.
+
+    Returns:
+        Tuple of (fit_result, drop_points, needle_diameter_px, drop_region,
+        needle_region, regions_preview, frame_time), or None if the image
+        cannot be read. ``frame_time`` is the timestamp of a video frame.
+    """
+    image, frame_time = read_frame(image_file)
+    if image is None:
+        print(f"Could not load image at {image_file}")
+        return None
+
+    (
+        drop_points,
+        needle_diameter_px,
+        drop_region,
+        needle_region,
+        image,
+        drop_image,
+        needle_fit_result,
+    ) = extract_pendant_features(image)
+    fit_result = young_laplace_fit(drop_points, verbose=False)
+
+    regions_preview = render_regions(image, drop_region, needle_region)
+    regions_preview.thumbnail((REGIONS_PREVIEW_SIZE, REGIONS_PREVIEW_SIZE))
+
+    return (
+        fit_result,
+        drop_points,
+        needle_diameter_px,
+        drop_region,
+        needle_region,
+        regions_preview,
+        frame_time,
+    )
+
+
+def draw_fitted_shape_image(image_file: str, fit_result, save_dir: str) -> str:
+    """Draw the fitted Young-Laplace profile onto the image and save it.
+
+    Returns:
+        Path of the saved image.
+    """
+    shape = YoungLaplaceShape(fit_result.bond)
+    _ = shape(MAX_ARCLENGTH)
+    # 2. Pick arclength values to sample.  We’ll reuse the ones from the fit:
+    s_values = fit_result.arclengths
+    # 3. Generate (r, z) coordinates pointwise
+    #    shape(s) returns a length‐2 array [r, z]
+    rz = np.array([shape(s) for s in s_values])  # shape (N,2)
+    # 4. Now transform into image coords:
+    #    a) scale by fitted radius
+    rz_scaled = fit_result.radius * rz.T  # shape (2, N)
+    #    b) rotate by fitted rotation
+    Q = rotation_mat2d(fit_result.rotation)
+    xy_fitted = Q @ rz_scaled  # still (2, N)
+    #    c) translate to apex location
+    apex = np.array([fit_result.apex_x, fit_result.apex_y]).reshape(2, 1)
+    xy_fitted += apex
+    image = read_frame_image(image_file)
+
+    # Make a copy to draw on (still BGR)
+    img_to_draw_on = image
+    # Translate fitted points to be relative to the cropped image
+    translated_fitted_x = xy_fitted[0, :]
+    translated_fitted_y = xy_fitted[1, :]
+    # Draw the fitted shape as individual points on the cropped BGR image
+    point_radius = 0  # As in your existing code
+    point_color_bgr = (0, 0, 255)
+    point_thickness = -1
+    for i in range(len(translated_fitted_x)):
+        x_coord = int(translated_fitted_x[i])
+        y_coord = int(translated_fitted_y[i])
+        cv2.circle(
+            img_to_draw_on,
+            (x_coord, y_coord),
+            point_radius,
+            point_color_bgr,
+            point_thickness,
+        )
+
+    os.makedirs(save_dir, exist_ok=True)
+    save_path = os.path.join(save_dir, frame_file_name(image_file))
+    cv2.imwrite(save_path, img_to_draw_on)
+    return save_path
+
+
+def draw_fitted_shape_images(
+    image_files: List[str], fit_results: List, save_dir: str
+) -> List[str]:
+    """``draw_fitted_shape_image`` for a chunk of frames, in a worker"""
+    return [
+        draw_fitted_shape_image(image_file, fit_result, save_dir)
+        for image_file, fit_result in zip(image_files, fit_results)
+    ]
+
+
+def contour_images_dir() -> str:
+    # (cross-platform)
+    return os.path.join(
+        os.path.join(os.path.expanduser("~")),
+        "OpenDrop",
+        "outputs",
+        "contour_images",
+    )
+
 
 class IftDataProcessor:
+    # file the last run's rows were written to as its frames finished
+    streamed_path: Optional[str] = None
+    # whether the last run was stopped before its last frame
+    cancelled = False
+    _cancel: Optional[threading.Event] = None
+
     def process_data(
-        self, user_input_data: ExperimentalSetup, callback: Callable = None
+        self,
+        user_input_data: ExperimentalSetup,
+        callback: Callable = None,
+        output_file_path: Optional[str] = None,
+        frame_callback: Optional[Callable[[int], None]] = None,
+        cancel: Optional[threading.Event] = None,
     ):
+        """Analyse every frame, writing each frame's row to
+        ``output_file_path`` as soon as it is finished if given.
+
+        ``frame_callback`` is called with the number of frames done after
+        each frame. Setting ``cancel`` stops the run between frames.
+        """
+        self.streamed_path = output_file_path
+        self.cancelled = False
+        writer = (
+            open_result_writer(output_file_path, RESULT_COLUMNS, formats=RESULT_FORMATS)
+            if output_file_path
+            else None
+        )
+        try:
+            self._process_frames(user_input_data, writer, frame_callback, cancel)
+        finally:
+            # rows of the frames done so far are kept if the run fails
+            if writer is not None:
+                writer.close()
+
+        if callback:
+            callback(user_input_data)
 
+    def _process_frames(
+        self, user_input_data: ExperimentalSetup, writer, frame_callback, cancel
+    ):
         n_frames = user_input_data.number_of_frames
         time = 0
+        self._cancel = cancel
 
-        for i in range(len(user_input_data.import_files)):
-            # Load the image (assuming OpenCV)
+        for i, contour_image in self._iter_fitted_shapes(user_input_data):
+            if self._cancel_requested():
+                break
             image = user_input_data.import_files[i]
-            if image is None:
-                print(f"Failed to load image: {image}")
-                continue
             print("\nProcessing frame %d of %d..." % (i + 1, n_frames))
             input_file = user_input_data.import_files[i]
             print("\nProcessing " + input_file)
@@ -52,19 +258,82 @@ class IftDataProcessor:
                 needle_diameter_mm=user_input_data.needle_diameter_mm,
                 needle_diameter_px=user_input_data.needle_diameter_px[i],
             )
-            self.draw_fitted_shape(user_input_data, i, image)
+            if contour_image is None:
+                self.draw_fitted_shape(user_input_data, i, image)
+            else:
+                user_input_data.drop_contour_images[i] = contour_image
             time_end = timeit.default_timer()
             duration = time_end - time_start
-            analyzed_ift[5] = time + i * user_input_data.frame_interval
+            analyzed_ift[5] = time + frame_time(user_input_data, i)
             # Save the analyzed IFT results
             # print("Analyzed IFT:", analyzed_ift)
             user_input_data.ift_results[i] = analyzed_ift
+            if writer is not None and is_result(analyzed_ift):
+                writer.write_row(result_row(input_file, analyzed_ift))
 
             print("Time taken for frame %d: %.2f seconds" % (i + 1, duration))
             print("callback: ", i)
+            if frame_callback:
+                frame_callback(i + 1)
 
-        if callback:
-            callback(user_input_data)
+    def _iter_fitted_shapes(
+        self, user_input_data: ExperimentalSetup
+    ) -> Iterator[Tuple[int, Optional[str]]]:
+        """Yield ``(index, saved image path)`` for every frame with a fitted
+        shape, in frame order.
+
+        With more than one worker the shapes are drawn on a worker pool, a
+        chunk of frames at a time; otherwise the path is None and the frame
+        is drawn by the caller.
+        """
+        files = user_input_data.import_files
+        indices = []
+        for i, image_file in enumerate(files):
+            if image_file is None:
+                print(f"Failed to load image: {image_file}")
+            elif not is_result(user_input_data.fit_result[i]):
+                print(f"No fitted shape for frame {i + 1}")
+            else:
+                indices.append(i)
+
+        n_workers = resolve_n_workers(user_input_data.n_workers, len(indices))
+        if n_workers <= 1:
+            for i in indices:
+                yield i, None
+            return
+
+        with create_process_pool(n_workers) as executor:
+            chunksize = chunksize_for(len(indices), n_workers)
+            chunks = [
+                indices[start : start + chunksize]
+                for start in range(0, len(indices), chunksize)
+            ]
+            futures = [
+                executor.submit(
+                    draw_fitted_shape_images,
+                    [files[i] for i in chunk],
+                    [user_input_data.fit_result[i] for i in chunk],
+                    contour_images_dir(),
+                )
+                for chunk in chunks
+            ]
+            try:
+                for chunk, future in zip(chunks, futures):
+                    yield from zip(chunk, future.result())
+            finally:
+                # chunks not started yet are dropped when the run stops
+                # early; those already running on the workers are waited
+                # for and discarded
+                for future in futures:
+                    future.cancel()
+
+    def _cancel_requested(self) -> bool:
+        if self._cancel is None or not self._cancel.is_set():
+            return False
+        if not self.cancelled:
+            print("\nAnalysis cancelled")
+        self.cancelled = True
+        return True
 
     def process_preparation(self, user_input_data: ExperimentalSetup):
         n_frames = user_input_data.number_of_frames
@@ -84,6 +353,13 @@ class IftDataProcessor:
         user_input_data.drop_contour_images = ["None"] * n_frames
         user_input_data.processed_images = ["None"] * n_frames
 
+        n_workers = resolve_n_workers(
+            user_input_data.n_workers, len(user_input_data.import_files)
+        )
+        if n_workers > 1 and can_prepare_in_parallel(user_input_data):
+            self._prepare_in_parallel(user_input_data, n_workers)
+            return
+
         for i in range(len(user_input_data.import_files)):
             print("\nProcessing frame %d of %d..." % (i + 1, n_frames))
             input_file = user_input_data.import_files[i]
@@ -98,7 +374,7 @@ class IftDataProcessor:
                 print(f"Failed to load image: {input_file}")
                 continue
 
-            image = cv2.imread(image_file, cv2.IMREAD_COLOR)
+            image, user_input_data.frame_times[i] = read_frame(image_file)
             if image is None:
                 print(f"Could not load image at {image_file}")
 
@@ -142,130 +418,73 @@ class IftDataProcessor:
             user_input_data.needle_region[i] = needle_region
             self.draw_regions(user_input_data, i, image)
 
+    def _prepare_in_parallel(
+        self, user_input_data: ExperimentalSetup, n_workers: int
+    ) -> None:
+        files = user_input_data.import_files
+        indices = [i for i, image_file in enumerate(files) if image_file is not None]
+        for i in set(range(len(files))) - set(indices):
+            print(f"Failed to load image: {files[i]}")
+
+        print(f"\nPreparing {len(indices)} frames on {n_workers} workers...")
+        with create_process_pool(n_workers) as executor:
+            prepared = executor.map(
+                prepare_frame,
+                [files[i] for i in indices],
+                chunksize=chunksize_for(len(indices), n_workers),
+            )
+            for i, frame in zip(indices, prepared):
+                print("\nPrepared frame %d of %d" % (i + 1, len(files)))
+                if frame is None:
+                    continue
+                (
+                    user_input_data.fit_result[i],
+                    user_input_data.drop_points[i],
+                    user_input_data.needle_diameter_px[i],
+                    user_input_data.drop_region[i],
+                    user_input_data.needle_region[i],
+                    user_input_data.processed_images[i],
+                    user_input_data.frame_times[i],
+                ) = frame
+
     def draw_regions(
         self, user_input_data: ExperimentalSetup, i: int, image: np.ndarray
     ):
-        drop_region = user_input_data.drop_region[i]
-        needle_region = user_input_data.needle_region[i]
-        regions_image = image.copy()
-        # Draw drop_region (blue)
-        if drop_region is not None:
-            regions_image = cv2.rectangle(
-                regions_image,
-                (int(drop_region.x0), int(drop_region.y0)),
-                (int(drop_region.x1), int(drop_region.y1)),
-                (255, 0, 0),
-                2,
-            )
-        # Draw needle_region (red)
-        if needle_region is not None:
-            regions_image = cv2.rectangle(
-                regions_image,
-                (int(needle_region.x0), int(needle_region.y0)),
-                (int(needle_region.x1), int(needle_region.y1)),
-                (0, 0, 255),
-                2,
-            )
-        image_pil = Image.fromarray(
-            cv2.cvtColor(regions_image, cv2.COLOR_BGR2RGB))
-        user_input_data.processed_images[i] = image_pil
+        user_input_data.processed_images[i] = render_regions(
+            image, user_input_data.drop_region[i], user_input_data.needle_region[i]
+        )
 
     def draw_fitted_shape(
-        self, user_input_data: ExperimentalSetup, drop_index: int, image: np.ndarray
+        self, user_input_data: ExperimentalSetup, drop_index: int, image: str
     ):
-        fit_result = user_input_data.fit_result[drop_index]
-        shape = YoungLaplaceShape(fit_result.bond)
-        _ = shape(MAX_ARCLENGTH)
-        # 2. Pick arclength values to sample.  We’ll reuse the ones from the fit:
-        s_values = fit_result.arclengths
-        # 3. Generate (r, z) coordinates pointwise
-        #    shape(s) returns a length‐2 array [r, z]
-        rz = np.array([shape(s) for s in s_values])  # shape (N,2)
-        r_coords = rz[:, 0]
-        z_coords = rz[:, 1]
-        # 4. Now transform into image coords:
-        #    a) scale by fitted radius
-        rz_scaled = fit_result.radius * rz.T  # shape (2, N)
-        #    b) rotate by fitted rotation
-        Q = rotation_mat2d(fit_result.rotation)
-        xy_fitted = Q @ rz_scaled  # still (2, N)
-        #    c) translate to apex location
-        apex = np.array([fit_result.apex_x, fit_result.apex_y]).reshape(2, 1)
-        xy_fitted += apex
-        # Crop the original BGR image using drop_region
-        drop_region = user_input_data.drop_region[drop_index]
-        y0 = int(drop_region.y0)
-        y1 = int(drop_region.y1)
-        x0 = int(drop_region.x0)
-        x1 = int(drop_region.x1)
-        image = cv2.imread(image)
-
-        # Make a copy to draw on (still BGR)
-        img_to_draw_on = image
-        # Translate fitted points to be relative to the cropped image
-        translated_fitted_x = xy_fitted[0, :]
-        translated_fitted_y = xy_fitted[1, :]
-        # Draw the fitted shape as individual points on the cropped BGR image
-        point_radius = 0  # As in your existing code
-        point_color_bgr = (0, 0, 255)
-        point_thickness = -1
-        for i in range(len(translated_fitted_x)):
-            x_coord = int(translated_fitted_x[i])
-            y_coord = int(translated_fitted_y[i])
-            cv2.circle(
-                img_to_draw_on,
-                (x_coord, y_coord),
-                point_radius,
-                point_color_bgr,
-                point_thickness,
-            )
-
-        # (cross-platform)
-        save_dir = os.path.join(
-            os.path.join(os.path.expanduser("~")),
-            "OpenDrop",
-            "outputs",
-            "contour_images",
+        user_input_data.drop_contour_images[drop_index] = draw_fitted_shape_image(
+            user_input_data.import_files[drop_index],
+            user_input_data.fit_result[drop_index],
+            contour_images_dir(),
         )
-        os.makedirs(save_dir, exist_ok=True)
-
-        original_path = user_input_data.import_files[drop_index]
-        original_name = os.path.basename(original_path)
-
-        save_path = os.path.join(save_dir, original_name)
-        cv2.imwrite(save_path, img_to_draw_on)
-
-        user_input_data.drop_contour_images[drop_index] = save_path
 
     def save_result(self, user_input_data: ExperimentalSetup, output_file_path: str):
         """
-        Save experiment results to a CSV file with columns:
-        Filename, Time, IFT, V, SA, Bond, Worth
+        Save experiment results to a CSV, HDF5 or Parquet file (by extension)
+        with columns: Filename, Time, IFT, V, SA, Bond, Worth
         """
-        with open(output_file_path, "w", newline="") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(
-                [
-                    "Filename",
-                    "Time",
-                    "IFT (mN/m)",
-                    "Volume (mm^3)",
-                    "Surface Area (mm^2)",
-                    "Bond",
-                    "Worth",
-                ]
-            )
+        if output_file_path == self.streamed_path:
+            # already written frame by frame
+            return
+        with open_result_writer(
+            output_file_path, RESULT_COLUMNS, formats=RESULT_FORMATS
+        ) as writer:
             for i, result in enumerate(user_input_data.ift_results):
-                if result is not None and result != "None":
-                    # result: [IFT, V, SA, Bond, Worth, Time]
-                    writer.writerow(
-                        [
-                            user_input_data.import_files[i],
-                            f"{result[5]:.1f}",
-                            f"{result[0]:.1f}",
-                            f"{result[1]:.2f}",
-                            f"{result[2]:.2f}",
-                            f"{result[3]:.4f}",
-                            f"{result[4]:.4f}",
-                        ]
+                if is_result(result):
+                    writer.write_row(
+                        result_row(user_input_data.import_files[i], result)
                     )
+
+
+def is_result(result) -> bool:
+    return result is not None and result != "None"
+
+
+def result_row(filename: str, result) -> List:
+    """Row of the saved results; ``result`` is [IFT, V, SA, Bond, Worth, Time]"""
+    return [filename, result[5], result[0], result[1], result[2], result[3], result[4]]
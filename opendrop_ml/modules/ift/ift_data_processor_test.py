@@ -0,0 +1,166 @@
+from opendrop_ml.modules.ift import ift_data_processor
+from opendrop_ml.modules.ift.ift_data_processor import (
+    IftDataProcessor,
+    can_prepare_in_parallel,
+    is_result,
+)
+from opendrop_ml.modules.ift.younglaplace.shape import YoungLaplaceShape
+from opendrop_ml.modules.core.classes import ExperimentalSetup
+from opendrop_ml.modules.image.video import set_import_files
+from opendrop_ml.utils.enums import RegionSelect
+
+import numpy as np
+import threading
+import pytest
+import cv2
+import os
+
+
+def make_pendant_image(path, bond, radius=120, width=640, height=720):
+    """Render a synthetic pendant drop hanging from a needle"""
+    shape = YoungLaplaceShape(bond)
+    rz = np.array([shape(s) for s in np.linspace(0, 3.2, 800)]) * radius
+    apex_y, cx = 600, width // 2
+    xs = np.concatenate([cx + rz[:, 0], (cx - rz[:, 0])[::-1]])
+    ys = np.concatenate([apex_y - rz[:, 1], (apex_y - rz[:, 1])[::-1]])
+
+    image = np.full((height, width, 3), 230, np.uint8)
+    cv2.fillPoly(image, [np.stack([xs, ys], 1).astype(np.int32)], (30, 30, 30))
+    needle_half_width = int(rz[-1, 0])
+    cv2.rectangle(
+        image,
+        (cx - needle_half_width, 0),
+        (cx + needle_half_width, int(ys.min()) + 5),
+        (30, 30, 30),
+        -1,
+    )
+    cv2.imwrite(str(path), image)
+    return str(path)
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        ift_data_processor, "contour_images_dir", lambda: str(tmp_path / "out")
+    )
+    user_input_data = ExperimentalSetup()
+    user_input_data.screen_resolution = [1920, 1080]
+    user_input_data.import_files = [
+        make_pendant_image(tmp_path / f"drop{i}.png", bond)
+        for i, bond in enumerate([0.2, 0.3])
+    ]
+    user_input_data.number_of_frames = len(user_input_data.import_files)
+    user_input_data.drop_density = 1000
+    user_input_data.density_outer = 0
+    user_input_data.needle_diameter_mm = 0.7176
+    return user_input_data
+
+
+def test_can_prepare_in_parallel(setup):
+    assert can_prepare_in_parallel(setup)
+    setup.needle_region_method = RegionSelect.USER_SELECTED
+    assert not can_prepare_in_parallel(setup)
+
+
+def test_worker_pool_matches_serial(setup):
+    def run(n_workers):
+        setup.n_workers = n_workers
+        processor = IftDataProcessor()
+        processor.process_preparation(setup)
+        processor.process_data(setup)
+        return (
+            [fit.bond for fit in setup.fit_result],
+            list(setup.ift_results),
+            list(setup.drop_contour_images),
+        )
+
+    serial_bonds, serial_ift, serial_images = run(1)
+    pool_bonds, pool_ift, pool_images = run(2)
+
+    np.testing.assert_allclose(serial_bonds, [0.2, 0.3], atol=0.01)
+    assert pool_bonds == serial_bonds
+    assert pool_ift == serial_ift
+    assert pool_images == serial_images
+    # previews are built in the workers, no full image is sent back
+    assert all(image.size[0] <= 1024 for image in setup.processed_images)
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_cancel_and_progress_between_frames(setup, n_workers):
+    setup.n_workers = n_workers
+    processor = IftDataProcessor()
+    processor.process_preparation(setup)
+    cancel = threading.Event()
+    received = []
+
+    def frame_callback(n):
+        received.append(n)
+        cancel.set()
+
+    processor.process_data(setup, frame_callback=frame_callback, cancel=cancel)
+
+    assert processor.cancelled
+    assert received == [1]
+    assert setup.ift_results[1] == "None"
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_frames_without_a_fit_are_skipped(setup, n_workers):
+    setup.n_workers = n_workers
+    processor = IftDataProcessor()
+    processor.process_preparation(setup)
+    # as left by a frame whose preparation failed
+    setup.fit_result[0] = "None"
+
+    processor.process_data(setup)
+
+    assert setup.ift_results[0] == "None"
+    assert setup.drop_contour_images[0] == "None"
+    assert is_result(setup.ift_results[1])
+    assert os.path.isfile(setup.drop_contour_images[1])
+
+
+def test_save_result_csv(tmp_path):
+    user_input_data = ExperimentalSetup()
+    user_input_data.import_files = ["a.png", "b.png", "c.png"]
+    user_input_data.ift_results = [
+        [72.123, 10.5, 20.25, 0.31234, 0.51234, 0.0],
+        None,
+        [71.0, 10.0, 20.0, 0.3, 0.5, 2.0],
+    ]
+    output_file_path = str(tmp_path / "results.csv")
+
+    IftDataProcessor().save_result(user_input_data, output_file_path)
+
+    with open(output_file_path) as f:
+        assert f.read().splitlines() == [
+            "Filename,Time,IFT (mN/m),Volume (mm^3),Surface Area (mm^2),Bond,Worth",
+            "a.png,0.0,72.1,10.50,20.25,0.3123,0.5123",
+            "c.png,2.0,71.0,10.00,20.00,0.3000,0.5000",
+        ]
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_video_frames_are_timed_by_the_container(setup, tmp_path, n_workers):
+    images = [cv2.imread(path) for path in setup.import_files]
+    height, width = images[0].shape[:2]
+    video = str(tmp_path / "pendant.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 4, (width, height))
+    for image in images:
+        writer.write(image)
+    writer.release()
+
+    set_import_files(setup, [video])
+    setup.n_workers = n_workers
+    processor = IftDataProcessor()
+    processor.process_preparation(setup)
+    processor.process_data(setup)
+
+    np.testing.assert_allclose(
+        [fit.bond for fit in setup.fit_result], [0.2, 0.3], atol=0.02
+    )
+    assert [result[5] for result in setup.ift_results] == [0, 0.25]
+    assert [os.path.basename(path) for path in setup.drop_contour_images] == [
+        "pendant_frame000000.png",
+        "pendant_frame000001.png",
+    ]
@@ -5,7 +5,6 @@ from enum import IntEnum, auto
 from scipy.ndimage import gaussian_filter
 import math
 import numpy as np
-import scipy.signal
 import scipy.optimize
 
 try:
@@ -108,6 +107,8 @@ def needle_fit(
 
 
 def needle_guess(data: np.ndarray) -> Sequence[float]:
+    from scipy.signal import find_peaks
+
     params = np.empty(len(NeedleParam))
     data = data.astype(float)
 
@@ -118,7 +119,7 @@ def needle_guess(data: np.ndarray) -> Sequence[float]:
 
     needles = np.zeros(shape=(votes.shape[0], 3))
     for i in range(votes.shape[0]):
-        peaks, props = scipy.signal.find_peaks(votes[i], prominence=0)
+        peaks, props = find_peaks(votes[i], prominence=0)
         if len(peaks) < 2:
             continue
         ix = np.argsort(props["prominences"])[::-1]
@@ -0,0 +1,142 @@
+"""Live frames from a USB camera.
+
+A ``CaptureSession`` opens the camera once and a background thread keeps
+reading from it into a small ring buffer, so taking a frame is handing over
+the newest one in memory instead of opening the device, waiting for its
+exposure to settle and going through a file each time.
+"""
+
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import threading
+import timeit
+import atexit
+import cv2
+
+# frames read and thrown away after opening while exposure and white
+# balance settle
+RAMP_FRAMES = 40
+
+# most recent frames kept
+BUFFER_SIZE = 4
+
+# seconds to wait for a frame before giving up on the camera
+READ_TIMEOUT = 5.0
+
+
+class CaptureSession:
+    """Camera ``device`` kept open, with a thread filling a ring buffer of
+    its latest ``buffer_size`` frames and their capture times"""
+
+    def __init__(
+        self,
+        device: int = 0,
+        buffer_size: int = BUFFER_SIZE,
+        ramp_frames: int = RAMP_FRAMES,
+        clock: Callable[[], float] = timeit.default_timer,
+    ):
+        self.device = device
+        self.ramp_frames = ramp_frames
+        self._clock = clock
+        # (number, capture time, image), oldest first
+        self._frames: "deque[Tuple[int, float, np.ndarray]]" = deque(
+            maxlen=max(1, buffer_size)
+        )
+        self._frames_captured = 0
+        self._last_read = -1
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._capture = None
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[str] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "CaptureSession":
+        self._capture = cv2.VideoCapture(self.device)
+        if not self._capture.isOpened():
+            self._capture.release()
+            raise IOError(f"Could not open camera {self.device}")
+        self._thread = threading.Thread(target=self._grab, daemon=True)
+        self._thread.start()
+        return self
+
+    def read(self, timeout: float = READ_TIMEOUT) -> Tuple[np.ndarray, float]:
+        """Newest frame not read before and its capture time, waiting for
+        the camera if there is none yet"""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._frames_captured - 1 > self._last_read
+                or self.error is not None,
+                timeout,
+            )
+            if self._frames_captured - 1 <= self._last_read:
+                raise IOError(
+                    self.error or f"No frame from camera {self.device} in {timeout} s"
+                )
+            number, timestamp, image = self._frames[-1]
+            self._last_read = number
+            return image, timestamp
+
+    def buffered(self) -> List[Tuple[float, np.ndarray]]:
+        """Frames in the buffer as (capture time, image), oldest first"""
+        with self._condition:
+            return [(timestamp, image) for _, timestamp, image in self._frames]
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=READ_TIMEOUT)
+        if self._capture is not None:
+            self._capture.release()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _grab(self) -> None:
+        ramp_frames = self.ramp_frames
+        while not self._stop.is_set():
+            ok, image = self._capture.read()
+            timestamp = self._clock()
+            if not ok:
+                with self._condition:
+                    self.error = f"Camera {self.device} stopped sending frames"
+                    self._condition.notify_all()
+                return
+            if ramp_frames > 0:
+                ramp_frames -= 1
+                continue
+            with self._condition:
+                self._frames.append((self._frames_captured, timestamp, image))
+                self._frames_captured += 1
+                self._condition.notify_all()
+
+
+_sessions: Dict[int, CaptureSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_capture_session(device: int = 0) -> CaptureSession:
+    """Session of camera ``device``, opened on first use and kept open
+    until the process exits"""
+    with _sessions_lock:
+        session = _sessions.get(device)
+        if session is None or not session.is_open:
+            if session is not None:
+                session.close()
+            session = _sessions[device] = CaptureSession(device).start()
+        return session
+
+
+@atexit.register
+def close_capture_sessions() -> None:
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
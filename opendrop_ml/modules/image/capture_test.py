@@ -0,0 +1,112 @@
+from opendrop_ml.modules.image import capture
+from opendrop_ml.modules.image.capture import CaptureSession, get_capture_session
+
+from unittest.mock import patch
+import numpy as np
+import threading
+import pytest
+
+
+class FakeCamera:
+    """Frame i is filled with i; reading waits until the test lets a frame
+    through or the session stops, and fails once ``n_frames`` have been read"""
+
+    def __init__(self, device, n_frames=1000, opened=True):
+        self.device = device
+        self.n_frames = n_frames
+        self.opened = opened
+        self.released = False
+        self.frames_read = 0
+        self.allowed = threading.Semaphore(0)
+        self.stopped = threading.Event()
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        while not self.allowed.acquire(timeout=0.01):
+            if self.stopped.is_set():
+                return False, None
+        if self.frames_read >= self.n_frames:
+            return False, None
+        image = np.full((4, 4, 3), self.frames_read, np.uint8)
+        self.frames_read += 1
+        return True, image
+
+    def release(self):
+        self.released = True
+
+
+@pytest.fixture
+def camera():
+    camera = FakeCamera(0)
+    with patch.object(capture.cv2, "VideoCapture", return_value=camera):
+        yield camera
+
+
+def open_session(camera, **kwargs):
+    session = CaptureSession(0, **kwargs)
+    camera.stopped = session._stop
+    return session
+
+
+def send(camera, n):
+    for _ in range(n):
+        camera.allowed.release()
+
+
+def test_frames_after_the_ramp_are_read_newest_first(camera):
+    times = iter(range(100))
+    with open_session(camera, ramp_frames=2, clock=lambda: next(times)) as session:
+        send(camera, 3)
+        image, timestamp = session.read()
+        # the first two frames are thrown away
+        assert image[0, 0, 0] == 2 and timestamp == 2
+
+        send(camera, 2)
+        while len(session.buffered()) < 3:
+            threading.Event().wait(0.01)
+        image, timestamp = session.read()
+        # frames read in between are skipped for the newest
+        assert image[0, 0, 0] == 4 and timestamp == 4
+        assert [t for t, _ in session.buffered()] == [2, 3, 4]
+
+        with pytest.raises(IOError, match="No frame"):
+            session.read(timeout=0.05)
+    assert camera.released
+
+
+def test_ring_buffer_keeps_the_latest_frames(camera):
+    with open_session(camera, buffer_size=2, ramp_frames=0) as session:
+        send(camera, 5)
+        while session.read(timeout=1)[0][0, 0, 0] != 4:
+            pass
+        assert [image[0, 0, 0] for _, image in session.buffered()] == [3, 4]
+
+
+def test_camera_that_stops_sending(camera):
+    camera.n_frames = 1
+    with open_session(camera, ramp_frames=0) as session:
+        send(camera, 2)
+        session.read(timeout=1)
+        with pytest.raises(IOError, match="stopped sending"):
+            session.read(timeout=1)
+
+
+def test_camera_that_does_not_open():
+    camera = FakeCamera(3, opened=False)
+    with patch.object(capture.cv2, "VideoCapture", return_value=camera):
+        with pytest.raises(IOError, match="camera 3"):
+            CaptureSession(3).start()
+    assert camera.released
+
+
+def test_session_is_opened_once(camera):
+    with patch.dict(capture._sessions, clear=True), patch.object(
+        capture, "RAMP_FRAMES", 0
+    ):
+        first = get_capture_session(0)
+        camera.stopped = first._stop
+        assert get_capture_session(0) is first
+        capture.close_capture_sessions()
+        assert not capture._sessions
@@ -2,6 +2,9 @@
 # coding=utf-8
 
 from opendrop_ml.modules.core.classes import ExperimentalDrop, ExperimentalSetup
+from opendrop_ml.modules.image.video import read_frame
+from opendrop_ml.modules.image.capture import get_capture_session
+from opendrop_ml.utils.profiling import timed
 
 import subprocess
 import cv2
@@ -19,6 +22,7 @@ import os
 IMAGE_FLAG = 1  # 1 returns three channels (BGR), 0 returns gray
 
 
+@timed("get_image")
 def get_image(
     experimental_drop: ExperimentalDrop,
     experimental_setup: ExperimentalSetup,
@@ -79,7 +83,7 @@ def import_from_source(
         image_from_Flea3(experimental_drop)
     # from USB camera
     elif image_source == "USB camera":
-        image_from_camera(experimental_drop)
+        image_from_camera(experimental_drop, experimental_setup.cv2_capture_num or 0)
     # from specified file
     elif image_source == "Local images":
         image_from_harddrive(
@@ -89,7 +93,9 @@ def import_from_source(
         raise ValueError("Incorrect value for image_source")
 
     # experimental_drop.time = datetime.datetime.now().strftime("%Y-%m-%d-%H%M%S")
-    experimental_drop.time = timeit.default_timer()
+    # camera frames keep the time they were captured
+    if image_source != "USB camera":
+        experimental_drop.time = timeit.default_timer()
     # experimental_drop.image = np.flipud(cv2.imread(experimental_drop.filename, IMAGE_FLAG))
 
 
@@ -107,7 +113,8 @@ def image_from_harddrive(
     frame_number: int,
 ) -> None:
     import_filename = get_import_filename(experimental_setup, frame_number)
-    experimental_drop.image = cv2.imread(import_filename, IMAGE_FLAG)
+    # video frames are decoded in order rather than read from files
+    experimental_drop.image, experimental_drop.frame_time = read_frame(import_filename)
 
 
 def get_import_filename(
@@ -117,30 +124,8 @@ def get_import_filename(
     return experimental_setup.import_files[frame_number * (frame_number > 0)]
 
 
-# Captures a single image from the camera and returns it in IplImage format
+# Takes the newest frame from the camera, which is kept open between frames
 
 
-def image_from_camera(experimental_drop: ExperimentalDrop) -> None:
-    grabanimage()
-    temp_filename = "USBtemp.png"
-    experimental_drop.image = cv2.imread(temp_filename, IMAGE_FLAG)
-
-
-def grabanimage() -> None:
-    camera_port = 0
-    ramp_frames = 40
-    camera = cv2.VideoCapture(camera_port)
-
-    def get_image():
-        retval, im = camera.read()
-        return im
-
-    for i in range(ramp_frames):
-        temp = get_image()
-    print("Taking image...")
-    # Take the actual image we want to keep
-    camera_capture = get_image()
-    file = "USBtemp.png"
-    # A nice feature of the imwrite method is that it will automatically choose the
-    # correct format based on the file extension you provide. Convenient!
-    cv2.imwrite(file, camera_capture)
+def image_from_camera(experimental_drop: ExperimentalDrop, device: int = 0) -> None:
+    experimental_drop.image, experimental_drop.time = get_capture_session(device).read()
@@ -6,7 +6,6 @@ from opendrop_ml.modules.image.read_image import (
     image_from_harddrive,
     get_import_filename,
     image_from_camera,
-    grabanimage,
 )
 
 from unittest.mock import patch, MagicMock
@@ -122,31 +121,16 @@ def test_get_import_filename(mock_experimental_setup):
 # Test image_from_camera function
 
 
-@patch("opendrop_ml.modules.image.read_image.grabanimage")
-def test_image_from_camera(mock_grabanimage, mock_experimental_drop):
-    with patch(
-        "cv2.imread", return_value=np.zeros((100, 100, 3), dtype=np.uint8)
-    ) as mock_imread:
-        image_from_camera(mock_experimental_drop)
-        mock_grabanimage.assert_called_once()
-        mock_imread.assert_called_once_with("USBtemp.png", 1)
+@patch("opendrop_ml.modules.image.read_image.get_capture_session")
+def test_image_from_camera(mock_get_capture_session, mock_experimental_drop):
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    mock_get_capture_session.return_value.read.return_value = (image, 12.5)
 
+    image_from_camera(mock_experimental_drop, 1)
 
-# Test grabanimage function
-
-
-@patch("cv2.VideoCapture")
-def test_grabanimage(mock_VideoCapture):
-    mock_camera = MagicMock()
-    mock_VideoCapture.return_value = mock_camera
-    mock_camera.read.return_value = (
-        True, np.zeros((100, 100, 3), dtype=np.uint8))
-    with patch("cv2.imwrite") as mock_imwrite:
-        grabanimage()
-        mock_camera.read.assert_called()
-        mock_imwrite.assert_called_once_with(
-            "USBtemp.png", mock_camera.read.return_value[1]
-        )
+    mock_get_capture_session.assert_called_once_with(1)
+    assert mock_experimental_drop.image is image
+    assert mock_experimental_drop.time == 12.5
 
 
 # Run the tests when this script is executed directly
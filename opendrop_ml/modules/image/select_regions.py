@@ -3,21 +3,27 @@
 
 from opendrop_ml.modules.core.classes import ExperimentalDrop, ExperimentalSetup
 from opendrop_ml.modules.preprocessing.preprocessing import (
+    PYRAMID_MARGIN,
+    contour_tilt_correction,
     prepare_hydrophobic,
+    pyramid_levels,
     tilt_correction,
 )
 from opendrop_ml.utils.geometry import Rect2
+from opendrop_ml.utils.contour import optimized_path
 from opendrop_ml.utils.enums import FittingMethod, RegionSelect, ThresholdSelect
+from opendrop_ml.utils.profiling import timed
+from opendrop_ml.utils.lazy import lazy_import
 
 # from opendrop_ml.utils.keymap import *
 
 from typing import List, Tuple
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 import sys
 import ctypes
 import platform
+
 if platform.system() == "Windows":
     try:
         import win32gui
@@ -25,6 +31,8 @@ if platform.system() == "Windows":
     except ImportError:
         print("pywin32 not available. Close button will not be disabled.")
 
+plt = lazy_import("matplotlib.pyplot")
+
 
 # from scipy import optimize  # DS 7/6/21 - for least squares fit
 # import tensorflow as tf  # DS 9/6/21 - for loading ML model
@@ -46,7 +54,61 @@ def get_ift_regions(
 ) -> Tuple[np.ndarray, tuple]:
     """
     Automatically detects the drop and needle regions in an image.
+
+    Large frames are searched at a lower resolution first, and the regions
+    are then found at full resolution in a window around the pendant drop.
     """
+    args = (padding, area_thresh, drop_frac, scharr_block, canny1, canny2)
+    window = _coarse_pendant_window(img)
+    if window is not None:
+        x0, y0, x1, y1 = window
+        regions = _find_ift_regions(img[y0:y1, x0:x1], *args)
+        if isinstance(regions, tuple) and all(
+            isinstance(region, Rect2) for region in regions
+        ):
+            return tuple(
+                Rect2(r.x0 + x0, r.y0 + y0, r.x1 + x0, r.y1 + y0) for r in regions
+            )
+    return _find_ift_regions(img, *args)
+
+
+def _coarse_pendant_window(img: np.ndarray):
+    """(x0, y0, x1, y1) window of ``img`` around the largest dark blob entering
+    from the top of a downscaled copy, or None for small frames"""
+    levels = pyramid_levels(img.shape)
+    if levels == 0:
+        return None
+
+    small = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    for _ in range(levels):
+        small = cv2.pyrDown(small)
+    threshold = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+    n_labels, _, stats, _ = cv2.connectedComponentsWithStats(threshold, 8)
+    top_entering = [i for i in range(1, n_labels) if stats[i, cv2.CC_STAT_TOP] == 0]
+    if not top_entering:
+        return None
+
+    blob = max(top_entering, key=lambda i: stats[i, cv2.CC_STAT_AREA])
+    x, y, w, h, _ = stats[blob]
+    scale = 2**levels
+    margin = PYRAMID_MARGIN * max(w, h)
+    return (
+        max(0, int((x - margin) * scale)),
+        0,
+        min(img.shape[1], int((x + w + margin) * scale)),
+        min(img.shape[0], int((y + h + margin) * scale)),
+    )
+
+
+def _find_ift_regions(
+    img: np.ndarray,
+    padding: int,
+    area_thresh: int,
+    drop_frac: float,
+    scharr_block: int,
+    canny1: float,
+    canny2: float,
+):
 
     original = img.copy()
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
@@ -276,6 +338,7 @@ def get_ift_regions(
         return drop_rect, needle_rect
 
 
+@timed("set_drop_region")
 def set_drop_region(
     experimental_drop: ExperimentalDrop,
     experimental_setup: ExperimentalSetup,
@@ -288,9 +351,17 @@ def set_drop_region(
     screen_position = set_screen_position(screen_size)
 
     if experimental_setup.drop_id_method == RegionSelect.AUTOMATED:
-        from opendrop_ml.modules.preprocessing.preprocessing import auto_crop
+        from opendrop_ml.modules.preprocessing.preprocessing import (
+            auto_crop,
+            get_drop_region_tracker,
+        )
 
-        experimental_drop.cropped_image, (left, right, top, bottom) = auto_crop(
+        if experimental_setup.track_drop_region:
+            # reuse the region of the previous frames while the drop stays put
+            crop = get_drop_region_tracker().crop
+        else:
+            crop = auto_crop
+        experimental_drop.cropped_image, (left, right, top, bottom) = crop(
             experimental_drop.image
         )
         # print("experimental_drop.cropped_image",experimental_drop.cropped_image is None)
@@ -584,6 +655,7 @@ def image_crop(image: np.ndarray, points):
     ]
 
 
+@timed("set_surface_line")
 def set_surface_line(
     experimental_drop: ExperimentalDrop, experimental_setup: ExperimentalSetup
 ) -> None:
@@ -617,13 +689,30 @@ def set_surface_line(
         user_line(experimental_drop, experimental_setup)
 
 
+@timed("correct_tilt")
 def correct_tilt(
     experimental_drop: ExperimentalDrop, experimental_setup: ExperimentalSetup
 ) -> None:
+    """Level the baseline, by rotating the cropped image or, with
+    ``contour_tilt_correction``, the extracted profile"""
     if experimental_setup.baseline_method == ThresholdSelect.AUTOMATED:
-        experimental_drop.cropped_image = tilt_correction(
-            experimental_drop.cropped_image, experimental_drop.contact_points
-        )
+        if experimental_setup.contour_tilt_correction:
+            # the profile is rotated in place and need not be extracted again
+            (
+                experimental_drop.cropped_image,
+                experimental_drop.contour,
+                experimental_drop.drop_contour,
+                experimental_drop.contact_points,
+            ) = contour_tilt_correction(
+                experimental_drop.cropped_image,
+                experimental_drop.contour,
+                experimental_drop.drop_contour,
+                experimental_drop.contact_points,
+            )
+        else:
+            experimental_drop.cropped_image = tilt_correction(
+                experimental_drop.cropped_image, experimental_drop.contact_points
+            )
 
     # gets tricky where the baseline is manually set because under the current workflow users would
     # be required to re-input their baseline until it's flat - when the baseline should be flat
@@ -1151,32 +1240,6 @@ def distance(p1, p2):
     return ((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2) ** 0.5
 
 
-def optimized_path(coords, start=None):
-    """This function finds the nearest point to a point
-    coords should be a list in this format coords = [ [x1, y1], [x2, y2] , ...]
-    https://stackoverflow.com/questions/45829155/sort-points-in-order-to-have-a-continuous-curve-using-python
-    """
-    if isinstance(coords, list) == False:
-        coords = coords.tolist()
-    if 0:
-        if isinstance(start, list) == False:
-            try:
-                start = start.tolist()
-            except:
-                start = list(start)
-    if start is None:
-        start = coords[0]
-    pass_by = coords
-    path = [start]
-    pass_by.remove(start)
-    while pass_by:
-        nearest = min(pass_by, key=lambda x: distance(path[-1], x))
-        path.append(nearest)
-        pass_by.remove(nearest)
-    path = np.array(path)
-    return path
-
-
 def intersection(center, radius, p1, p2):
     """find the two points where a secant intersects a circle"""
 
@@ -1,4 +1,6 @@
 from opendrop_ml.modules.image.select_regions import (
+    _find_ift_regions,
+    get_ift_regions,
     set_drop_region,
     set_surface_line,
     correct_tilt,
@@ -10,11 +12,17 @@ from opendrop_ml.modules.image.select_regions import (
     ML_prepare_hydrophobic,
 )
 from opendrop_ml.modules.core.classes import ExperimentalSetup, ExperimentalDrop
-from opendrop_ml.modules.preprocessing.preprocessing import prepare_hydrophobic
+from opendrop_ml.modules.preprocessing.preprocessing import (
+    _detect_drop,
+    _hough_drop,
+    auto_crop,
+    get_drop_region_tracker,
+    prepare_hydrophobic,
+    pyramid_levels,
+)
 from opendrop_ml.modules.fitting.fits import perform_fits
 from opendrop_ml.utils.enums import RegionSelect, ThresholdSelect
 
-from itertools import cycle
 from unittest.mock import patch, MagicMock
 from numpy.testing import assert_array_equal
 import numpy as np
@@ -148,6 +156,7 @@ class TestCorrectTilt(unittest.TestCase):
         experimental_drop.contact_points = [(10, 20), (90, 80)]
         experimental_setup = MagicMock()
         experimental_setup.baseline_method = ThresholdSelect.AUTOMATED
+        experimental_setup.contour_tilt_correction = False
 
         # Call the function to be tested
         correct_tilt(experimental_drop, experimental_setup)
@@ -162,6 +171,41 @@ class TestCorrectTilt(unittest.TestCase):
             np.array_equal(experimental_drop.cropped_image, mock_cropped_image)
         )
 
+    @patch("opendrop_ml.modules.image.select_regions.tilt_correction")
+    def test_correct_tilt_in_contour_space(self, mock_tilt_correction):
+        image = np.zeros((100, 200, 3), dtype=np.uint8)
+        cv2.line(image, (20, 70), (180, 80), (255, 255, 255), 1)
+        contact_points = {0: [20.0, 70.0], 1: [180.0, 80.0]}
+        drop_contour = np.array([[20.0, 70.0], [100.0, 30.0], [180.0, 80.0]])
+
+        experimental_drop = ExperimentalDrop()
+        experimental_drop.cropped_image = image
+        experimental_drop.contour = drop_contour.copy()
+        experimental_drop.drop_contour = drop_contour.copy()
+        experimental_drop.contact_points = contact_points
+        experimental_setup = ExperimentalSetup()
+        experimental_setup.contour_tilt_correction = True
+
+        correct_tilt(experimental_drop, experimental_setup)
+
+        mock_tilt_correction.assert_not_called()
+        (x1, y1), (x2, y2) = (
+            experimental_drop.contact_points[0],
+            experimental_drop.contact_points[1],
+        )
+        self.assertAlmostEqual(y1, y2)
+        # distances are kept and the contours move with the contact points
+        self.assertAlmostEqual(np.hypot(x2 - x1, y2 - y1), np.hypot(160, 10))
+        np.testing.assert_allclose(
+            experimental_drop.drop_contour[[0, 2]], [[x1, y1], [x2, y2]]
+        )
+        np.testing.assert_allclose(
+            experimental_drop.contour, experimental_drop.drop_contour
+        )
+        # the image is rotated with the profile, so the baseline stays on it
+        rows = np.nonzero(experimental_drop.cropped_image[:, 100, 0])[0]
+        self.assertLessEqual(abs(rows.mean() - y1), 1)
+
 
 class TestDrawRectangle(unittest.TestCase):
 
@@ -246,23 +290,126 @@ class TestDrawLine(unittest.TestCase):
         self.assertEqual(args[4], 2)  # Compare line thickness
 
 
-class TestOptimizedPath(unittest.TestCase):
+def sessile_drop_frame(center_x=320, radius=80, scale=1):
+    """Dark drop sitting on a dark substrate in front of a light background"""
+    image = np.full((480 * scale, 640 * scale, 3), 220, dtype=np.uint8)
+    cv2.rectangle(
+        image, (0, 300 * scale), (640 * scale - 1, 480 * scale - 1), (60, 60, 60), -1
+    )
+    cv2.circle(image, (center_x * scale, 300 * scale), radius * scale, (40, 40, 40), -1)
+    return image
 
-    def test_optimized_path_with_mock_distance(self):
-        coords = [(0, 0), (1, 2), (3, 4), (5, 6)]
-        start = (0, 0)
 
-        # Use patch to mock the behavior of distance function
+def crop_rows_and_columns(cropped_image, bounds, row_offset):
+    left, _, top, _ = bounds
+    height, width = cropped_image.shape[:2]
+    return np.array([row_offset + top, row_offset + top + height, left, left + width])
+
+
+class TestPyramidDetection(unittest.TestCase):
+
+    def test_pyramid_levels(self):
+        self.assertEqual(pyramid_levels((480, 640, 3)), 0)
+        self.assertEqual(pyramid_levels((3000, 4000, 3)), 2)
+
+    def test_large_frame_crop_matches_full_resolution_search(self):
+        image = sessile_drop_frame(scale=5)
+        self.assertGreater(pyramid_levels(image.shape), 0)
+
+        full = crop_rows_and_columns(*_hough_drop(image, 50, 150, 3, 0))
+        coarse_to_fine = crop_rows_and_columns(*_detect_drop(image, 50, 150, 3, 0))
+        np.testing.assert_allclose(coarse_to_fine, full, atol=10)
+
+    def test_large_frame_ift_regions_match_full_resolution_search(self):
+        image = cv2.imread(
+            os.path.join(
+                os.path.dirname(__file__),
+                "../../experimental_data_set/ift/water_in_air001.png",
+            )
+        )
+        image = cv2.resize(image, None, fx=3, fy=3)
+        self.assertGreater(pyramid_levels(image.shape), 0)
+
+        full = _find_ift_regions(image, 5, 1, 1, 5, 80, 160)
+        coarse_to_fine = get_ift_regions(image)
+        for expected, region in zip(full, coarse_to_fine):
+            np.testing.assert_allclose(
+                [region.x0, region.y0, region.x1, region.y1],
+                [expected.x0, expected.y0, expected.x1, expected.y1],
+                atol=3,
+            )
+
+
+class TestDropRegionTracking(unittest.TestCase):
+
+    def setUp(self):
+        get_drop_region_tracker().reset()
+
+    def tearDown(self):
+        get_drop_region_tracker().reset()
+
+    def track(self, image):
+        experimental_drop = ExperimentalDrop()
+        experimental_drop.image = image
+        experimental_setup = ExperimentalSetup()
+        experimental_setup.drop_id_method = RegionSelect.AUTOMATED
+        experimental_setup.screen_resolution = [1, 1]
+        experimental_setup.track_drop_region = True
+        set_drop_region(experimental_drop, experimental_setup)
+        return experimental_drop.cropped_image, experimental_setup.drop_region
+
+    def test_first_frame_matches_auto_crop(self):
+        image = sessile_drop_frame()
+        cropped_image, region = self.track(image)
+
+        expected_image, (left, right, top, bottom) = auto_crop(image)
+        assert_array_equal(cropped_image, expected_image)
+        self.assertEqual(region, [(left, top), (right, bottom)])
+
+    def test_region_is_reused_while_the_drop_stays_put(self):
+        _, region = self.track(sessile_drop_frame())
         with patch(
-            "opendrop_ml.modules.image.select_regions.distance", side_effect=cycle([1])
-        ) as mock_distance:
-            result = optimized_path(coords, start)
+            "opendrop_ml.modules.preprocessing.preprocessing._detect_drop"
+        ) as mock_detect:
+            cropped_image, next_region = self.track(sessile_drop_frame(321, 81))
+
+        mock_detect.assert_not_called()
+        self.assertEqual(next_region, region)
+        tracker = get_drop_region_tracker()
+        y0, y1, x0, x1 = tracker.region
+        assert_array_equal(cropped_image, sessile_drop_frame(321, 81)[y0:y1, x0:x1])
+
+    def test_drop_is_detected_again_once_it_moves(self):
+        _, region = self.track(sessile_drop_frame())
+        cropped_image, next_region = self.track(sessile_drop_frame(400))
+
+        expected_image, (left, right, top, bottom) = auto_crop(sessile_drop_frame(400))
+        self.assertNotEqual(next_region, region)
+        self.assertEqual(next_region, [(left, top), (right, bottom)])
+        assert_array_equal(cropped_image, expected_image)
+        self.assertEqual(get_drop_region_tracker().misses, 2)
+
+    def test_drop_is_detected_again_once_it_spreads(self):
+        self.track(sessile_drop_frame(radius=80))
+        self.track(sessile_drop_frame(radius=110))
+        self.assertEqual(get_drop_region_tracker().misses, 2)
+
+    def test_frames_of_another_size_are_detected_again(self):
+        self.track(sessile_drop_frame())
+        self.track(sessile_drop_frame()[:400])
+        self.assertEqual(get_drop_region_tracker().misses, 2)
 
-            # Add debug output
-            print("Distance call count:", mock_distance.call_count)
 
-            # Expected call count is 6 times
-            self.assertEqual(mock_distance.call_count, 6)
+class TestOptimizedPath(unittest.TestCase):
+
+    def test_optimized_path_with_start(self):
+        coords = [(0, 0), (1, 2), (3, 4), (5, 6)]
+        start = (3, 4)
+
+        # (1, 2) and (5, 6) are equally near start, the earlier point wins
+        result = optimized_path(coords, start)
+        expected_result = np.array([(3, 4), (1, 2), (0, 0), (5, 6)])
+        np.testing.assert_array_equal(result, expected_result)
 
     def test_optimized_path_without_start(self):
         coords = [(0, 0), (1, 2), (3, 4), (5, 6)]
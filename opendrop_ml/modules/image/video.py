@@ -0,0 +1,226 @@
+"""Video files as a source of frames.
+
+A video in ``import_files`` stands for the frames selected from it, each
+referred to as ``<video path>#frame=<index>``, so the rest of the pipeline
+(results, views, workers) keeps indexing frames by position. Frames are
+decoded in order by one reader per video and thread: reading the next
+selected frame only skips ahead, so a run never decodes the video more than
+once and no frame is written out as an image first.
+
+The time of a video frame is its timestamp in the container, recorded in
+``ExperimentalSetup.frame_times`` when it is decoded, instead of
+``frame_interval`` times its index.
+"""
+
+from collections import OrderedDict
+from PIL import Image
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import threading
+import math
+import cv2
+import os
+
+VIDEO_EXTENSIONS = (".avi", ".mp4", ".mkv", ".mov")
+
+FRAME_SEPARATOR = "#frame="
+
+# frames skipped by decoding them rather than seeking; seeking restarts from
+# the previous key frame, so is only worth it for long jumps
+MAX_SKIPPED_FRAMES = 250
+
+# open readers kept per process
+MAX_READERS = 4
+
+
+def is_video(path: str) -> bool:
+    return isinstance(path, str) and path.lower().endswith(VIDEO_EXTENSIONS)
+
+
+def frame_ref(path: str, index: int) -> str:
+    return f"{path}{FRAME_SEPARATOR}{index}"
+
+
+def parse_frame_ref(ref) -> Optional[Tuple[str, int]]:
+    """``(video path, frame index)`` of a frame reference, None for a file"""
+    if not isinstance(ref, str) or FRAME_SEPARATOR not in ref:
+        return None
+    path, index = ref.rsplit(FRAME_SEPARATOR, 1)
+    if not index.isdigit() or not is_video(path):
+        return None
+    return path, int(index)
+
+
+def video_frames(
+    path: str,
+    stride: int = 1,
+    start_s: Optional[float] = None,
+    end_s: Optional[float] = None,
+) -> List[str]:
+    """References to every ``stride``-th frame of the video between
+    ``start_s`` and ``end_s`` seconds.
+
+    The range is turned into frame indices with the container's frame count
+    and rate, so nothing is decoded here.
+    """
+    capture = cv2.VideoCapture(path)
+    try:
+        if not capture.isOpened():
+            raise IOError(f"Could not open video {path}")
+        n_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0
+    finally:
+        capture.release()
+
+    first, last = 0, n_frames
+    if fps > 0:
+        if start_s is not None:
+            first = max(0, math.ceil(start_s * fps - 1e-9))
+        if end_s is not None:
+            last = min(n_frames, math.floor(end_s * fps + 1e-9) + 1)
+    return [frame_ref(path, i) for i in range(first, last, max(1, int(stride)))]
+
+
+def expand_import_files(
+    paths: Sequence[str],
+    stride: int = 1,
+    start_s: Optional[float] = None,
+    end_s: Optional[float] = None,
+) -> List[str]:
+    """``paths`` with each video replaced by its selected frames"""
+    import_files = []
+    for path in paths:
+        if is_video(path):
+            import_files += video_frames(path, stride, start_s, end_s)
+        else:
+            import_files.append(path)
+    return import_files
+
+
+def set_import_files(user_input_data, paths: Sequence[str]) -> None:
+    """Set the frames to analyse to the images and videos in ``paths``,
+    with the video frames selected by the setup's stride and time range"""
+    user_input_data.import_files = expand_import_files(
+        paths,
+        user_input_data.video_frame_stride,
+        user_input_data.video_start_s,
+        user_input_data.video_end_s,
+    )
+    user_input_data.number_of_frames = len(user_input_data.import_files)
+    user_input_data.frame_times = {}
+
+
+def frame_time(user_input_data, i: int) -> float:
+    """Time in seconds of frame ``i``: its timestamp in the video once
+    decoded, otherwise ``frame_interval`` times the index"""
+    frame_times: Dict[int, Optional[float]] = user_input_data.frame_times
+    if frame_times.get(i) is not None:
+        return frame_times[i]
+    return user_input_data.frame_interval * i
+
+
+class VideoReader:
+    """Decodes the frames of a video, reading forward from the last frame
+    read and seeking only to go back or jump far ahead"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise IOError(f"Could not open video {path}")
+        # index of the frame the next read returns
+        self.position = 0
+        self.closed = False
+        # held while decoding, so a reader evicted by another thread is only
+        # released once its read is done
+        self._lock = threading.Lock()
+
+    def read(self, index: int) -> Tuple[Optional[np.ndarray], Optional[float]]:
+        """BGR image of frame ``index`` and its timestamp in seconds;
+        IOError if the reader is closed"""
+        with self._lock:
+            if self.closed:
+                raise IOError(f"Reader of {self.path} is closed")
+            skipped = index - self.position
+            if skipped < 0 or skipped > MAX_SKIPPED_FRAMES:
+                self.capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+            else:
+                for _ in range(skipped):
+                    # grab() decodes without converting the frame
+                    self.capture.grab()
+            self.position = index + 1
+            ok, image = self.capture.read()
+            if not ok:
+                return None, None
+            return image, self.capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            self.capture.release()
+
+
+_readers: "OrderedDict[Tuple[str, int], VideoReader]" = OrderedDict()
+_readers_lock = threading.Lock()
+
+
+def get_reader(path: str) -> VideoReader:
+    """Reader of ``path`` for this thread, so the analysis and the views
+    each read their frames in order"""
+    key = (path, threading.get_ident())
+    evicted = []
+    with _readers_lock:
+        reader = _readers.get(key)
+        if reader is None:
+            reader = _readers[key] = VideoReader(path)
+            while len(_readers) > MAX_READERS:
+                evicted.append(_readers.popitem(last=False)[1])
+        _readers.move_to_end(key)
+    # outside the lock, as closing waits for a read in another thread
+    for old in evicted:
+        old.close()
+    return reader
+
+
+def read_frame(ref: str) -> Tuple[Optional[np.ndarray], Optional[float]]:
+    """BGR image of an image file or video frame, with the frame's time in
+    the video (None for an image file)"""
+    video_frame = parse_frame_ref(ref)
+    if video_frame is None:
+        return cv2.imread(ref, cv2.IMREAD_COLOR), None
+    path, index = video_frame
+    while True:
+        reader = get_reader(path)
+        try:
+            return reader.read(index)
+        except IOError:
+            if not reader.closed:
+                raise
+            # evicted by another thread between getting and reading it; the
+            # next get_reader opens a new one
+
+
+def read_frame_image(ref: str) -> Optional[np.ndarray]:
+    return read_frame(ref)[0]
+
+
+def open_frame(ref: str) -> Image.Image:
+    """``ref`` as a PIL image, for display"""
+    if parse_frame_ref(ref) is None:
+        with Image.open(ref) as opened:
+            opened.load()
+            return opened.copy()
+    image = read_frame_image(ref)
+    if image is None:
+        raise IOError(f"Could not read {ref}")
+    return Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+
+
+def frame_file_name(ref: str, extension: str = ".png") -> str:
+    """File name for an image made from frame ``ref``"""
+    video_frame = parse_frame_ref(ref)
+    if video_frame is None:
+        return os.path.basename(ref)
+    path, index = video_frame
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}_frame{index:06d}{extension}"
@@ -0,0 +1,157 @@
+from opendrop_ml.modules.image import video as video_module
+from opendrop_ml.modules.image.video import (
+    VideoReader,
+    expand_import_files,
+    frame_file_name,
+    frame_ref,
+    frame_time,
+    get_reader,
+    open_frame,
+    parse_frame_ref,
+    read_frame,
+    set_import_files,
+    video_frames,
+)
+from opendrop_ml.modules.core.classes import ExperimentalSetup
+
+import numpy as np
+import threading
+import pytest
+import cv2
+
+FPS = 25
+
+
+def make_video(path, n_frames=20, fps=FPS):
+    """Frame i is a flat grey of 10 * i"""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (64, 48))
+    for i in range(n_frames):
+        writer.write(np.full((48, 64, 3), 10 * i, np.uint8))
+    writer.release()
+    return str(path)
+
+
+@pytest.fixture
+def video(tmp_path):
+    return make_video(tmp_path / "drop.avi")
+
+
+def grey(image):
+    return int(round(image.mean() / 10))
+
+
+def test_frame_refs(video):
+    assert parse_frame_ref(frame_ref(video, 12)) == (video, 12)
+    assert parse_frame_ref("image#frame=3.png") is None
+    assert parse_frame_ref("image.png") is None
+    assert parse_frame_ref(None) is None
+
+
+def test_video_frames_stride_and_range(video):
+    assert len(video_frames(video)) == 20
+    assert video_frames(video, stride=5) == [
+        frame_ref(video, i) for i in (0, 5, 10, 15)
+    ]
+    # 0.2 s to 0.4 s at 25 fps is frames 5 to 10
+    assert video_frames(video, start_s=0.2, end_s=0.4) == [
+        frame_ref(video, i) for i in range(5, 11)
+    ]
+
+    with pytest.raises(IOError):
+        video_frames(video + ".missing.avi")
+
+
+def test_reader_reads_forward_and_back(video):
+    reader = VideoReader(video)
+    for index in (0, 1, 4, 9):
+        image, timestamp = reader.read(index)
+        assert grey(image) == index
+        assert timestamp == pytest.approx(index / FPS)
+    image, timestamp = reader.read(2)
+    assert grey(image) == 2 and timestamp == pytest.approx(2 / FPS)
+    assert reader.read(50) == (None, None)
+    reader.close()
+
+
+def test_closed_reader_refuses_to_read(video):
+    reader = VideoReader(video)
+    reader.close()
+    with pytest.raises(IOError):
+        reader.read(0)
+
+
+def test_evicted_reader_is_replaced(video, monkeypatch):
+    monkeypatch.setattr(video_module, "MAX_READERS", 1)
+    reader = get_reader(video)
+
+    # another thread's reader takes this thread's place
+    thread = threading.Thread(target=get_reader, args=(video,))
+    thread.start()
+    thread.join()
+
+    assert reader.closed
+    image, _ = read_frame(frame_ref(video, 3))
+    assert grey(image) == 3
+    assert get_reader(video) is not reader
+
+
+def test_threads_evicting_each_others_readers(video, monkeypatch):
+    monkeypatch.setattr(video_module, "MAX_READERS", 1)
+    failures = []
+
+    def read_all():
+        for index in range(20):
+            image, _ = read_frame(frame_ref(video, index))
+            if image is None or grey(image) != index:
+                failures.append(index)
+
+    threads = [threading.Thread(target=read_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+
+
+def test_read_frame_of_file_and_video(tmp_path, video):
+    path = str(tmp_path / "still.png")
+    cv2.imwrite(path, np.full((8, 8, 3), 70, np.uint8))
+
+    image, timestamp = read_frame(path)
+    assert grey(image) == 7 and timestamp is None
+    image, timestamp = read_frame(frame_ref(video, 3))
+    assert grey(image) == 3 and timestamp == pytest.approx(3 / FPS)
+    assert open_frame(frame_ref(video, 3)).size == (64, 48)
+
+
+def test_set_import_files_expands_videos(video):
+    user_input_data = ExperimentalSetup()
+    user_input_data.video_frame_stride = 10
+    user_input_data.frame_times = {0: 1.0}
+
+    set_import_files(user_input_data, ["a.png", video])
+
+    assert user_input_data.import_files == [
+        "a.png",
+        frame_ref(video, 0),
+        frame_ref(video, 10),
+    ]
+    assert user_input_data.number_of_frames == 3
+    assert user_input_data.frame_times == {}
+    assert expand_import_files(["a.png", "b.png"]) == ["a.png", "b.png"]
+
+
+def test_frame_time():
+    user_input_data = ExperimentalSetup()
+    user_input_data.frame_interval = 2
+    user_input_data.frame_times = {1: 0.04, 2: None}
+
+    assert frame_time(user_input_data, 1) == 0.04
+    assert frame_time(user_input_data, 2) == 4
+    assert frame_time(user_input_data, 3) == 6
+
+
+def test_frame_file_name(video):
+    assert frame_file_name("/data/drop.png") == "drop.png"
+    assert frame_file_name(frame_ref(video, 12)) == "drop_frame000012.png"
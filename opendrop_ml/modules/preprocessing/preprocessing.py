@@ -9,16 +9,37 @@ followed by cropping of the image to isolate the drop. Tilt correction is then
 performed using the identified contact points of the drop.
 """
 
-from opendrop_ml.modules.fitting.BA_fit import CV2_VERSION
+from opendrop_ml.utils.config import CV2_VERSION
+from opendrop_ml.utils.contour import cluster_optics, optimized_path, unique_points
+from opendrop_ml.utils.profiling import stage, timed
+from opendrop_ml.utils.lazy import lazy_import
 
-from sklearn.cluster import OPTICS  # for clustering algorithm
-from scipy import misc, ndimage  # for tilt_correction
+from scipy import ndimage  # for tilt_correction
 import numpy as np
-import matplotlib.pyplot as plt
 import cv2
 import math  # for tilt_correction
 
+plt = lazy_import("matplotlib.pyplot")
 
+
+# frames whose longest side is above this are searched at a lower resolution
+# first, halving it until the longest side is at most this long
+PYRAMID_MAX_SIZE = 1600
+# margin around the coarsely found drop that is searched at full resolution,
+# as a fraction of the size of the drop region
+PYRAMID_MARGIN = 0.25
+
+
+def pyramid_levels(shape) -> int:
+    """Number of times a frame of ``shape`` is halved before the coarse search"""
+    levels, size = 0, max(shape[:2])
+    while size > PYRAMID_MAX_SIZE:
+        levels += 1
+        size //= 2
+    return levels
+
+
+@timed("auto_crop")
 def auto_crop(
     img: np.ndarray, low=50, high=150, aperture_size=3, verbose=0
 ):  # DS 08/06/23
@@ -42,6 +63,64 @@ def auto_crop(
              bounding box
     """
 
+    new_img, bounds, _ = _detect_drop(img, low, high, aperture_size, verbose)
+    return new_img, bounds
+
+
+def _detect_drop(img: np.ndarray, low, high, aperture_size, verbose):
+    """Detection behind ``auto_crop``, also returning the first row of the
+    image the bounds are relative to.
+
+    Large frames are searched on a downscaled copy first, and the Hough
+    detection is then repeated at full resolution in a window around the
+    drop found there.
+    """
+    window = None
+    if verbose == 0:
+        window = _coarse_drop_window(img, low, high, aperture_size)
+    if window is not None:
+        x0, y0, x1, y1 = window
+        found = _hough_drop(img[y0:y1, x0:x1], low, high, aperture_size, verbose)
+        # otherwise the drop was lost in the window, search everywhere
+        if found is not None and found[0].size:
+            new_img, (left, right, top, bottom), row_offset = found
+            return new_img, [left + x0, right + x0, top, bottom], row_offset + y0
+
+    found = _hough_drop(img, low, high, aperture_size, verbose)
+    if found is None:
+        raise ValueError("Hough circle failed to identify a drop")
+    return found
+
+
+def _coarse_drop_window(img: np.ndarray, low, high, aperture_size):
+    """(x0, y0, x1, y1) window of ``img`` around the drop found on a
+    downscaled copy, or None for small frames or if the search fails"""
+    levels = pyramid_levels(img.shape)
+    if levels == 0:
+        return None
+
+    small = img
+    for _ in range(levels):
+        small = cv2.pyrDown(small)
+    found = _hough_drop(small, low, high, aperture_size, 0)
+    # without a drop, it is left to the full resolution search
+    if found is None or found[0].size == 0:
+        return None
+    new_img, (left, _, top, _), row_offset = found
+
+    scale = 2**levels
+    height, width = new_img.shape[:2]
+    margin = PYRAMID_MARGIN * max(height, width)
+    x0 = max(0, int((left - margin) * scale))
+    x1 = min(img.shape[1], int((left + width + margin) * scale))
+    y0 = max(0, int((row_offset + top - margin) * scale))
+    y1 = min(img.shape[0], int((row_offset + top + height + margin) * scale))
+    return x0, y0, x1, y1
+
+
+def _hough_drop(img: np.ndarray, low, high, aperture_size, verbose):
+    """``(cropped image, bounds, row offset)`` of the drop, or None if no
+    circle is found"""
     if verbose >= 1:
         print("Performing auto-cropping, please wait...")
 
@@ -123,6 +202,7 @@ def auto_crop(
                 plt.close()
     else:
         print("Hough circle failed to identify a drop")
+        return None
 
     # crop image based on circle found (this prevents hough line identifying the needle)
     bottom = int(center[1] + (radius * 1.2))  # add 20% padding
@@ -133,6 +213,8 @@ def auto_crop(
         top = 0
 
     img = img[top:bottom, :]
+    # the bounds below are relative to this horizontal strip
+    row_offset = top
     edges = cv2.Canny(img, 50, 150, apertureSize=3)
     # reassign circle center to new cropped image
     center = (center[0], -(center[1] - bottom))
@@ -262,7 +344,114 @@ def auto_crop(
         plt.show()
         plt.close()
 
-    return new_img, bounds
+    return new_img, bounds, row_offset
+
+
+class DropRegionTracker:
+    """Reuses the drop region of earlier frames in a time series.
+
+    The region found by the full Hough detection of ``auto_crop`` is kept,
+    together with a grayscale copy of the frame inside it. Later frames are
+    cropped to the same region as long as the frame still matches the copy
+    near the edges of the region, where the substrate baseline meets the
+    sides and where a drifting or spreading drop would first show, and the
+    dark pixels inside the region have not moved. Otherwise, or after
+    ``max_age`` frames, the region is detected afresh.
+    """
+
+    # intensity change that counts a pixel as different
+    PIXEL_TOLERANCE = 25
+    # fraction of the border pixels allowed to differ
+    BORDER_TOLERANCE = 0.02
+    # width of the border that is checked, as a fraction of the region size
+    BORDER_FRACTION = 1 / 12
+
+    def __init__(self, max_age: int = 100):
+        self.max_age = max_age
+        self.reset()
+
+    def reset(self):
+        self.shape = None
+        self.region = None  # rows and columns of the frame, (y0, y1, x0, x1)
+        self.bounds = None
+        self.reference = None
+        self.centroid = None
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
+
+    def copy_from(self, other: "DropRegionTracker"):
+        self.__dict__.update(other.__dict__)
+
+    def crop(self, img: np.ndarray):
+        """Crop ``img`` to the drop, as ``auto_crop`` does"""
+        if self.matches(img):
+            self.age += 1
+            self.hits += 1
+            y0, y1, x0, x1 = self.region
+            return img[y0:y1, x0:x1], list(self.bounds)
+
+        self.misses += 1
+        with stage("auto_crop"):
+            new_img, bounds, row_offset = _detect_drop(img, 50, 150, 3, 0)
+        left, right, top, bottom = bounds
+        y0 = row_offset + top
+        self.shape = img.shape
+        self.region = (y0, y0 + new_img.shape[0], left, left + new_img.shape[1])
+        self.bounds = list(bounds)
+        self.reference = self._gray(new_img)
+        self.centroid = self._dark_centroid(self.reference)
+        self.age = 0
+        return new_img, bounds
+
+    def matches(self, img: np.ndarray) -> bool:
+        """Whether ``img`` can be cropped to the current region"""
+        if self.region is None or img.shape != self.shape:
+            return False
+        if self.age >= self.max_age or min(self.reference.shape) < 4:
+            return False
+
+        y0, y1, x0, x1 = self.region
+        gray = self._gray(img[y0:y1, x0:x1])
+
+        width = max(2, int(max(gray.shape) * self.BORDER_FRACTION))
+        border = np.ones(gray.shape, dtype=bool)
+        border[width:-width, width:-width] = False
+        changed = (
+            np.abs(gray[border].astype(np.int16) - self.reference[border])
+            > self.PIXEL_TOLERANCE
+        )
+        if np.mean(changed) > self.BORDER_TOLERANCE:
+            return False
+
+        centroid = self._dark_centroid(gray)
+        if centroid is None or self.centroid is None:
+            return False
+        return np.hypot(*(centroid - self.centroid)) <= width
+
+    @staticmethod
+    def _gray(img: np.ndarray) -> np.ndarray:
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return img.astype(np.int16)
+
+    @staticmethod
+    def _dark_centroid(gray: np.ndarray):
+        """Centroid of the pixels darker than the Otsu threshold"""
+        gray = gray.astype(np.uint8)
+        _, dark = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        ys, xs = np.nonzero(dark)
+        if len(xs) == 0:
+            return None
+        return np.array([xs.mean(), ys.mean()])
+
+
+_drop_tracker = DropRegionTracker()
+
+
+def get_drop_region_tracker() -> DropRegionTracker:
+    """The drop region tracker shared by the frames of this process"""
+    return _drop_tracker
 
 
 def find_intersection(baseline_coeffs, circ_params):
@@ -318,101 +507,13 @@ def find_intersection(baseline_coeffs, circ_params):
     return x_t, y_t
 
 
-def cluster_optics(sample, out_style="coords", xi=None, eps=None, verbose=0):
-    """Takes an array (or list) of the form [[x1,y1],[x2,y2],...,[xn,yn]].
-    Clusters are outputted in the form of a dictionary.
-
-    If out_style='coords' each dictionary entry is a group, and points are outputted in as a numpy array
-    in coordinate form.
-    If out_xy='xy' there are two dictionary entries for each group, one labeled as nx and one as ny
-    (where n is the label of the group). Each of these are 1D numpy arrays
-
-    If xi (float between 0 and 1) is not None and eps is None, then the xi clustering method is used.
-    The optics algorithm defines clusters based on the minimum steepness on the reachability plot.
-    For example, an upwards point in the reachability plot is defined by the ratio from one point to
-    its successor being at most 1-xi.
-
-    If eps (float) is not None and xi is None, then the dbscan clustering method is used. Where eps is the
-    maximum distance between two samples for one to be considered as in the neighborhood of the other.
-
-    https://stackoverflow.com/questions/47974874/algorithm-for-grouping-points-in-given-distance
-    https://scikit-learn.org/stable/modules/generated/sklearn.cluster.OPTICS.html
-    """
-    if eps != None and xi == None:
-        clustering = OPTICS(min_samples=2, cluster_method="dbscan", eps=eps).fit(
-            sample
-        )  # cluster_method changed to dbscan (so eps can be set)
-    elif xi != None and eps == None:
-        # original had xi = 0.05, xi as 0.1 in function input
-        clustering = OPTICS(min_samples=2, xi=xi).fit(sample)
-    else:
-        raise "Error: only one of eps and xi can be chosen but not neither nor both"
-    groups = list(set(clustering.labels_))
-
-    if verbose == 2:
-        print(clustering.labels_)
-    elif verbose == 1:
-        print(groups)
-
-    dic = {}
-    for n in groups:
-        if n not in dic:
-            dic[n] = []
-        for i in range(len(sample)):
-            if clustering.labels_[i] == n:
-                dic[n].append(list(sample[i]))
-        dic[n] = np.array(dic[n])
-
-    # separate points and graph
-    dic2 = {}
-    for k in dic.keys():
-        x = []
-        y = []
-        for i in range(len(dic[k])):
-            x.append(dic[k][i][0])
-        dic2[str(k) + "x"] = np.array(x)
-        for i in range(len(dic[k])):
-            y.append(dic[k][i][1])
-        dic2[str(k) + "y"] = np.array(y)
-
-    if out_style == "coords":
-        return dic
-    elif out_style == "xy":
-        return dic2
-
-
 def distance1(p1, p2):
     """This function computes the distance between 2 points defined by
     P1 = (x1,y1) and P2 = (x2,y2)"""
     return ((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2) ** 0.5
 
 
-def optimized_path(coords, start=None):
-    """This function finds the nearest point to a point
-    coords should be a list in this format coords = [ [x1, y1], [x2, y2] , ...]
-    https://stackoverflow.com/questions/45829155/sort-points-in-order-to-have-a-continuous-curve-using-python
-    """
-    if isinstance(coords, list) == False:
-        coords = coords.tolist()
-    if 0:
-        if isinstance(start, list) == False:
-            try:
-                start = start.tolist()
-            except:
-                start = list(start)
-    if start is None:
-        start = coords[0]
-    pass_by = coords
-    path = [start]
-    pass_by.remove(start)
-    while pass_by:
-        nearest = min(pass_by, key=lambda x: distance1(path[-1], x))
-        path.append(nearest)
-        pass_by.remove(nearest)
-    path = np.array(path)
-    return path
-
-
+@timed("prepare_hydrophobic")
 def prepare_hydrophobic(coords, xi=0.8, cluster=True, display=False):
     """takes an array (n,2) of coordinate points, and returns the left and right halfdrops of the contour.
     xi determines the minimum steepness on the reachability plot that constitutes a cluster boundary of the
@@ -421,24 +522,10 @@ def prepare_hydrophobic(coords, xi=0.8, cluster=True, display=False):
 
     This code is adapted from the prepare module, but this version differs in that it assumes that the drop
     is hydrophobic."""
-    coords = coords.astype(float)
-
     # flip contour so that min and max values are correct
-    for coord in coords:
-        coord[1] = -coord[1]
-
-    longest = coords
-
-    # print("first few coordinates of the longest contour: ",longest[:3])
-
-    xlongest = []
-    ylongest = []
-    for i in range(len(longest)):
-        xlongest.append(longest[i][0])
-        ylongest.append(longest[i][1])
-
-    # print("first few x coordinates of the longest contour: ",xlongest[:3])
-    # print("first few y coordinates of the longest contour: ",ylongest[:3])
+    longest = np.asarray(coords, dtype=float) * [1, -1]
+    if len(longest) == 0:
+        raise IndexError("cannot prepare an empty contour")
 
     # Find a appropriate epsilon value for cluster_optics, this will remove noise in the bottom 10% of the drop
     # .   most importantly noise is reduced at contact points.
@@ -447,43 +534,22 @@ def prepare_hydrophobic(coords, xi=0.8, cluster=True, display=False):
     # the full contour, and whether we use the max(distance) between points or the average between points, or
     # a scalar value of either.
 
-    xtop = []  # isolate top 90% of drop
-    ytop = []
     percent = 0.3
-    # print('Isolate the top ',100-(percent*100),'% of the contour:')
-    for n, y in enumerate(ylongest):
-        if y > min(ylongest) + (max(ylongest) - min(ylongest)) * percent:
-            xtop.append(xlongest[n])
-            ytop.append(y)
-    xtop = np.array(xtop)
-    ytop = np.array(ytop)
-
-    top = []
-    for n, x in enumerate(xtop):
-        top.append([xtop[n], ytop[n]])
-    top = np.array(top)
-    top_array = optimized_path(top)
-
-    dists = []  # find the average distance between consecutive points
-    for n, co in enumerate(top_array):
-        if 1 < n:
-            a = top_array[n]
-            dist = np.linalg.norm(top_array[n] - top_array[n - 1])
-            dists.append(dist)
+    top_array = optimized_path(longest[_above(longest[:, 1], percent)])
+
+    # find the average distance between consecutive points, from the second step on
+    dists = np.linalg.norm(np.diff(top_array[1:], axis=0), axis=1)
 
     # how epsilon is chosen here is important
-    # eps = (sum(dists)/len(dists))*2 # eps is 2 times the average distance between points
-    # eps is 2.5 times the average distance between points
-    eps = (sum(dists) / len(dists)) * 1.5
+    # eps is 1.5 times the average distance between points
+    eps = dists.mean() * 1.5
     if display:
-        # print(dists)
         print()
         print("Max dist between points is: ", max(dists))
-        print("Average dist between points is: ", sum(dists) / len(dists))
+        print("Average dist between points is: ", dists.mean())
         print()
         print("Sort using cluster_optics with an epsilon value of ", eps)
-    input_contour = np.array(longest)
-    dic = cluster_optics(input_contour, eps=eps)
+    dic = cluster_optics(longest, eps=eps)
     if display:
         jet = plt.get_cmap("jet")
         colors = iter(jet(np.linspace(0, 1, len(list(dic.keys())))))
@@ -499,55 +565,21 @@ def prepare_hydrophobic(coords, xi=0.8, cluster=True, display=False):
 
     maxkey = max(dic, key=lambda k: len(dic[k]))
     longest = dic[maxkey]
-    # print("first few coordinates of the longest contour: ",longest[:3])
-
-    xlongest = []
-    ylongest = []
-    for i in range(len(longest)):
-        xlongest.append(longest[i][0])
-        ylongest.append(longest[i][1])
-
-    outline = np.empty((len(xlongest), 2))
-    for i in range(len(xlongest)):
-        outline[i, [0]] = xlongest[i]
-        outline[i, [1]] = ylongest[i]
 
     ############################
 
     # find the apex of the drop and split the contour into left and right sides
 
-    xtop = []  # isolate top 90% of drop
-    ytop = []
-    # percent = 0.1 # already defined
-    # print('isolate the top ',100-(percent*100),'% of the contour:')
-    for n, y in enumerate(ylongest):
-        if y > min(ylongest) + (max(ylongest) - min(ylongest)) * percent:
-            xtop.append(xlongest[n])
-            ytop.append(y)
-    xapex = (max(xtop) + min(xtop)) / 2
-
-    l_drop = []
-    r_drop = []
-    for n in longest:
-        if n[0] <= xapex:
-            l_drop.append(n)
-        if n[0] >= xapex:
-            r_drop.append(n)
-    l_drop = np.array(l_drop)
-    r_drop = np.array(r_drop)
+    xtop = longest[_above(longest[:, 1], percent), 0]
+    xapex = (xtop.max() + xtop.min()) / 2
 
     # transpose both half drops so that they both face right and the apex of both is at 0,0
-    r_drop[:, 0] = r_drop[:, 0] - xapex
-    l_drop[:, 0] = -l_drop[:, 0] + xapex
+    l_drop = longest[longest[:, 0] <= xapex] * [-1, 1] + [xapex, 0]
+    r_drop = longest[longest[:, 0] >= xapex] - [xapex, 0]
 
     if display:
         plt.plot(r_drop[:, [0]], r_drop[:, [1]], "b,")
-        # plt.show()
-        # plt.close()
         plt.plot(l_drop[:, [0]], l_drop[:, [1]], "r,")
-        # plt.gca().set_aspect('equal', adjustable='box')
-        # plt.xlim([470,530])
-        # plt.ylim([-188,-190])
         plt.show()
         plt.close()
 
@@ -555,378 +587,31 @@ def prepare_hydrophobic(coords, xi=0.8, cluster=True, display=False):
 
     # the drop has been split in half
 
-    # this system has a user input which gives a rough indication of the contact point and the surface line
-
-    # isolate the bottom 5% of the contour near the contact point
+    # isolate the bottom of the contour near the contact point
 
     drops = {}
-    counter = 0
-    crop_drop = {}
     CPs = {}
-    for halfdrop in [l_drop, r_drop]:
-        new_halfdrop = sorted(
-            halfdrop.tolist(), key=lambda x: (x[0], -x[1])
-        )  # top left to bottom right
-        new_halfdrop = optimized_path(new_halfdrop)  # [::-1]
-
-        xnew_halfdrop = new_halfdrop[:, [0]].reshape(len(new_halfdrop[:, [0]]))
-        ynew_halfdrop = new_halfdrop[:, [1]].reshape(len(new_halfdrop[:, [1]]))
-
-        # isolate the bottom of the drop to help identify contact points (may not need to do this for all scenarios)
-        bottom = []
-        top = []  # will need this later
-        # print('isolate the bottom ',percent*100,'% of the contour:') # percent defined above
-        div_line_value = (
-            min(new_halfdrop[:, [1]])
-            + (max(new_halfdrop[:, [1]]) - min(new_halfdrop[:, [1]])) * percent
-        )
-        for n in new_halfdrop:
-            if n[1] < div_line_value:
-                bottom.append(n)
-            else:
-                top.append(n)
-
-        bottom = np.array(bottom)
-        top = np.array(top)
+    for counter, halfdrop in enumerate([l_drop, r_drop]):
+        # top left to bottom right
+        new_halfdrop = halfdrop[np.lexsort((-halfdrop[:, 1], halfdrop[:, 0]))]
+        new_halfdrop = optimized_path(new_halfdrop)
 
-        xbottom = bottom[:, [0]].reshape(len(bottom[:, [0]]))
-        ybottom = bottom[:, [1]].reshape(len(bottom[:, [1]]))
-        xtop = top[:, [0]].reshape(len(top[:, [0]]))
-        ytop = top[:, [1]].reshape(len(top[:, [1]]))
+        # isolate the bottom of the drop to help identify contact points
+        bottom = new_halfdrop[~_above(new_halfdrop[:, 1], percent, inclusive=True)]
 
-        # print('max x value of halfdrop is: ',max(xhalfdrop))
+        # the contact point is the highest of the leftmost bottom points
+        xCP = bottom[:, 0].min()
+        yCP = bottom[bottom[:, 0] == xCP, 1].max()
+        CPs[counter] = [xCP, yCP]
 
-        if (
-            0
-        ):  # plot the bottom 10% of the contour, check that the contour ordering is performing
-            plt.plot(xbottom, ybottom, "b,")
-            plt.title("bottom 10% of the contour")
-            # plt.xlim([130,200])
+        if display:  # check
+            plt.plot(new_halfdrop[:, 0], new_halfdrop[:, 1])
             plt.show()
             plt.close()
 
-        #### Continue here assuming that the drop is hydrophobic ####
-        if 1:
-            # order all halfdrop points using optimized_path (very quick but occasionally makes mistakes)
-
-            xCP = min(xbottom)
-            # yCP = min([coord[1] for coord in new_halfdrop if coord[0]==xCP])
-            yCP = max([coord[1] for coord in bottom if coord[0] == xCP])
-            CPs[counter] = [xCP, yCP]
-
-            if display:  # check
-                plt.plot(new_halfdrop[:, 0], new_halfdrop[:, 1])
-                plt.show()
-                plt.close()
-
-            # remove surface line past the contact point
-            index = new_halfdrop.tolist().index(CPs[counter])  # ?
-
-            new_halfdrop = new_halfdrop[: index + 1]
-
-            if 0:
-                xCP_index = [i for i, j in enumerate(
-                    xnew_halfdrop) if j == xCP]
-                # print('xCP_index is: ',xCP_index)
-                yCP_index = [i for i, j in enumerate(
-                    ynew_halfdrop) if j == yCP]
-                # print('yCP_index is: ',yCP_index)
-
-                new_halfdrop = np.zeros((len(xnew_halfdrop), 2))
-                for n in range(len(xnew_halfdrop)):
-                    new_halfdrop[n, [0]] = xnew_halfdrop[n]
-                    new_halfdrop[n, [1]] = ynew_halfdrop[n]
-                # print('first 3 points of new_halfdrop are: ',new_halfdrop[:3])
-                # print('length of new_halfdrop is: ',len(new_halfdrop))
-
-                if xCP_index == yCP_index:
-                    if (
-                        new_halfdrop[xCP_index[0] + 1][1]
-                        > new_halfdrop[xCP_index[0] - 1][1]
-                    ):
-                        new_halfdrop = new_halfdrop[xCP_index[0]:]
-                    else:
-                        new_halfdrop = new_halfdrop[: xCP_index[0] + 1]
-                else:
-                    raise_error = True
-                    for x in xCP_index:
-                        for y in yCP_index:
-                            if x == y:
-                                raise_error = False
-                                xCP_index = [x]
-                                yCP_index = [y]
-                                # print('indexes of the CP are: ',xCP_index[0],', ',yCP_index[0])
-                                if (
-                                    new_halfdrop[xCP_index[0] + 1][1]
-                                    > new_halfdrop[xCP_index[0] - 1][1]
-                                ):
-                                    new_halfdrop = new_halfdrop[xCP_index[0]:]
-                                else:
-                                    new_halfdrop = new_halfdrop[: xCP_index[0] + 1]
-                    if raise_error == True:
-                        print(
-                            "The index of the contact point x value is: ",
-                            new_halfdrop[xCP_index],
-                        )
-                        print(
-                            "The index of the contact point y value is: ",
-                            new_halfdrop[yCP_index],
-                        )
-                        raise "indexes of x and y values of the contact point are not the same"
-
-        if 0:
-            # order all halfdrop points using two-opt (the slower method)
-
-            # before any ordering is done, chop off the surface line that is past the drop edge
-            del_indexes = []
-            for index, coord in enumerate(bottom):
-                if coord[0] > max(xtop):
-                    del_indexes.append(index)
-                if coord[1] < yCP:
-                    del_indexes.append(index)
-            # halfdrop = np.delete(halfdrop,del_indexes)
-            xbot = np.delete(bottom[:, 0], del_indexes)
-            ybot = np.delete(bottom[:, 1], del_indexes)
-
-            # bottom = np.empty((len(xbot),2))
-            # for n, coord in enumerate(bottom):
-            #    bottom[n,0] = xbot[n]
-            #    bottom[n,1] = ybot[n]
-
-            bottom = np.array(list(zip(xbot, ybot)))
-
-            # print('shape of another_halfdrop is: '+ str(type(another_halfdrop)))
-            print("first few points of halfdrop are: ", halfdrop[:3])
-            if display:
-                colors = iter(jet(np.linspace(0, 1, len(bottom))))
-                for n, coord in enumerate(bottom):
-                    plt.plot(bottom[n, 0], bottom[n, 1],
-                             "o", color=next(colors))
-                plt.title("Cropped bottom of hafldrop")
-                plt.show()
-                plt.close()
-
-            # order points using traveling salesman two_opt code
-            bottom = bottom[::-1]  # start at the top
-            print(
-                "Starting first coordinate of bottom slice of halfdrop is: ", bottom[0]
-            )
-            # increase improvement_threshold from 0.1 to 0.01
-            new_bot, _ = two_opt(bottom, 0.01)
-            if new_bot[0, 1] < new_bot[-1, 1]:
-                new_bot = new_bot[::-1]
-            xbot, ybot = new_bot[:, [0]], new_bot[:, [1]]
-
-            if display:  # display
-                colors = iter(jet(np.linspace(0, 1, len(bottom))))
-                for n, coord in enumerate(bottom):
-                    plt.plot(new_bot[n, 0], new_bot[n, 1],
-                             "o", color=next(colors))
-                plt.title(
-                    "Cropped ordered new_bot of halfdrop (starting from blue)")
-                plt.show()
-                plt.close()
-
-                plt.plot(new_bot[:, 0], new_bot[:, 1])
-                plt.title("Cropped ordered new_bot of halfdrop (line)")
-                plt.show()
-                plt.close()
-
-            # order the top 90% so that the y value decreases
-
-            print(
-                "Sorting top ", 100 -
-                (percent * 100), "% of the contour by y value..."
-            )
-            new_top = sorted(list(top), key=lambda x: x[1], reverse=True)
-            new_top = np.array(new_top)
-
-            # remove surface by deleting points after the contact point
-            xCP_indexs = [i for i, j in enumerate(xbot) if j == xCP]
-            # print('xCP_index is: ',xCP_index)
-            yCP_indexs = [i for i, j in enumerate(ybot) if j == yCP]
-            # print('yCP_index is: ',yCP_index)
-
-            for xCP_index in xCP_indexs:
-                for yCP_index in yCP_indexs:
-                    if xCP_index == yCP_index:
-                        try:
-                            if ybot[yCP_index + 2] > ybot[yCP_index - 1]:
-                                new_bot = np.zeros((len(xbot[yCP_index:]), 2))
-                                for n in range(len(new_bot)):
-                                    new_bot[n, [0]] = xbot[xCP_index + n]
-                                    new_bot[n, [1]] = ybot[yCP_index + n]
-                            else:
-                                new_bot = np.zeros((len(xbot[:yCP_index]), 2))
-                                for n in range(len(new_bot)):
-                                    new_bot[n, [0]] = xbot[n]
-                                    new_bot[n, [1]] = ybot[n]
-                        except:
-                            try:
-                                if ybot[yCP_index] > ybot[yCP_index - 2]:
-                                    new_bot = np.zeros(
-                                        (len(xbot[yCP_index:]), 2))
-                                    for n in range(len(new_bot)):
-                                        new_bot[n, [0]] = xbot[xCP_index + n]
-                                        new_bot[n, [1]] = ybot[yCP_index + n]
-                                else:
-                                    new_bot = np.zeros(
-                                        (len(xbot[:yCP_index]), 2))
-                                    for n in range(len(new_bot)):
-                                        new_bot[n, [0]] = xbot[n]
-                                        new_bot[n, [1]] = ybot[n]
-                            except:
-                                print("xCP_indexs are: ", xCP_indexs)
-                                print("yCP_indexs are: ", yCP_indexs)
-                                raise "indexes of x and y values of the contact point are not the same"
-            new_halfdrop = np.concatenate((new_top, new_bot))
-
-        if 0:  # order the points so that the baseline can be removed
-            # before any ordering is done, chop off the surface line that is past the drop edge
-            del_indexes = []
-            for index, coord in enumerate(halfdrop):
-                if coord[0] > max(xtop):
-                    del_indexes.append(index)
-            # halfdrop = np.delete(halfdrop,del_indexes)
-            xhalfdrop = np.delete(xhalfdrop, del_indexes)
-            yhalfdrop = np.delete(yhalfdrop, del_indexes)
-            # print('shape of another_halfdrop is: '+ str(type(another_halfdrop)))
-            # print('first few points of halfdrop are: ',halfdrop[:3])
-
-            # order half contour points
-            xx, yy = sort_to_line(xhalfdrop, yhalfdrop)
-            add_top = False
-            # print('length of halfdrop is: ', len(halfdrop))
-            # print('length of xbottom is: ', len(xbottom))
-
-            # if xx[0]<1: # then graph starts at the top
-            surface_past_drop_index = []
-            for n, x in enumerate(xx):
-                if x > max(xtop):
-                    surface_past_drop_index.append(n)
-                    # xx = xx[:max(xtop)point]
-            # print('Indexes of contour points past drop: ',surface_past_drop_index)
-
-            # if the sort method will not work
-            # assumes that the error is on the surface somewhere, so uses bottom of contour
-            if len(xx) < len(xhalfdrop):
-                add_top = True
-                print()
-                print(
-                    "sort_to_line is not utilising the full contour, alternate ordering method being used"
-                )
-                print("check bottom 10% of contour...")
-                # this method is much slower than the above, so use as few points as possible
-                bot_list = []
-                for n in range(len(xbottom)):
-                    if xbottom[n] < max(xtop):
-                        bot_list.append([xbottom[n], ybottom[n]])
-                bot_array = np.array(bot_list)
-                # 119.8 seconds for 247 points
-                new_order, _ = two_opt(bot_array)
-
-                xbot, ybot = new_order[:, [0]], new_order[:, [1]]
-
-                if display:
-                    plt.plot(xbot, ybot, "b-")
-                    plt.title("Bottom of half drop, new order")
-                    plt.show()
-                    plt.close()
-
-                xCP_index = [i for i, j in enumerate(xbot) if j == xCP]
-                # print('xCP_index is: ',xCP_index)
-                yCP_index = [i for i, j in enumerate(ybot) if j == yCP]
-                # print('yCP_index is: ',yCP_index)
-
-                if 0:
-                    new_bot = np.zeros((len(xbot), 2))
-                    for n in range(len(xx)):
-                        new_bot[n, [0]] = xbot[n]
-                        new_bot[n, [1]] = ybot[n]
-                # xbot[xCP_index[0]:]
-                if xCP_index == yCP_index:
-                    if ybot[yCP_index[0] + 1] > ybot[yCP_index[0] - 1]:
-                        new_bot = np.zeros((len(xbot[yCP_index[0]:]), 2))
-                        for n in range(len(new_bot)):
-                            new_bot[n, [0]] = xbot[xCP_index[0] + n]
-                            new_bot[n, [1]] = ybot[yCP_index[0] + n]
-                    else:
-                        new_bot = np.zeros((len(xbot[: yCP_index[0]]), 2))
-                        for n in range(len(new_bot)):
-                            new_bot[n, [0]] = xbot[n]
-                            new_bot[n, [1]] = ybot[n]
-                else:
-                    raise "indexes of x and y values of the contact point are not the same"
-
-                # combine new_bot with top_array to give the isolated drop contour without surface
-                if 0:
-                    top_array = np.zeros((len(xtop), 2))
-                    for n in range(len(xtop)):
-                        top_array[n, [0]] = xtop[n]
-                        top_array[n, [1]] = ytop[n]
-
-                new_halfdrop = np.concatenate((top, new_bot))
-
-                # re-order to check that the error was at the surface line
-                xx, yy = sort_to_line(
-                    new_halfdrop[:, [0]], new_halfdrop[:, [1]])
-                if len(xx) < len(
-                    new_halfdrop
-                ):  # then the error was in the top 90% of the drop
-                    print("Checking top 90% of contour...")
-                    new_top, _ = two_opt(top)
-                    new_halfdrop = np.concatenate((new_top, new_bot))
-                    xx, yy = sort_to_line(
-                        new_halfdrop[:, [0]], new_halfdrop[:, [1]])
-
-            else:  # if sort_to_line worked as expected
-                # find the indexs of the contact point and chop off the ends
-                xCP_index = [i for i, j in enumerate(xx) if j == xCP]
-                # print('xCP_index is: ',xCP_index)
-                yCP_index = [i for i, j in enumerate(yy) if j == yCP]
-                # print('yCP_index is: ',yCP_index)
-
-                new_halfdrop = np.zeros((len(xx), 2))
-                for n in range(len(xx)):
-                    new_halfdrop[n, [0]] = xx[n]
-                    new_halfdrop[n, [1]] = yy[n]
-                # print('first 3 points of new_halfdrop are: ',new_halfdrop[:3])
-                # print('length of new_halfdrop is: ',len(new_halfdrop))
-
-                if xCP_index == yCP_index:
-                    if (
-                        new_halfdrop[xCP_index[0] + 1][1]
-                        > new_halfdrop[xCP_index[0] - 1][1]
-                    ):
-                        new_halfdrop = new_halfdrop[xCP_index[0]:]
-                    else:
-                        new_halfdrop = new_halfdrop[: xCP_index[0] + 1]
-                else:
-                    raise_error = True
-                    for x in xCP_index:
-                        for y in yCP_index:
-                            if x == y:
-                                raise_error = False
-                                xCP_index = [x]
-                                yCP_index = [y]
-                                # print('indexes of the CP are: ',xCP_index[0],', ',yCP_index[0])
-                                if (
-                                    new_halfdrop[xCP_index[0] + 1][1]
-                                    > new_halfdrop[xCP_index[0] - 1][1]
-                                ):
-                                    new_halfdrop = new_halfdrop[xCP_index[0]:]
-                                else:
-                                    new_halfdrop = new_halfdrop[: xCP_index[0] + 1]
-                    if raise_error == True:
-                        print(
-                            "The index of the contact point x value is: ",
-                            new_halfdrop[xCP_index],
-                        )
-                        print(
-                            "The index of the contact point y value is: ",
-                            new_halfdrop[yCP_index],
-                        )
-                        raise "indexes of x and y values of the contact point are not the same"
+        # remove surface line past the contact point
+        index = np.flatnonzero((new_halfdrop == [xCP, yCP]).all(axis=1))[0]
+        new_halfdrop = new_halfdrop[: index + 1]
 
         if counter == 0:
             drops[counter] = new_halfdrop[::-1]
@@ -943,17 +628,9 @@ def prepare_hydrophobic(coords, xi=0.8, cluster=True, display=False):
             plt.show()
             plt.close()
 
-        counter += 1
-
     # reflect the left drop and combine left and right
 
-    profile = np.empty((len(drops[0]) + len(drops[1]), 2))
-    for i, n in enumerate(drops[0]):
-        flipped = n
-        flipped[0] = -flipped[0]
-        profile[i] = flipped
-    for i, n in enumerate(drops[1]):
-        profile[len(drops[0]) + i] = n
+    profile = np.vstack((drops[0] * [-1, 1], drops[1]))
     CPs[0][0] = -CPs[0][0]
 
     if display:
@@ -962,7 +639,6 @@ def prepare_hydrophobic(coords, xi=0.8, cluster=True, display=False):
         for k in profile:
             plt.plot(k[0], k[1], "o", color=next(colors))
         plt.title("final output")
-        # plt.plot(profile[:,0],profile[:,1],'b')
         plt.show()
         plt.close()
 
@@ -973,20 +649,20 @@ def prepare_hydrophobic(coords, xi=0.8, cluster=True, display=False):
 
     # flip upside down again so that contour follows image indexing
     # and transform to the right so that x=0 is no longer in line with apex
-    for coord in profile:
-        coord[1] = -coord[1]
-        coord[0] = coord[0] + xapex
+    profile = profile * [1, -1] + [xapex, 0]
     for n in [0, 1]:
         CPs[n][1] = -CPs[n][1]
         CPs[n][0] = CPs[n][0] + xapex
 
-    # flip original contour back to original orientation
-    for coord in coords:
-        coord[1] = -coord[1]
-
     return profile, CPs
 
 
+def _above(y, percent, inclusive=False):
+    """Mask of the values more than ``percent`` of the way up the range of ``y``"""
+    line = y.min() + (y.max() - y.min()) * percent
+    return y >= line if inclusive else y > line
+
+
 def find_contours(image: np.ndarray):
     """
     Calls cv2.findContours() on passed image in a way that is compatible with OpenCV 4.x, 3.x or 2.x
@@ -1076,11 +752,7 @@ def extract_edges_cv(
         )
         drop_profile = drop_profile[mask]
 
-    output = []
-    for coord in drop_profile:
-        if list(coord) not in output:
-            output.append(list(coord))
-    output = np.array(output)
+    output = unique_points(drop_profile)
 
     if return_threshold_value == True:
         return output, ret
@@ -1088,6 +760,19 @@ def extract_edges_cv(
         return output
 
 
+def tilt_angle(baseline) -> float:
+    """Angle in degrees that levels the baseline through two points, folded
+    into [-45, 45]"""
+    (x1, y1), (x2, y2) = baseline[0], baseline[1]
+    t = float(y2 - y1) / (x2 - x1)
+    rotate_angle = math.degrees(math.atan(t))
+    if rotate_angle > 45:
+        rotate_angle = -90 + rotate_angle
+    elif rotate_angle < -45:
+        rotate_angle = 90 + rotate_angle
+    return rotate_angle
+
+
 def tilt_correction(img: np.ndarray, baseline, user_set_baseline=False):
     """img is an image input
     baseline is defined by two points in the image"""
@@ -1103,12 +788,7 @@ def tilt_correction(img: np.ndarray, baseline, user_set_baseline=False):
     if user_set_baseline == True:
         img = img[: int(max([y1, y2])), :]
 
-    t = float(y2 - y1) / (x2 - x1)
-    rotate_angle = math.degrees(math.atan(t))
-    if rotate_angle > 45:
-        rotate_angle = -90 + rotate_angle
-    elif rotate_angle < -45:
-        rotate_angle = 90 + rotate_angle
+    rotate_angle = tilt_angle(baseline)
     rotate_img = ndimage.rotate(img, rotate_angle)
     print("image rotated by " + str(rotate_angle) + " degrees")
 
@@ -1121,6 +801,41 @@ def tilt_correction(img: np.ndarray, baseline, user_set_baseline=False):
     return rotate_img_crop
 
 
+def contour_tilt_correction(
+    img: np.ndarray, contour, drop_contour, contact_points, rotate_image=True
+):
+    """Level the baseline through the contact points by rotating the
+    extracted contours and contact points instead of the image.
+
+    Everything is rotated about the centre of ``img`` by the angle
+    ``tilt_correction`` would use, so the contours stay in register with
+    the image rotated by ``cv2.warpAffine`` to the same size. The image is
+    only rotated if ``rotate_image`` is set, and is returned as is otherwise.
+
+    :return: the image, contour, drop contour and contact points, rotated
+    """
+    (x1, y1), (x2, y2) = contact_points[0], contact_points[1]
+    if y1 == y2:  # image is level
+        return img, contour, drop_contour, contact_points
+
+    rotate_angle = tilt_angle(contact_points)
+    height, width = img.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), rotate_angle, 1)
+
+    def rotate(points):
+        points = np.asarray(points, dtype=float)
+        return points @ matrix[:, :2].T + matrix[:, 2]
+
+    if rotate_image:
+        img = cv2.warpAffine(img, matrix, (width, height))
+    print("contour rotated by " + str(rotate_angle) + " degrees")
+
+    contact_points = {
+        key: rotate(point).tolist() for key, point in contact_points.items()
+    }
+    return img, rotate(contour), rotate(drop_contour), contact_points
+
+
 def preprocess(img: np.ndarray, correct_tilt=True, display=False):
     """This code serves as a discrete instance of image preprocessing before contact
     angle fit software is implemented.
@@ -0,0 +1,60 @@
+from opendrop_ml.modules.preprocessing.preprocessing import (
+    auto_crop,
+    extract_edges_cv,
+    prepare_hydrophobic,
+)
+
+import numpy as np
+import pytest
+import glob
+import cv2
+import os
+
+DATA_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "sensitivity_data_set"
+)
+BASELINE_DATA = os.path.join(
+    os.path.dirname(__file__), "test_data", "prepare_hydrophobic_baseline.npz"
+)
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    """Edge points of every 12th sensitivity image, with the profile and
+    contact points the original loop-based prepare_hydrophobic (baseline
+    commit bdf72d2) gave for them"""
+    with np.load(BASELINE_DATA) as data:
+        return {key: data[key] for key in data.files}
+
+
+def edge_points(path):
+    img = cv2.imread(path)
+    img_crop, _ = auto_crop(img.copy(), verbose=0)
+    return extract_edges_cv(img_crop)
+
+
+def baseline_names():
+    with np.load(BASELINE_DATA) as data:
+        return sorted({key.split("/")[0] for key in data.files})
+
+
+@pytest.mark.parametrize("name", baseline_names())
+def test_prepare_hydrophobic_matches_baseline(baseline, name):
+    profile, CPs = prepare_hydrophobic(baseline[name + "/edges"])
+
+    np.testing.assert_array_equal(profile, baseline[name + "/profile"])
+    assert set(CPs) == {0, 1}
+    for n in (0, 1):
+        assert list(CPs[n]) == list(baseline[name + "/contact_points"][n])
+
+
+def test_prepare_hydrophobic_leaves_input_unchanged():
+    edges_pts = edge_points(sorted(glob.glob(os.path.join(DATA_DIR, "*.png")))[0])
+    before = edges_pts.copy()
+    prepare_hydrophobic(edges_pts)
+    np.testing.assert_array_equal(edges_pts, before)
+
+
+def test_prepare_hydrophobic_rejects_empty_contour():
+    with pytest.raises(IndexError):
+        prepare_hydrophobic(np.empty((0, 2)))
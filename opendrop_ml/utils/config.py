@@ -56,4 +56,8 @@ IMAGE_TYPE = [
     ("Image Files", "*.jpeg"),
     ("Image Files", "*.gif"),
     ("Image Files", "*.bmp"),
+    ("Video Files", "*.avi"),
+    ("Video Files", "*.mp4"),
+    ("Video Files", "*.mkv"),
+    ("Video Files", "*.mov"),
 ]
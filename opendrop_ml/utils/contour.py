@@ -0,0 +1,188 @@
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+import numpy as np
+
+# neighbours fetched per KD-tree query, doubled while they are all visited
+_INITIAL_K = 8
+# below this many points a tree rebuild is not worth it
+_MIN_REBUILD_SIZE = 64
+
+
+def optimized_path(coords, start=None, max_jump=None):
+    """Order contour points into a continuous curve.
+
+    Starting from ``start`` (the first point by default), the path repeatedly
+    steps to the nearest point not yet visited. Ties go to the point that
+    comes first in ``coords``, which reproduces the original greedy search,
+    but neighbours are looked up in a KD-tree so ordering is O(n log n).
+
+    If ``max_jump`` is given, the path is cut before the first step longer
+    than ``max_jump`` pixels, as such jumps are likely a mistake.
+    https://stackoverflow.com/questions/45829155/sort-points-in-order-to-have-a-continuous-curve-using-python
+    """
+    points = np.asarray(coords)
+    if len(points) == 0:
+        raise IndexError("cannot order an empty contour")
+
+    if start is None:
+        start_idx = 0
+    else:
+        matches = np.flatnonzero(np.all(points == np.asarray(start), axis=1))
+        if len(matches) == 0:
+            raise ValueError("start point is not one of coords")
+        start_idx = matches[0]
+
+    path = points[_nearest_neighbour_order(points.astype(float), start_idx)]
+    if max_jump is not None:
+        path = truncate_at_jump(path, max_jump)
+    return path
+
+
+def unique_points(points):
+    """Drop repeated points, keeping the first occurrence of each in order"""
+    points = np.asarray(points)
+    if len(points) == 0:
+        return points
+    _, first = np.unique(points, axis=0, return_index=True)
+    return points[np.sort(first)]
+
+
+def cluster_labels(points, eps):
+    """Label the groups of points linked by steps of at most ``eps``.
+
+    This is the DBSCAN clustering with ``min_samples=2`` that OPTICS used to
+    compute: every point with a neighbour within ``eps`` is a core point, so
+    the clusters are the connected components of the graph joining such
+    neighbours. Points without a neighbour are noise and labelled -1.
+    Clusters are numbered in the order of their first point.
+    """
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    pairs = cKDTree(points).query_pairs(eps, output_type="ndarray")
+    graph = coo_matrix(
+        (np.ones(len(pairs), dtype=bool), (pairs[:, 0], pairs[:, 1])), shape=(n, n)
+    )
+    _, components = connected_components(graph, directed=False)
+
+    labels = np.full(n, -1, dtype=np.intp)
+    clustered = np.zeros(n, dtype=bool)
+    clustered[pairs.ravel()] = True
+    if clustered.any():
+        _, first, inverse = np.unique(
+            components[clustered], return_index=True, return_inverse=True
+        )
+        rank = np.empty(len(first), dtype=np.intp)
+        rank[np.argsort(first)] = np.arange(len(first))
+        labels[clustered] = rank[inverse]
+    return labels
+
+
+def group_points(points, labels):
+    """Map each label to the array of its points, in their original order"""
+    points, labels = np.asarray(points), np.asarray(labels)
+    order = np.argsort(labels, kind="stable")
+    keys, starts = np.unique(labels[order], return_index=True)
+    return dict(zip(keys.tolist(), np.split(points[order], starts[1:])))
+
+
+def cluster_optics(sample, out_style="coords", xi=None, eps=None, verbose=0):
+    """Takes an array (or list) of the form [[x1,y1],[x2,y2],...,[xn,yn]].
+    Clusters are outputted in the form of a dictionary.
+
+    If out_style='coords' each dictionary entry is a group, and points are outputted in as a numpy array
+    in coordinate form.
+    If out_xy='xy' there are two dictionary entries for each group, one labeled as nx and one as ny
+    (where n is the label of the group). Each of these are 1D numpy arrays
+
+    If xi (float between 0 and 1) is not None and eps is None, then the xi clustering method of OPTICS
+    is used. The optics algorithm defines clusters based on the minimum steepness on the reachability
+    plot. For example, an upwards point in the reachability plot is defined by the ratio from one point
+    to its successor being at most 1-xi.
+
+    If eps (float) is not None and xi is None, then the dbscan clustering method is used, see
+    ``cluster_labels``. Where eps is the maximum distance between two samples for one to be considered
+    as in the neighborhood of the other.
+
+    https://stackoverflow.com/questions/47974874/algorithm-for-grouping-points-in-given-distance
+    https://scikit-learn.org/stable/modules/generated/sklearn.cluster.OPTICS.html
+    """
+    if eps is not None and xi is None:
+        labels = cluster_labels(sample, eps)
+    elif xi is not None and eps is None:
+        from sklearn.cluster import OPTICS
+
+        labels = OPTICS(min_samples=2, xi=xi).fit(sample).labels_
+    else:
+        raise ValueError(
+            "only one of eps and xi can be chosen but not neither nor both"
+        )
+    groups = list(set(labels))
+
+    if verbose == 2:
+        print(labels)
+    elif verbose == 1:
+        print(groups)
+
+    by_label = group_points(sample, labels)
+    dic = {n: by_label[n] for n in groups}
+    if out_style == "coords":
+        return dic
+    elif out_style == "xy":
+        dic2 = {}
+        for k, points in dic.items():
+            dic2[str(k) + "x"] = points[:, 0]
+            dic2[str(k) + "y"] = points[:, 1]
+        return dic2
+
+
+def truncate_at_jump(path, max_jump):
+    """Drop the points of ``path`` from the first step longer than ``max_jump``"""
+    steps = np.diff(np.asarray(path, dtype=float), axis=0)
+    jump_idx = np.flatnonzero(np.hypot(steps[:, 0], steps[:, 1]) > max_jump)
+    if len(jump_idx) > 0:
+        path = path[: jump_idx[0]]
+    return path
+
+
+def _nearest_neighbour_order(points, start_idx):
+    """Indices of ``points`` in greedy nearest-neighbour order"""
+    n = len(points)
+    order = np.empty(n, dtype=np.intp)
+    visited = np.zeros(n, dtype=bool)
+    order[0] = start_idx
+    visited[start_idx] = True
+
+    # the tree is rebuilt from the unvisited points once most of the points
+    # it holds have been visited, so queries do not wade through the path
+    tree_idx = np.arange(n)
+    tree = cKDTree(points)
+    tree_visited = 1
+
+    current = start_idx
+    for step in range(1, n):
+        if tree_visited * 2 > len(tree_idx) >= _MIN_REBUILD_SIZE:
+            tree_idx = np.flatnonzero(~visited)
+            tree = cKDTree(points[tree_idx])
+            tree_visited = 0
+
+        k = min(_INITIAL_K, len(tree_idx))
+        while True:
+            dists, js = tree.query(points[current], k=k)
+            dists, candidates = np.atleast_1d(dists), tree_idx[np.atleast_1d(js)]
+            free = ~visited[candidates]
+            # all points tied for nearest must be among the candidates
+            if free.any() and (k == len(tree_idx) or dists[-1] > dists[free][0]):
+                break
+            k = min(2 * k, len(tree_idx))
+
+        candidates = candidates[free]
+        offsets = points[candidates] - points[current]
+        dist2 = offsets[:, 0] ** 2 + offsets[:, 1] ** 2
+        current = candidates[dist2 == dist2.min()].min()
+
+        order[step] = current
+        visited[current] = True
+        tree_visited += 1
+
+    return order
@@ -0,0 +1,144 @@
+from opendrop_ml.utils.contour import (
+    cluster_labels,
+    cluster_optics,
+    optimized_path,
+    truncate_at_jump,
+    unique_points,
+)
+
+from sklearn.cluster import OPTICS
+import numpy as np
+import pytest
+
+
+def greedy_path(coords, start=None, max_jump=None):
+    """The original list-based ordering, kept as the reference"""
+    coords = np.asarray(coords).tolist()
+    start = coords[0] if start is None else list(start)
+    pass_by = coords
+    path = [start]
+    pass_by.remove(start)
+    while pass_by:
+        nearest = min(
+            pass_by,
+            key=lambda x: ((path[-1][0] - x[0]) ** 2 + (path[-1][1] - x[1]) ** 2)
+            ** 0.5,
+        )
+        path.append(nearest)
+        pass_by.remove(nearest)
+    path = np.array(path)
+    if max_jump is not None:
+        for i in range(len(path) - 1):
+            if np.hypot(*(path[i] - path[i + 1])) > max_jump:
+                return path[:i]
+    return path
+
+
+def drop_contour(n_points, seed):
+    """Noisy pixel contour of a drop, shuffled, with duplicate points"""
+    rng = np.random.default_rng(seed)
+    theta = np.linspace(0, 1.8 * np.pi, n_points)
+    radius = 200 + rng.normal(0, 2, n_points)
+    points = np.stack([radius * np.cos(theta), radius * np.sin(theta)], 1)
+    points = np.round(points).astype(np.int32)
+    points = np.concatenate([points, points[rng.choice(n_points, n_points // 10)]])
+    return points[rng.permutation(len(points))]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_greedy_ordering(seed):
+    coords = drop_contour(600, seed)
+    np.testing.assert_array_equal(optimized_path(coords), greedy_path(coords))
+
+
+def test_matches_greedy_ordering_from_start_point():
+    coords = drop_contour(400, 7)
+    start = coords[123]
+    np.testing.assert_array_equal(
+        optimized_path(coords, start), greedy_path(coords, start)
+    )
+
+
+def test_ties_go_to_first_point():
+    coords = [(0, 0), (0, 1), (1, 0), (-1, 0), (0, -1)]
+    np.testing.assert_array_equal(optimized_path(coords), greedy_path(coords))
+
+
+def test_matches_greedy_jump_truncation():
+    coords = np.concatenate([drop_contour(300, 3), [[1000, 1000], [1001, 1001]]])
+    path = optimized_path(coords, max_jump=5)
+    np.testing.assert_array_equal(path, greedy_path(coords, max_jump=5))
+    assert len(path) < len(coords)
+
+
+def test_truncate_at_jump():
+    path = np.array([[0, 0], [1, 0], [2, 0], [10, 0], [11, 0]])
+    np.testing.assert_array_equal(truncate_at_jump(path, 5), path[:2])
+    np.testing.assert_array_equal(truncate_at_jump(path, 10), path)
+
+
+def test_start_must_be_a_contour_point():
+    with pytest.raises(ValueError):
+        optimized_path([(0, 0), (1, 1)], start=(5, 5))
+
+
+def test_unique_points_keeps_first_occurrences_in_order():
+    coords = drop_contour(500, 11)
+    expected = []
+    for coord in coords:
+        if list(coord) not in expected:
+            expected.append(list(coord))
+
+    result = unique_points(coords)
+    np.testing.assert_array_equal(result, np.array(expected))
+    assert result.dtype == coords.dtype
+    assert len(unique_points(np.empty((0, 2), dtype=np.int32))) == 0
+
+
+def noisy_contour(seed):
+    """Drop contour with a separate reflection and a few stray pixels"""
+    rng = np.random.default_rng(seed)
+    drop = drop_contour(400, seed)
+    reflection = drop[: len(drop) // 3] + [0, 500]
+    stray = rng.integers(-300, 300, (20, 2)) * 3
+    return np.concatenate([drop, reflection, stray])
+
+
+def optics_groups(sample, eps):
+    """Groups of the OPTICS dbscan clustering cluster_optics used to run"""
+    labels = OPTICS(min_samples=2, cluster_method="dbscan", eps=eps).fit(sample).labels_
+    return {n: sample[labels == n] for n in set(labels)}, labels
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("eps", [1.0, np.sqrt(2), 2.5, 6.0])
+def test_cluster_labels_match_optics_dbscan(seed, eps):
+    sample = noisy_contour(seed)
+    _, expected = optics_groups(sample, eps)
+    labels = cluster_labels(sample, eps)
+
+    np.testing.assert_array_equal(labels == -1, expected == -1)
+    # the same partition, whatever the numbering
+    pairs = set(zip(labels.tolist(), expected.tolist()))
+    assert len(pairs) == len(set(labels)) == len(set(expected))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_cluster_optics_largest_group_matches_optics(seed):
+    sample = noisy_contour(seed)
+    expected, _ = optics_groups(sample, 2.5)
+    dic = cluster_optics(sample, eps=2.5)
+
+    def largest(groups):
+        return groups[max(groups, key=lambda k: len(groups[k]))]
+
+    np.testing.assert_array_equal(largest(dic), largest(expected))
+    assert sorted(map(len, dic.values())) == sorted(map(len, expected.values()))
+
+
+def test_cluster_optics_xy_output():
+    sample = np.array([[0, 0], [1, 0], [10, 10], [11, 10], [50, 50]])
+    dic2 = cluster_optics(sample, out_style="xy", eps=1.5)
+    np.testing.assert_array_equal(dic2["0x"], [0, 1])
+    np.testing.assert_array_equal(dic2["1y"], [10, 10])
+    np.testing.assert_array_equal(dic2["-1x"], [50])
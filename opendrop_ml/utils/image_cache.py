@@ -0,0 +1,65 @@
+"""Size-limited cache of decoded images.
+
+Views of long runs show one frame at a time, so rather than holding every
+frame in memory the images are decoded from their files when shown and the
+most recently used ones kept, up to a total size.
+"""
+
+from collections import OrderedDict
+from PIL import Image
+from typing import Callable
+
+# bytes of decoded images kept by default
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def image_nbytes(image: Image.Image) -> int:
+    """Approximate size in memory of a decoded image"""
+    return image.width * image.height * len(image.getbands())
+
+
+def load_image(path: str) -> Image.Image:
+    with Image.open(path) as opened:
+        opened.load()
+        # detached from the file, which is closed here
+        return opened.copy()
+
+
+class ImageCache:
+    """Decoded images by path, dropping the least recently used once they
+    take more than ``max_bytes`` (the latest image is always kept).
+    ``loader`` decodes the image of a path."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        loader: Callable[[str], Image.Image] = load_image,
+    ):
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self.nbytes = 0
+        self._images: "OrderedDict[str, Image.Image]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._images
+
+    def get(self, path: str) -> Image.Image:
+        image = self._images.get(path)
+        if image is not None:
+            self._images.move_to_end(path)
+            return image
+
+        image = self.loader(path)
+        self._images[path] = image
+        self.nbytes += image_nbytes(image)
+        while self.nbytes > self.max_bytes and len(self._images) > 1:
+            _, evicted = self._images.popitem(last=False)
+            self.nbytes -= image_nbytes(evicted)
+        return image
+
+    def clear(self) -> None:
+        self._images.clear()
+        self.nbytes = 0
@@ -0,0 +1,49 @@
+from opendrop_ml.utils.image_cache import ImageCache, image_nbytes
+
+from PIL import Image
+
+
+def make_images(tmp_path, n, size=(10, 10)):
+    paths = []
+    for i in range(n):
+        path = str(tmp_path / f"frame{i}.png")
+        Image.new("RGB", size, (i, i, i)).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_images_are_decoded_once(tmp_path):
+    path = make_images(tmp_path, 1)[0]
+    cache = ImageCache()
+
+    image = cache.get(path)
+    assert cache.get(path) is image
+    assert image.getpixel((0, 0)) == (0, 0, 0)
+    assert cache.nbytes == image_nbytes(image) == 300
+
+
+def test_least_recently_used_are_dropped(tmp_path):
+    paths = make_images(tmp_path, 3)
+    cache = ImageCache(max_bytes=600)
+
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+
+    assert paths[1] not in cache
+    assert paths[0] in cache and paths[2] in cache
+    assert cache.nbytes == 600
+
+
+def test_latest_image_is_kept_even_if_too_large(tmp_path):
+    paths = make_images(tmp_path, 2, size=(20, 20))
+    cache = ImageCache(max_bytes=100)
+
+    cache.get(paths[0])
+    cache.get(paths[1])
+
+    assert len(cache) == 1 and paths[1] in cache
+
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
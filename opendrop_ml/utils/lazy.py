@@ -0,0 +1,37 @@
+"""Deferred imports of heavy modules.
+
+Plotting and machine learning libraries take longer to import than most
+frames take to analyse, yet they are only needed for debug plots, the GUI or
+the ML model. ``lazy_import`` stands in for such a module and imports it on
+first attribute access, so that importing the analysis modules, e.g. in every
+worker process, stays quick.
+"""
+
+import importlib
+import types
+import sys
+
+
+class LazyModule(types.ModuleType):
+    """Module imported when one of its attributes is first looked up"""
+
+    def _load(self) -> types.ModuleType:
+        return importlib.import_module(self.__name__)
+
+    def __getattr__(self, attr):
+        # attributes are not copied, so that patching the module still works
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    @property
+    def loaded(self) -> bool:
+        return self.__name__ in sys.modules
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Module ``name``, or a stand-in importing it on first use"""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
@@ -0,0 +1,77 @@
+from opendrop_ml.utils.lazy import LazyModule, lazy_import
+
+from unittest.mock import patch
+import subprocess
+import pytest
+import sys
+import os
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), "..", "..")
+
+# modules that must not be imported before they are used
+HEAVY_MODULES = ("matplotlib.pyplot", "sklearn", "skimage", "tensorflow")
+
+# cumulative import time in seconds, only checked with
+# OPENDROP_CHECK_STARTUP_TIME=1 as wall-clock times depend on the machine and
+# its load; importing any of HEAVY_MODULES alone takes about a second
+STARTUP_BUDGETS = {
+    "opendrop_ml.modules.contact_angle.ca_data_processor": 1.5,
+    "opendrop_ml.main": 2.0,
+    "opendrop_ml.cli": 1.0,
+}
+
+
+def import_times(module):
+    """Cumulative import time in seconds of every module imported with
+    ``module``, from ``python -X importtime`` in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+@pytest.mark.parametrize("module", STARTUP_BUDGETS)
+def test_startup_imports_no_heavy_modules(module):
+    times = import_times(module)
+    assert not [name for name in times if name.startswith(HEAVY_MODULES)]
+
+
+@pytest.mark.skipif(
+    not os.environ.get("OPENDROP_CHECK_STARTUP_TIME"),
+    reason="set OPENDROP_CHECK_STARTUP_TIME=1 to check import times",
+)
+@pytest.mark.parametrize("module, budget", STARTUP_BUDGETS.items())
+def test_startup_budget(module, budget):
+    assert import_times(module)[module] < budget
+
+
+def test_lazy_module_imports_on_first_use():
+    with patch.dict(sys.modules):
+        sys.modules.pop("json", None)
+        module = lazy_import("json")
+        assert isinstance(module, LazyModule) and not module.loaded
+
+        assert module.dumps([1]) == "[1]"
+        assert module.loaded
+
+
+def test_lazy_import_of_loaded_module_is_the_module():
+    assert lazy_import("sys") is sys
+
+
+def test_lazy_module_can_be_patched():
+    module = LazyModule("json")
+    with patch.object(module, "dumps", return_value="patched"):
+        assert module.dumps([1]) == "patched"
+    assert module.dumps([1]) == "[1]"
@@ -0,0 +1,36 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Tuple
+import multiprocessing
+import os
+
+
+def resolve_n_workers(n_workers: Optional[int], n_tasks: int) -> int:
+    """Return the number of worker processes to use for ``n_tasks`` tasks.
+
+    ``0`` or ``None`` means one worker per CPU core. There are never more
+    workers than tasks.
+    """
+    if not n_workers or n_workers < 1:
+        n_workers = os.cpu_count() or 1
+    return min(int(n_workers), max(1, n_tasks))
+
+
+def chunksize_for(n_tasks: int, n_workers: int, max_chunksize: int = 8) -> int:
+    """Chunk size for ``executor.map`` that keeps every worker busy."""
+    return max(1, min(max_chunksize, n_tasks // (4 * n_workers)))
+
+
+def create_process_pool(
+    n_workers: int, initializer: Optional[Callable] = None, initargs: Tuple = ()
+) -> ProcessPoolExecutor:
+    """Create a process pool for frame-level analysis.
+
+    Workers are spawned rather than forked so they do not inherit the Tk
+    state of the GUI process.
+    """
+    return ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=initargs,
+    )
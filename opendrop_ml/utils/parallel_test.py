@@ -0,0 +1,34 @@
+from opendrop_ml.utils.parallel import chunksize_for, resolve_n_workers
+
+import os
+
+
+def test_resolve_n_workers():
+    assert resolve_n_workers(2, 10) == 2
+
+    # never more workers than tasks
+    assert resolve_n_workers(16, 5) == 5
+
+    # at least one worker, even with nothing to do
+    assert resolve_n_workers(4, 0) == 1
+
+
+def test_resolve_n_workers_uses_every_core_by_default():
+    cores = os.cpu_count() or 1
+    for n_workers in (None, 0, -1):
+        assert resolve_n_workers(n_workers, 1000) == min(cores, 1000)
+        assert resolve_n_workers(n_workers, 1) == 1
+
+
+def test_chunksize_for():
+    # about four chunks per worker
+    assert chunksize_for(64, 2) == 8
+    assert chunksize_for(40, 2) == 5
+
+    # capped so the last workers are not left waiting on a long chunk
+    assert chunksize_for(10000, 2) == 8
+    assert chunksize_for(10000, 2, max_chunksize=32) == 32
+
+    # never less than one task per chunk
+    assert chunksize_for(3, 8) == 1
+    assert chunksize_for(0, 4) == 1
@@ -0,0 +1,151 @@
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+import functools
+import threading
+import json
+import time
+import numpy as np
+import csv
+
+PERCENTILES = (50, 90, 99)
+RECORD_FIELDS = ("frame", "stage", "wall time", "cpu time")
+
+
+class StageProfiler:
+    """Collects the wall and CPU time of named pipeline stages, per frame.
+
+    Stages nest, and the time of a stage includes that of the stages it
+    calls. Records are plain dicts so they can be sent back from worker
+    processes and merged with ``extend``.
+    """
+
+    def __init__(self):
+        self._records: List[Dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def current_frame(self) -> Optional[int]:
+        return getattr(self._local, "frame", None)
+
+    @contextmanager
+    def frame(self, index: Optional[int]):
+        """Attribute the stages run inside the block to frame ``index``"""
+        previous = self.current_frame
+        self._local.frame = index
+        try:
+            yield
+        finally:
+            self._local.frame = previous
+
+    @contextmanager
+    def stage(self, name: str):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add(
+                name,
+                time.perf_counter() - wall_start,
+                time.process_time() - cpu_start,
+            )
+
+    def add(self, name: str, wall_time: float, cpu_time: float, frame=None):
+        record = {
+            "frame": self.current_frame if frame is None else frame,
+            "stage": name,
+            "wall time": wall_time,
+            "cpu time": cpu_time,
+        }
+        with self._lock:
+            self._records.append(record)
+
+    def extend(self, records: Iterable[Dict]):
+        with self._lock:
+            self._records.extend(records)
+
+    def records(self) -> List[Dict]:
+        with self._lock:
+            return list(self._records)
+
+    def drain(self) -> List[Dict]:
+        """Return the records and start afresh"""
+        with self._lock:
+            records, self._records = self._records, []
+        return records
+
+    def clear(self):
+        with self._lock:
+            self._records = []
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, total, mean, percentiles and maximum of each stage's wall
+        and CPU time, in the order the stages first ran"""
+        by_stage: Dict[str, List[Dict]] = {}
+        for record in self.records():
+            by_stage.setdefault(record["stage"], []).append(record)
+
+        summary = {}
+        for name, records in by_stage.items():
+            stats = {"count": len(records)}
+            for field in ("wall time", "cpu time"):
+                times = np.array([record[field] for record in records])
+                stats[f"{field} total"] = float(times.sum())
+                stats[f"{field} mean"] = float(times.mean())
+                for p in PERCENTILES:
+                    stats[f"{field} p{p}"] = float(np.percentile(times, p))
+                stats[f"{field} max"] = float(times.max())
+            summary[name] = stats
+        return summary
+
+    def print_summary(self):
+        print("Stage timings (wall time, s):")
+        for name, stats in self.summary().items():
+            print(
+                f"    {name}: n={stats['count']}, "
+                f"total={stats['wall time total']:.3f}, "
+                f"mean={stats['wall time mean']:.3f}, "
+                f"p90={stats['wall time p90']:.3f}, "
+                f"max={stats['wall time max']:.3f}"
+            )
+
+    def to_csv(self, path: str):
+        """Write one row per recorded stage"""
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=RECORD_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.records())
+
+    def to_json(self, path: str):
+        """Write the summary and every record"""
+        with open(path, "w") as f:
+            json.dump(
+                {"summary": self.summary(), "records": self.records()}, f, indent=2
+            )
+
+
+_profiler = StageProfiler()
+
+
+def get_profiler() -> StageProfiler:
+    """The profiler shared by the pipeline in this process"""
+    return _profiler
+
+
+def stage(name: str):
+    """Time the block as stage ``name`` of the current frame"""
+    return _profiler.stage(name)
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of the function as stage ``name``"""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _profiler.stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,79 @@
+from opendrop_ml.utils.profiling import StageProfiler, get_profiler, timed
+
+import json
+import csv
+import pytest
+
+
+def test_stages_recorded_per_frame():
+    profiler = StageProfiler()
+    with profiler.frame(3):
+        with profiler.stage("outer"):
+            with profiler.stage("inner"):
+                pass
+    with profiler.stage("unframed"):
+        pass
+
+    records = profiler.records()
+    assert [(r["frame"], r["stage"]) for r in records] == [
+        (3, "inner"),
+        (3, "outer"),
+        (None, "unframed"),
+    ]
+    assert records[1]["wall time"] >= records[0]["wall time"]
+
+
+def test_timed_decorator_uses_shared_profiler():
+    @timed("double")
+    def double(x):
+        return 2 * x
+
+    profiler = get_profiler()
+    profiler.clear()
+    with profiler.frame(0):
+        assert double(2) == 4
+
+    assert profiler.drain() == [
+        {
+            "frame": 0,
+            "stage": "double",
+            "wall time": pytest.approx(0, abs=0.1),
+            "cpu time": pytest.approx(0, abs=0.1),
+        }
+    ]
+    assert profiler.records() == []
+
+
+def test_summary_percentiles():
+    profiler = StageProfiler()
+    for i, t in enumerate([1.0, 2.0, 3.0, 4.0]):
+        profiler.add("fit", t, t / 2, frame=i)
+
+    stats = profiler.summary()["fit"]
+    assert stats["count"] == 4
+    assert stats["wall time total"] == 10
+    assert stats["wall time p50"] == 2.5
+    assert stats["wall time max"] == 4
+    assert stats["cpu time mean"] == 1.25
+
+
+def test_export(tmp_path):
+    profiler = StageProfiler()
+    profiler.add("get_image", 0.5, 0.25, frame=0)
+    profiler.add("get_image", 1.5, 0.75, frame=1)
+
+    profiler.to_csv(tmp_path / "timings.csv")
+    profiler.to_json(tmp_path / "timings.json")
+
+    with open(tmp_path / "timings.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[1] == {
+        "frame": "1",
+        "stage": "get_image",
+        "wall time": "1.5",
+        "cpu time": "0.75",
+    }
+    with open(tmp_path / "timings.json") as f:
+        data = json.load(f)
+    assert data["summary"]["get_image"]["wall time mean"] == 1.0
+    assert len(data["records"]) == 2
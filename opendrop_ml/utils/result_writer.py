@@ -0,0 +1,263 @@
+"""Writers saving results a row at a time while a run is in progress.
+
+Rows are buffered and written out every ``chunk_size`` rows, so a run that
+stops part way keeps the frames it has finished, and there is no long write
+once the last frame is done. The format follows the file extension:
+
+- ``.csv``: rows appended to a text file,
+- ``.h5`` / ``.hdf5``: one resizable dataset per column (needs ``h5py``),
+- ``.parquet``: one Parquet file with a row group per chunk (needs
+  ``pyarrow``).
+
+Columnar formats keep full precision; ``formats`` only applies to CSV.
+"""
+
+from opendrop_ml.utils.enums import FunctionType, RegionSelect
+
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional, Sequence
+from datetime import datetime
+import numpy as np
+import csv
+import os
+
+# rows buffered before they are written out
+CHUNK_SIZE = 50
+
+HDF5_EXTENSIONS = (".h5", ".hdf5")
+PARQUET_EXTENSIONS = (".parquet",)
+
+
+def result_extension(result_format: Optional[str]) -> str:
+    """File extension for a ``result_format`` setting"""
+    result_format = (result_format or "csv").lower()
+    if result_format in ("hdf5", "h5"):
+        return ".h5"
+    if result_format == "parquet":
+        return ".parquet"
+    return ".csv"
+
+
+def default_output_path(function_type: FunctionType, user_input_data) -> str:
+    """Timestamped results file in ``user_input_data.output_directory``,
+    which is created if needed (``~/OpenDrop/outputs`` if unset)"""
+    if not user_input_data.output_directory:
+        user_input_data.output_directory = os.path.join(
+            os.path.join(os.path.expanduser("~")), "OpenDrop", "outputs"
+        )
+
+    if user_input_data.output_directory.startswith("~"):
+        user_input_data.output_directory = os.path.expanduser(
+            user_input_data.output_directory
+        )
+
+    # Prepare output path
+    os.makedirs(user_input_data.output_directory, exist_ok=True)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    extension = result_extension(user_input_data.result_format)
+    filename: str = ""
+    if user_input_data.filename:
+        filename = f"{user_input_data.filename}_{timestamp}{extension}"
+    else:
+        function_type_formatted = function_type.value.replace(
+            " ", "_"
+        )  # Interfacial Tension -> Interfacial_Tension
+        if (
+            user_input_data.drop_id_method == RegionSelect.USER_SELECTED
+            or user_input_data.needle_region_method == RegionSelect.USER_SELECTED
+        ):
+            filename = f"Manual_{function_type_formatted}_{timestamp}{extension}"
+        else:
+            filename = f"Automated_{function_type_formatted}_{timestamp}{extension}"
+
+    return os.path.join(user_input_data.output_directory, filename)
+
+
+class ResultWriter(ABC):
+    """Buffers rows of ``columns`` and writes them out in chunks"""
+
+    def __init__(
+        self,
+        path: str,
+        columns: Sequence[str],
+        chunk_size: int = CHUNK_SIZE,
+        formats: Optional[Sequence[Optional[str]]] = None,
+    ):
+        self.path = path
+        self.columns = list(columns)
+        self.chunk_size = max(1, chunk_size)
+        self.formats = list(formats) if formats else [None] * len(self.columns)
+        self.rows_written = 0
+        self._rows: List[List[Any]] = []
+        self._open()
+
+    def write_row(self, row: Sequence) -> None:
+        if len(row) != len(self.columns):
+            raise ValueError(
+                f"row has {len(row)} values for {len(self.columns)} columns"
+            )
+        self._rows.append(list(row))
+        if len(self._rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._rows:
+            self._write(self._rows)
+            self.rows_written += len(self._rows)
+            self._rows = []
+
+    def close(self) -> None:
+        self.flush()
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open(self) -> None:
+        pass
+
+    @abstractmethod
+    def _write(self, rows: List[List[Any]]) -> None:
+        pass
+
+    def _close(self) -> None:
+        pass
+
+
+class CsvResultWriter(ResultWriter):
+    def _open(self):
+        self._file = open(self.path, "w", newline="")
+        self._csv = csv.writer(self._file)
+        self._csv.writerow(self.columns)
+        self._sync()
+
+    def _write(self, rows):
+        for row in rows:
+            self._csv.writerow(
+                [
+                    "" if value is None else (fmt.format(value) if fmt else value)
+                    for value, fmt in zip(row, self.formats)
+                ]
+            )
+        self._sync()
+
+    def _sync(self):
+        # on disk before the next chunk is started
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _close(self):
+        self._file.close()
+
+
+class Hdf5ResultWriter(ResultWriter):
+    def _open(self):
+        import h5py
+
+        self._h5py = h5py
+        self._file = h5py.File(self.path, "w")
+        self._file.attrs["columns"] = self.columns
+        self._datasets = None
+
+    def _write(self, rows):
+        values = list(zip(*rows))
+        if self._datasets is None:
+            # column types are taken from the first chunk
+            self._datasets = [
+                self._file.create_dataset(
+                    _dataset_name(column),
+                    shape=(0,),
+                    maxshape=(None,),
+                    chunks=(self.chunk_size,),
+                    dtype=(
+                        self._h5py.string_dtype()
+                        if any(isinstance(v, str) for v in column_values)
+                        else float
+                    ),
+                )
+                for column, column_values in zip(self.columns, values)
+            ]
+        for dataset, column_values in zip(self._datasets, values):
+            if dataset.dtype.kind == "f":
+                column_values = [np.nan if v is None else v for v in column_values]
+            else:
+                column_values = ["" if v is None else str(v) for v in column_values]
+            dataset.resize((dataset.shape[0] + len(rows),))
+            dataset[-len(rows) :] = column_values
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetResultWriter(ResultWriter):
+    def _open(self):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError(
+                "Saving results as Parquet needs pyarrow: `pip install pyarrow`"
+            ) from None
+        self._pyarrow = pyarrow
+        self._writer = None
+
+    def _write(self, rows):
+        values = list(zip(*rows))
+        if self._writer is None:
+            # every row group has the column types of the first chunk
+            schema = self._pyarrow.schema(
+                [
+                    (
+                        column,
+                        (
+                            self._pyarrow.string()
+                            if any(isinstance(v, str) for v in column_values)
+                            else self._pyarrow.float64()
+                        ),
+                    )
+                    for column, column_values in zip(self.columns, values)
+                ]
+            )
+            self._writer = self._pyarrow.parquet.ParquetWriter(self.path, schema)
+        table = self._pyarrow.Table.from_pydict(
+            {
+                column: [_plain(v) for v in column_values]
+                for column, column_values in zip(self.columns, values)
+            },
+            schema=self._writer.schema,
+        )
+        self._writer.write_table(table)
+
+    def _close(self):
+        if self._writer is None:
+            # no rows, the file still has the columns
+            schema = self._pyarrow.schema(
+                [(column, self._pyarrow.float64()) for column in self.columns]
+            )
+            self._pyarrow.parquet.write_table(schema.empty_table(), self.path)
+        else:
+            self._writer.close()
+
+
+def open_result_writer(path: str, columns: Sequence[str], **kwargs) -> ResultWriter:
+    """Writer of ``columns`` to ``path``, in the format of its extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in HDF5_EXTENSIONS:
+        return Hdf5ResultWriter(path, columns, **kwargs)
+    if extension in PARQUET_EXTENSIONS:
+        return ParquetResultWriter(path, columns, **kwargs)
+    return CsvResultWriter(path, columns, **kwargs)
+
+
+def _dataset_name(column: str) -> str:
+    # "/" would make a group
+    return column.replace("/", "_")
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
@@ -0,0 +1,120 @@
+from opendrop_ml.utils.result_writer import (
+    CsvResultWriter,
+    ResultWriter,
+    open_result_writer,
+    result_extension,
+)
+
+from unittest.mock import patch
+import numpy as np
+import pytest
+import h5py
+import sys
+
+COLUMNS = ["Filename", "Time (s)", "IFT (mN/m)"]
+
+
+def rows(n):
+    return [[f"frame_{i}.png", i * 0.5, np.float64(70 + i)] for i in range(n)]
+
+
+def read_lines(path):
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_csv_rows_are_written_in_chunks(tmp_path):
+    path = str(tmp_path / "results.csv")
+    writer = open_result_writer(path, COLUMNS, chunk_size=2)
+    assert isinstance(writer, CsvResultWriter)
+
+    for row in rows(3):
+        writer.write_row(row)
+    # the last row waits for the chunk to fill
+    assert read_lines(path) == [
+        "Filename,Time (s),IFT (mN/m)",
+        "frame_0.png,0.0,70.0",
+        "frame_1.png,0.5,71.0",
+    ]
+    assert writer.rows_written == 2
+
+    writer.close()
+    assert read_lines(path)[-1] == "frame_2.png,1.0,72.0"
+
+
+def test_csv_formats_and_missing_values(tmp_path):
+    path = str(tmp_path / "results.csv")
+    with open_result_writer(
+        path, COLUMNS, formats=[None, "{:.1f}", "{:.3f}"]
+    ) as writer:
+        writer.write_row(["a.png", 0.25, None])
+        writer.write_row(["b.png", 1, 71.23456])
+
+    assert read_lines(path)[1:] == ["a.png,0.2,", "b.png,1.0,71.235"]
+
+
+def test_row_length_is_checked(tmp_path):
+    with open_result_writer(str(tmp_path / "results.csv"), COLUMNS) as writer:
+        with pytest.raises(ValueError):
+            writer.write_row(["a.png", 0])
+
+
+def test_hdf5_columns(tmp_path):
+    path = str(tmp_path / "results.h5")
+    with open_result_writer(path, COLUMNS, chunk_size=2) as writer:
+        for row in rows(5):
+            writer.write_row(row)
+        writer.write_row(["missing.png", 2.5, None])
+
+    with h5py.File(path, "r") as f:
+        assert list(f.attrs["columns"]) == COLUMNS
+        names = [name.decode() for name in f["Filename"][:]]
+        assert names == [f"frame_{i}.png" for i in range(5)] + ["missing.png"]
+        np.testing.assert_array_equal(f["Time (s)"][:], np.arange(6) * 0.5)
+        # "/" would make a group
+        np.testing.assert_array_equal(f["IFT (mN_m)"][:], [70, 71, 72, 73, 74, np.nan])
+
+
+def test_parquet_row_groups(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "results.parquet")
+    with open_result_writer(path, COLUMNS, chunk_size=2) as writer:
+        writer.write_row(["a.png", 0.0, None])
+        for row in rows(4):
+            writer.write_row(row)
+
+    # one file, a row group per chunk
+    assert pq.ParquetFile(path).num_row_groups == 3
+    table = pq.read_table(path)
+    assert table.column_names == COLUMNS
+    assert table.num_rows == 5
+    assert table.column("IFT (mN/m)").to_pylist() == [None, 70, 71, 72, 73]
+
+
+def test_parquet_without_rows(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "results.parquet")
+    with open_result_writer(path, COLUMNS):
+        pass
+
+    table = pq.read_table(path)
+    assert table.column_names == COLUMNS
+    assert table.num_rows == 0
+
+
+def test_parquet_needs_pyarrow(tmp_path):
+    with patch.dict(sys.modules, {"pyarrow": None, "pyarrow.parquet": None}):
+        with pytest.raises(ImportError, match="pyarrow"):
+            open_result_writer(str(tmp_path / "results.parquet"), COLUMNS)
+
+
+def test_result_writer_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        ResultWriter(str(tmp_path / "results.txt"), COLUMNS)
+
+
+def test_result_extension():
+    assert result_extension(None) == ".csv"
+    assert result_extension("CSV") == ".csv"
+    assert result_extension("hdf5") == ".h5"
+    assert result_extension("parquet") == ".parquet"
@@ -1,4 +1,5 @@
 from opendrop_ml.modules.core.classes import ExperimentalSetup
+from opendrop_ml.modules.image.video import open_frame, set_import_files
 from opendrop_ml.utils.image_handler import ImageHandler
 from opendrop_ml.utils.enums import FunctionType
 from opendrop_ml.utils.config import (
@@ -13,7 +14,6 @@ from opendrop_ml.views.helper.style import set_light_only_color
 
 from customtkinter import CTkFrame, CTkLabel, CTkButton, CTkEntry, CTkImage
 from tkinter import filedialog, messagebox
-from PIL import Image
 import os
 
 
@@ -183,16 +183,18 @@ class Acquisition(CTkFrame):
         for widget in self.images_frame.winfo_children():
             widget.destroy()
 
-        self.user_input_data.import_files = filedialog.askopenfilenames(
+        selected_files = filedialog.askopenfilenames(
             title="Select Files", filetypes=IMAGE_TYPE, initialdir=PATH_TO_SCRIPT
         )
+        # each video is analysed as its frames
+        set_import_files(self.user_input_data, selected_files)
 
-        num_files = len(self.user_input_data.import_files)
-        self.user_input_data.number_of_frames = num_files
+        num_files = self.user_input_data.number_of_frames
 
         if num_files > 0:
             self.choose_files_button.configure(
-                text=f"{num_files} File(s) Selected")
+                text=f"{len(selected_files)} File(s) Selected"
+            )
             self.current_index = 0
 
             # Initialize image display
@@ -279,7 +281,7 @@ class Acquisition(CTkFrame):
     def load_image(self, selected_image):
         """Load and display the selected image."""
         try:
-            self.current_image = Image.open(selected_image)
+            self.current_image = open_frame(selected_image)
             self.display_image()
 
         except FileNotFoundError:
@@ -13,6 +13,9 @@ from opendrop_ml.utils.enums import FittingMethod
 from opendrop_ml.views.helper.theme import get_system_text_color
 from opendrop_ml.views.helper.style import set_light_only_color
 from opendrop_ml.views.component.CTkXYFrame.ctk_xyframe import CTkXYFrame
+from opendrop_ml.utils.lazy import lazy_import
+from opendrop_ml.utils.image_cache import ImageCache
+from opendrop_ml.modules.image.video import open_frame
 
 from customtkinter import (
     CTkFrame,
@@ -26,20 +29,26 @@ from customtkinter import (
     StringVar,
 )
 from PIL import Image, ImageDraw, ImageFont
-from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 
 # import io
 import os
 import math
 import cv2
-import matplotlib.pyplot as plt
+
+backend_agg = lazy_import("matplotlib.backends.backend_agg")
+plt = lazy_import("matplotlib.pyplot")
+
+# largest cropped image kept per frame in bounded-memory mode
+THUMBNAIL_SIZE = (400, 300)
 
 
 class CaAnalysis(CTkFrame):
-    def __init__(self, parent, user_input_data, **kwargs):
+    def __init__(self, parent, user_input_data, results=None, **kwargs):
         super().__init__(parent, **kwargs)
         self.user_input_data = user_input_data
+        # the processor's ResultStore, read by the line chart if given
+        self.results = results
 
         self.grid_columnconfigure(0, weight=1)  # Let table expand
         # Prevent images_frame from expanding
@@ -51,6 +60,16 @@ class CaAnalysis(CTkFrame):
         self.output = []
         self.cropped_images = {}  # Cropped pictures
         self.cropped_angle_images = {}  # Crop diagram after superimposing angles
+
+        # long runs keep only a thumbnail of each cropped image and the
+        # annotations to draw on it when shown
+        self.bounded_memory = bool(user_input_data.bounded_memory)
+        self.thumbnail_scales = {}  # {index: thumbnail size / cropped size}
+        self.annotations = {}  # {index: {method: (left, right, points, lines)}}
+        # original images, decoded again when shown
+        self.image_cache = ImageCache(
+            int(user_input_data.image_cache_mb * 1024**2), loader=open_frame
+        )
         self.left_angles = []  # Keep the original list for backward compatibility
         self.right_angles = []  # Keep the original list for backward compatibility
 
@@ -138,7 +157,7 @@ class CaAnalysis(CTkFrame):
         contact_angles = experimental_drop.contact_angles
 
         # save the experimental drop object for this index
-        self.output[index] = experimental_drop
+        self.output[index] = None if self.bounded_memory else experimental_drop
 
         # Update table data
         for method in contact_angles.keys():
@@ -197,6 +216,11 @@ class CaAnalysis(CTkFrame):
                     else:
                         cropped_pil = Image.fromarray(cropped_cv)
 
+                    if self.bounded_memory:
+                        width = cropped_pil.width
+                        cropped_pil.thumbnail(THUMBNAIL_SIZE)
+                        self.thumbnail_scales[index] = cropped_pil.width / width
+
                     # Save cropped image
                     self.cropped_images[index] = cropped_pil
                     print(
@@ -335,6 +359,19 @@ class CaAnalysis(CTkFrame):
             tangent_lines = self.get_tangent_lines(angles_data)
 
             if contact_points and tangent_lines and index in self.cropped_images:
+                display_name = method if isinstance(method, str) else method.value
+
+                if self.bounded_memory:
+                    # drawn on the thumbnail when shown
+                    scale = self.thumbnail_scales.get(index, 1)
+                    self.annotations.setdefault(index, {})[display_name] = (
+                        left_angle,
+                        right_angle,
+                        scale_points([contact_points[0], contact_points[1]], scale),
+                        [scale_points(tangent_lines[side], scale) for side in (0, 1)],
+                    )
+                    return True
+
                 # Create annotated image
                 cropped_img = self.cropped_images[index]
                 annotated_img = self.draw_on_cropped_image(
@@ -342,8 +379,6 @@ class CaAnalysis(CTkFrame):
                 )
 
                 # Save to method-specific dictionary using display name
-                display_name = method if isinstance(
-                    method, str) else method.value
                 self.cropped_angle_images[index][display_name] = annotated_img
                 return True
 
@@ -867,7 +902,9 @@ class CaAnalysis(CTkFrame):
         selected_method = self.selected_contact_method.get()
 
         if self.current_index in self.cropped_angle_images:
-            method_images = self.cropped_angle_images[self.current_index]
+            method_images = self.cropped_angle_images[
+                self.current_index
+            ] or self.draw_annotations(self.current_index)
 
             img = None
             if selected_method in method_images:
@@ -911,7 +948,21 @@ class CaAnalysis(CTkFrame):
         left_angles = None
         right_angles = None
 
-        if selected_method in self.method_angles:
+        if self.results is not None and (selected_method, LEFT_ANGLE) in set(
+            self.results.angle_paths()
+        ):
+            left = self.results.column(selected_method, LEFT_ANGLE)
+            right = self.results.column(selected_method, RIGHT_ANGLE)
+            valid = ~(np.isnan(left) | np.isnan(right))
+            frames = list(np.flatnonzero(valid) + 1)
+            left_angles, right_angles = left[valid], right[valid]
+
+            if not frames:
+                self.image_label.configure(
+                    text=f"No valid angle data for method: {selected_method}", image=""
+                )
+                return
+        elif selected_method in self.method_angles:
             left_angles = self.method_angles[selected_method]["left"]
             right_angles = self.method_angles[selected_method]["right"]
 
@@ -959,7 +1010,7 @@ class CaAnalysis(CTkFrame):
         ax.legend()
         fig.tight_layout()
 
-        canvas = FigureCanvasAgg(fig)
+        canvas = backend_agg.FigureCanvasAgg(fig)
         canvas.draw()
         w, h = canvas.get_width_height()
         buf = canvas.buffer_rgba()
@@ -971,6 +1022,27 @@ class CaAnalysis(CTkFrame):
         self.image_label.image = self.tk_image
         plt.close(fig)
 
+    def draw_annotations(self, index):
+        """Annotated thumbnails of frame ``index`` by method, drawn from the
+        annotations kept in bounded-memory mode"""
+        if index not in self.cropped_images:
+            return {}
+        return {
+            method: self.draw_on_cropped_image(
+                self.cropped_images[index],
+                left_angle,
+                right_angle,
+                contact_points,
+                tangent_lines,
+            )
+            for method, (
+                left_angle,
+                right_angle,
+                contact_points,
+                tangent_lines,
+            ) in self.annotations.get(index, {}).items()
+        }
+
     def change_image(self, step):
         """Change displayed image"""
         if self.user_input_data.import_files:
@@ -996,7 +1068,7 @@ class CaAnalysis(CTkFrame):
     def load_image(self, image_path):
         """Load image and prepare for display"""
         try:
-            self.current_image = Image.open(image_path)
+            self.current_image = self.image_cache.get(image_path)
             self.display_current_image()
         except Exception as e:
             print(f"Error loading image: {e}")
@@ -1168,3 +1240,8 @@ def extract_method(contact_angles):
         if method in contact_angles:
             return method
     return None
+
+
+def scale_points(points, scale):
+    """``points`` as (x, y) float tuples, multiplied by ``scale``"""
+    return [(float(x) * scale, float(y) * scale) for x, y in points]
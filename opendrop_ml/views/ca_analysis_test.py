@@ -1,5 +1,11 @@
 from opendrop_ml.views.ca_analysis import CaAnalysis, extract_method
 from opendrop_ml.utils.enums import FittingMethod
+from opendrop_ml.utils.config import (
+    CONTACT_POINTS,
+    LEFT_ANGLE,
+    RIGHT_ANGLE,
+    TANGENT_LINES,
+)
 
 from unittest.mock import MagicMock
 from PIL import Image
@@ -41,3 +47,34 @@ def test_draw_on_cropped_image_returns_image():
     )
 
     assert isinstance(result_img, Image.Image)
+
+
+def test_bounded_memory_annotations_are_drawn_on_thumbnails():
+    ca = MagicMock(spec=CaAnalysis)
+    ca.bounded_memory = True
+    ca.cropped_images = {0: Image.new("RGB", (100, 50))}
+    ca.cropped_angle_images = {0: {}}
+    ca.thumbnail_scales = {0: 0.5}
+    ca.annotations = {}
+    ca.get_contact_points = lambda data: CaAnalysis.get_contact_points(ca, data)
+    ca.get_tangent_lines = lambda data: CaAnalysis.get_tangent_lines(ca, data)
+    ca.draw_on_cropped_image = lambda *args: CaAnalysis.draw_on_cropped_image(ca, *args)
+    angles_data = {
+        LEFT_ANGLE: 30,
+        RIGHT_ANGLE: 45,
+        CONTACT_POINTS: {0: [30, 80], 1: [70, 80]},
+        TANGENT_LINES: {0: [[30, 80], [50, 60]], 1: [[70, 80], [90, 60]]},
+    }
+
+    assert CaAnalysis.process_method_annotation(
+        ca, FittingMethod.TANGENT_FIT, angles_data, 0
+    )
+
+    # only the annotation is kept, scaled to the thumbnail
+    assert ca.cropped_angle_images == {0: {}}
+    _, _, contact_points, tangent_lines = ca.annotations[0]["tangent fit"]
+    assert contact_points == [(15, 40), (35, 40)]
+    assert tangent_lines[1] == [(35, 40), (45, 30)]
+
+    images = CaAnalysis.draw_annotations(ca, 0)
+    assert images["tangent fit"].size == (100, 50)
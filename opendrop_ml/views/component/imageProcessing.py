@@ -1,5 +1,6 @@
 # from opendrop_ml.modules.image.read_image import get_image
 from opendrop_ml.modules.core.classes import ExperimentalDrop, ExperimentalSetup
+from opendrop_ml.modules.image.video import open_frame
 
 # from opendrop_ml.views.component.check_button import CheckButton
 from opendrop_ml.views.helper.style import set_light_only_color
@@ -169,7 +170,7 @@ class ImageApp(ctk.CTkFrame):
             if isinstance(selected_image, Image.Image):
                 self.current_image = selected_image
             else:
-                self.current_image = Image.open(selected_image)
+                self.current_image = open_frame(selected_image)
         self.display_image()
 
     def display_image(self):
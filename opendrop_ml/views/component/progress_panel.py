@@ -0,0 +1,36 @@
+from opendrop_ml.views.helper.analysis_worker import Progress
+
+from customtkinter import CTkFrame, CTkLabel, CTkButton, CTkProgressBar
+from typing import Callable
+
+
+class ProgressPanel(CTkFrame):
+    """Progress bar, frames done with the time left, and a cancel button"""
+
+    def __init__(self, parent, progress: Progress, on_cancel: Callable, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.progress = progress
+
+        self.bar = CTkProgressBar(self, width=240)
+        self.bar.grid(row=0, column=0, padx=10, pady=10)
+        self.label = CTkLabel(self, text="")
+        self.label.grid(row=0, column=1, padx=10, pady=10)
+        self.cancel_button = CTkButton(
+            self, text="Cancel", width=80, command=self._cancel
+        )
+        self.cancel_button.grid(row=0, column=2, padx=10, pady=10)
+        self._on_cancel = on_cancel
+        self.refresh()
+
+    def update_progress(self, done: int) -> None:
+        self.progress.update(done)
+        self.refresh()
+
+    def refresh(self) -> None:
+        self.bar.set(self.progress.fraction)
+        self.label.configure(text=self.progress.text())
+
+    def _cancel(self) -> None:
+        # the frame in progress is finished before the analysis stops
+        self.cancel_button.configure(state="disabled", text="Cancelling...")
+        self._on_cancel()
@@ -1,5 +1,11 @@
-from opendrop_ml.modules.contact_angle.ca_data_processor import CaDataProcessor
-from opendrop_ml.modules.ift.ift_data_processor import IftDataProcessor
+from opendrop_ml.modules.contact_angle.ca_data_processor import (
+    CaDataProcessor,
+    can_run_in_background,
+)
+from opendrop_ml.modules.ift.ift_data_processor import (
+    IftDataProcessor,
+    can_prepare_in_parallel,
+)
 from opendrop_ml.modules.core.classes import ExperimentalSetup, ExperimentalDrop, DropData
 from opendrop_ml.utils.os import resource_path, is_windows
 from opendrop_ml.views.helper.validation import (
@@ -9,6 +15,14 @@ from opendrop_ml.views.helper.validation import (
 )
 from opendrop_ml.views.helper.style import get_color, set_light_only_color
 from opendrop_ml.views.helper.theme import LIGHT_MODE
+from opendrop_ml.views.helper.analysis_worker import (
+    AnalysisWorker,
+    Progress,
+    DONE,
+    CANCELLED,
+    ERROR,
+)
+from opendrop_ml.views.component.progress_panel import ProgressPanel
 from opendrop_ml.views.navigation import create_navigation
 from opendrop_ml.views.acquisition import Acquisition
 from opendrop_ml.views.ift_preparation import IftPreparation
@@ -17,12 +31,12 @@ from opendrop_ml.views.ca_preparation import CaPreparation
 from opendrop_ml.views.ca_analysis import CaAnalysis
 from opendrop_ml.views.main_window import MainWindow
 from opendrop_ml.views.output_page import OutputPage
-from opendrop_ml.utils.enums import FunctionType, Stage, Move, RegionSelect
+from opendrop_ml.utils.enums import FunctionType, Stage, Move
+from opendrop_ml.utils.result_writer import default_output_path
 
 from customtkinter import CTkFrame, CTkButton, CTkToplevel, get_appearance_mode
 from tkinter import messagebox, PhotoImage
-from typing import List, Callable
-from datetime import datetime
+from typing import List, Callable, Optional
 import os
 
 
@@ -42,6 +56,7 @@ class FunctionWindow(CTkToplevel):
     ift_preparation_frame: IftPreparation
     ift_analysis_frame: IftAnalysis
     output_frame: OutputPage
+    analysis_worker: Optional[AnalysisWorker]
     after_ids: List[int]
     button_frame: CTkFrame
     back_button: CTkButton
@@ -69,6 +84,7 @@ class FunctionWindow(CTkToplevel):
 
         # after callback
         self.after_ids = []
+        self.analysis_worker = None
         if get_appearance_mode() == LIGHT_MODE:
             self.FG_COLOR: str = get_color("background")
         else:
@@ -420,75 +436,189 @@ class FunctionWindow(CTkToplevel):
             self._run_ca_analysis(user_input_data, fitted_drop_data)
 
     def _run_ift_analysis(self, user_input_data):
+        output_file_path = self._streamed_output_file(
+            FunctionType.INTERFACIAL_TENSION, user_input_data
+        )
+        if can_prepare_in_parallel(user_input_data):
+            self._start_analysis(
+                user_input_data.number_of_frames,
+                lambda report, cancel: self.ift_processor.process_data(
+                    user_input_data,
+                    output_file_path=output_file_path,
+                    frame_callback=lambda n: report("frame", n),
+                    cancel=cancel,
+                ),
+                on_done=lambda: self._show_ift_analysis(user_input_data),
+                on_error=self._handle_ift_error,
+            )
+            return
+
+        # region selection windows have to be opened from this thread
+        try:
+            self.withdraw()
+            self.ift_processor.process_data(
+                user_input_data, output_file_path=output_file_path
+            )
+            self._show_ift_analysis(user_input_data)
+        except Exception as e:
+            self._handle_ift_error(e)
+        finally:
+            self.deiconify()
+
+    def _show_ift_analysis(self, user_input_data):
         self.ift_preparation_frame.pack_forget()
         self.ift_analysis_frame = IftAnalysis(
             self, user_input_data, self.ift_processor, fg_color=self.FG_COLOR
         )
         self.ift_analysis_frame.pack(fill="both", expand=True)
 
-        try:
-            self.withdraw()
-            self.ift_processor.process_data(user_input_data)
-        except Exception as e:
-            error_msg = str(e)
-            print(f"[Error] IFT processing failed: {error_msg}")
+    def _handle_ift_error(self, e: Exception):
+        error_msg = str(e)
+        print(f"[Error] IFT processing failed: {error_msg}")
 
-            if "Parameter estimation failed" in error_msg or "ERKStepEvolve()" in error_msg:
-                self.update_stage(Move.Back.value)
+        if "Parameter estimation failed" in error_msg or "ERKStepEvolve()" in error_msg:
+            self.update_stage(Move.Back.value)
+            if hasattr(self, "ift_analysis_frame"):
                 self.ift_analysis_frame.pack_forget()
-                self.ift_preparation_frame.pack(fill="both", expand=True)
-                messagebox.showerror(
-                    "Invalid Region",
-                    "No usable droplet was detected or the boundary is incomplete.",
-                    parent=self
-                )
-            else:
-                messagebox.showerror(
-                    "Error", f"Error: \n{e}\n\nPlease try again.", parent=self)
-                self.on_closing()
-        finally:
-            self.deiconify()
+            self.ift_preparation_frame.pack(fill="both", expand=True)
+            messagebox.showerror(
+                "Invalid Region",
+                "No usable droplet was detected or the boundary is incomplete.",
+                parent=self,
+            )
+        else:
+            messagebox.showerror(
+                "Error", f"Error: \n{e}\n\nPlease try again.", parent=self
+            )
+            self.on_closing()
 
     def _run_ca_analysis(self, user_input_data, fitted_drop_data):
         self.ca_preparation_frame.pack_forget()
         self.ca_analysis_frame = CaAnalysis(
-            self, user_input_data, fg_color=self.FG_COLOR)
+            self,
+            user_input_data,
+            results=self.ca_processor.results,
+            fg_color=self.FG_COLOR,
+        )
         self.ca_analysis_frame.pack(fill="both", expand=True)
+        output_file_path = self._streamed_output_file(
+            FunctionType.CONTACT_ANGLE, user_input_data
+        )
+
+        if can_run_in_background(user_input_data):
+            self._start_analysis(
+                user_input_data.number_of_frames,
+                lambda report, cancel: self.ca_processor.process_data(
+                    fitted_drop_data,
+                    user_input_data,
+                    callback=lambda n, drop: report("frame", n, drop),
+                    output_file_path=output_file_path,
+                    cancel=cancel,
+                ),
+                on_frame=self.ca_analysis_frame.receive_output,
+                on_error=self._handle_ca_error,
+            )
+            return
 
+        # region selection and debug windows have to be opened from this thread
         try:
             self.withdraw()
             self.ca_processor.process_data(
                 fitted_drop_data,
                 user_input_data,
                 callback=self.ca_analysis_frame.receive_output,
+                output_file_path=output_file_path,
             )
         except Exception as e:
-            error_msg = str(e)
-            print(error_msg)
-            if any(keyword in error_msg for keyword in [
-               "array must not contain infs or NaNs",
+            self._handle_ca_error(e)
+        finally:
+            self.deiconify()
+
+    def _handle_ca_error(self, e: Exception):
+        error_msg = str(e)
+        print(error_msg)
+        if any(
+            keyword in error_msg
+            for keyword in [
+                "array must not contain infs or NaNs",
                 "float division by zero",
-               ]):
-                messagebox.showerror(
-                    "Invalid Image", f"This image is not for Cotanct Angle analysis.\nPlease go back and select another image or application.", parent=self)
-                self.on_closing()
-            elif any(keyword in error_msg for keyword in [
+            ]
+        ):
+            messagebox.showerror(
+                "Invalid Image",
+                f"This image is not for Cotanct Angle analysis.\nPlease go back and select another image or application.",
+                parent=self,
+            )
+            self.on_closing()
+        elif any(
+            keyword in error_msg
+            for keyword in [
                 "list index out of range",
                 "'NoneType' object is not iterable",
                 "float division by zero",
                 "too many indices",
-            ]):
-                messagebox.showerror(
-                    "Invalid Region", "No usable droplet detected or the boundary is incomplete.", parent=self)
-                self.update_stage(Move.Back.value)
-                self.ca_analysis_frame.pack_forget()
-                self.ca_preparation_frame.pack(fill="both", expand=True)
-            else:
-                messagebox.showerror(
-                    "Error", f"Error: \n{e}\n\nPlease try again.", parent=self)
-                self.on_closing()
-        finally:
-            self.deiconify()
+            ]
+        ):
+            messagebox.showerror(
+                "Invalid Region",
+                "No usable droplet detected or the boundary is incomplete.",
+                parent=self,
+            )
+            self.update_stage(Move.Back.value)
+            self.ca_analysis_frame.pack_forget()
+            self.ca_preparation_frame.pack(fill="both", expand=True)
+        else:
+            messagebox.showerror(
+                "Error", f"Error: \n{e}\n\nPlease try again.", parent=self
+            )
+            self.on_closing()
+
+    def _start_analysis(
+        self,
+        n_frames: int,
+        run: Callable,
+        on_frame: Optional[Callable] = None,
+        on_done: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+    ):
+        """Run the analysis on a worker thread, showing its progress in place
+        of the navigation until it ends"""
+        progress_panel = ProgressPanel(
+            self.button_frame,
+            Progress(n_frames),
+            on_cancel=lambda: self.analysis_worker.cancel(),
+        )
+        progress_panel.pack(side="left", padx=10, pady=10)
+        self.back_button.configure(state="disabled")
+        self.next_button.configure(state="disabled")
+
+        def frame(n, *args):
+            progress_panel.update_progress(n)
+            if on_frame:
+                on_frame(n, *args)
+
+        def finish(handler):
+            def end(*args):
+                progress_panel.destroy()
+                self.back_button.configure(state="normal")
+                self.next_button.configure(state="normal")
+                if handler:
+                    handler(*args)
+
+            return end
+
+        self.analysis_worker = AnalysisWorker(
+            self,
+            run,
+            {
+                "frame": frame,
+                DONE: finish(on_done),
+                # the frames finished before cancelling are shown and saved
+                CANCELLED: finish(on_done),
+                ERROR: finish(on_error),
+            },
+        )
+        self.analysis_worker.start()
 
     def _handle_output_stage(self, function_type, user_input_data):
         if function_type == FunctionType.INTERFACIAL_TENSION:
@@ -503,43 +633,31 @@ class FunctionWindow(CTkToplevel):
         self.next_button.pack_forget()
         self.save_button.pack(side="right", padx=10, pady=10)
 
-    def save_output(
+    def _streamed_output_file(
         self, function_type: FunctionType, user_input_data: ExperimentalSetup
-    ):
-        if not user_input_data.output_directory:
-            user_input_data.output_directory = os.path.join(
-                os.path.join(os.path.expanduser("~")), "OpenDrop", "outputs"
-            )
-
-        if user_input_data.output_directory.startswith("~"):
-            user_input_data.output_directory = os.path.expanduser(
-                user_input_data.output_directory
-            )
-
-        # Prepare output path
-        os.makedirs(user_input_data.output_directory, exist_ok=True)
+    ) -> Optional[str]:
+        if not user_input_data.stream_results:
+            return None
+        return self.output_file_path(function_type, user_input_data)
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename: str = ""
-        if user_input_data.filename:
-            filename = f"{user_input_data.filename}_{timestamp}.csv"
-        else:
-            function_type_formatted = function_type.value.replace(
-                " ", "_"
-            )  # Interfacial Tension -> Interfacial_Tension
-            if (
-                user_input_data.drop_id_method == RegionSelect.USER_SELECTED
-                or user_input_data.needle_region_method == RegionSelect.USER_SELECTED
-            ):
-                filename = f"Manual_{function_type_formatted}_{timestamp}.csv"
-            else:
-                filename = f"Automated_{function_type_formatted}_{timestamp}.csv"
+    def output_file_path(
+        self, function_type: FunctionType, user_input_data: ExperimentalSetup
+    ) -> str:
+        return default_output_path(function_type, user_input_data)
 
-        output_file = os.path.join(user_input_data.output_directory, filename)
-        if function_type == FunctionType.INTERFACIAL_TENSION:
-            self.ift_processor.save_result(user_input_data, output_file)
-        else:
-            self.ca_processor.save_result(user_input_data, output_file)
+    def save_output(
+        self, function_type: FunctionType, user_input_data: ExperimentalSetup
+    ):
+        processor = (
+            self.ift_processor
+            if function_type == FunctionType.INTERFACIAL_TENSION
+            else self.ca_processor
+        )
+        # results streamed during the analysis are already in their file
+        output_file = processor.streamed_path or self.output_file_path(
+            function_type, user_input_data
+        )
+        processor.save_result(user_input_data, output_file)
 
         messagebox.showinfo(
             "Save Successful",
@@ -573,6 +691,10 @@ class FunctionWindow(CTkToplevel):
 
     def on_closing(self):
         try:
+            # Step 0: stop a background analysis after its current frame
+            if getattr(self, "analysis_worker", None) is not None:
+                self.analysis_worker.stop()
+
             # Step 1: cancel all  after()
             if hasattr(self, 'after_ids'):
                 for after_id in self.after_ids:
@@ -0,0 +1,131 @@
+"""Running an analysis on a background thread while the Tk loop stays live.
+
+Tk widgets may only be used from the main thread, so the analysis reports
+through a queue instead of calling into the views: ``report(kind, *args)``
+on the worker thread ends up as ``handlers[kind](*args)`` on the Tk thread,
+where the queue is drained every ``poll_ms`` with ``after``.
+"""
+
+from typing import Callable, Dict, Optional
+import threading
+import traceback
+import queue
+import time
+
+# messages that end a run, sent after everything the analysis reported
+DONE = "done"
+CANCELLED = "cancelled"
+ERROR = "error"
+
+
+class AnalysisWorker:
+    """Runs ``run(report, cancel)`` on a thread.
+
+    ``cancel`` is a ``threading.Event`` the analysis checks between frames.
+    The run ends with a ``"done"`` or ``"cancelled"`` message, or ``"error"``
+    with the exception raised.
+    """
+
+    def __init__(
+        self,
+        widget,
+        run: Callable[[Callable, threading.Event], None],
+        handlers: Dict[str, Callable],
+        poll_ms: int = 100,
+    ):
+        self.widget = widget
+        self.handlers = handlers
+        self.poll_ms = poll_ms
+        self.cancel_event = threading.Event()
+        self.finished = False
+        self._run = run
+        self._after_id = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._target, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        self._schedule()
+
+    def cancel(self) -> None:
+        """Ask the analysis to stop after the frame it is working on"""
+        self.cancel_event.set()
+
+    def stop(self) -> None:
+        """Cancel and stop handling messages, e.g. when the window closes"""
+        self.cancel()
+        self.finished = True
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def report(self, kind: str, *args) -> None:
+        self._queue.put((kind, args))
+
+    def poll(self) -> bool:
+        """Handle every queued message; True once the run has ended"""
+        while not self.finished:
+            try:
+                kind, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self.finished = kind in (DONE, CANCELLED, ERROR)
+            handler = self.handlers.get(kind)
+            if handler is not None:
+                handler(*args)
+        return self.finished
+
+    def _target(self) -> None:
+        try:
+            self._run(self.report, self.cancel_event)
+        except Exception as e:
+            traceback.print_exc()
+            self.report(ERROR, e)
+        else:
+            self.report(CANCELLED if self.cancel_event.is_set() else DONE)
+
+    def _schedule(self) -> None:
+        self._after_id = None
+        if not self.poll():
+            self._after_id = self.widget.after(self.poll_ms, self._schedule)
+
+
+class Progress:
+    """Frames done out of ``total``, with the time left estimated from the
+    average time per frame so far"""
+
+    def __init__(self, total: int, clock: Callable[[], float] = time.monotonic):
+        self.total = max(0, int(total))
+        self.done = 0
+        self._clock = clock
+        self._start = clock()
+
+    def update(self, done: int) -> None:
+        self.done = min(done, self.total) if self.total else done
+
+    @property
+    def fraction(self) -> float:
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def seconds_left(self) -> Optional[float]:
+        if not self.done:
+            return None
+        elapsed = self._clock() - self._start
+        return elapsed / self.done * (self.total - self.done)
+
+    def text(self) -> str:
+        text = f"{self.done} of {self.total} frames"
+        seconds_left = self.seconds_left
+        if seconds_left is not None and self.done < self.total:
+            text += f", about {format_duration(seconds_left)} left"
+        return text
+
+
+def format_duration(seconds: float) -> str:
+    """``seconds`` as h:mm:ss or m:ss"""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
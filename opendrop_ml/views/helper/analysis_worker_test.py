@@ -0,0 +1,133 @@
+from opendrop_ml.views.helper.analysis_worker import (
+    AnalysisWorker,
+    Progress,
+    format_duration,
+    DONE,
+    CANCELLED,
+    ERROR,
+)
+
+import threading
+
+
+class FakeWidget:
+    """Keeps the ``after`` callbacks so the test runs them"""
+
+    def __init__(self):
+        self.pending = {}
+        self.cancelled = []
+
+    def after(self, ms, callback):
+        after_id = f"after#{len(self.pending)}"
+        self.pending[after_id] = callback
+        return after_id
+
+    def after_cancel(self, after_id):
+        self.cancelled.append(after_id)
+
+
+def run_worker(run):
+    received = []
+    handlers = {
+        kind: (lambda kind: lambda *args: received.append((kind, args)))(kind)
+        for kind in ("frame", DONE, CANCELLED, ERROR)
+    }
+    worker = AnalysisWorker(FakeWidget(), run, handlers)
+    worker.start()
+    worker._thread.join(timeout=10)
+    assert worker.poll()
+    return worker, received
+
+
+def test_messages_are_handled_in_order():
+    def run(report, cancel):
+        for n in range(1, 4):
+            report("frame", n)
+
+    worker, received = run_worker(run)
+    assert received == [("frame", (1,)), ("frame", (2,)), ("frame", (3,)), (DONE, ())]
+
+
+def test_cancel():
+    started = threading.Event()
+
+    def run(report, cancel):
+        started.set()
+        cancel.wait(timeout=10)
+        report("frame", 1)
+
+    received = []
+    worker = AnalysisWorker(
+        FakeWidget(), run, {CANCELLED: lambda: received.append(CANCELLED)}
+    )
+    worker.start()
+    started.wait(timeout=10)
+    worker.cancel()
+    worker._thread.join(timeout=10)
+
+    assert worker.poll()
+    assert received == [CANCELLED]
+
+
+def test_error_ends_the_run():
+    def run(report, cancel):
+        report("frame", 1)
+        raise ValueError("no drop")
+
+    worker, received = run_worker(run)
+    assert received[0] == ("frame", (1,))
+    kind, (error,) = received[1]
+    assert kind == ERROR and isinstance(error, ValueError)
+
+
+def test_polls_until_finished():
+    release = threading.Event()
+
+    def run(report, cancel):
+        release.wait(timeout=10)
+
+    widget = FakeWidget()
+    worker = AnalysisWorker(widget, run, {})
+    worker.start()
+    assert not worker.finished
+    assert len(widget.pending) == 1
+
+    release.set()
+    worker._thread.join(timeout=10)
+    widget.pending.popitem()[1]()
+    assert worker.finished
+    assert not widget.pending
+
+
+def test_stop_cancels_the_poll():
+    release = threading.Event()
+    widget = FakeWidget()
+    worker = AnalysisWorker(widget, lambda report, cancel: release.wait(10), {})
+    worker.start()
+
+    worker.stop()
+    assert worker.cancel_event.is_set()
+    assert widget.cancelled == list(widget.pending)
+    release.set()
+
+
+def test_progress_estimates_time_left():
+    now = [100.0]
+    progress = Progress(10, clock=lambda: now[0])
+    assert progress.text() == "0 of 10 frames"
+    assert progress.seconds_left is None
+
+    now[0] += 30
+    progress.update(3)
+    assert progress.fraction == 0.3
+    assert progress.seconds_left == 70
+    assert progress.text() == "3 of 10 frames, about 1:10 left"
+
+    progress.update(10)
+    assert progress.text() == "10 of 10 frames"
+
+
+def test_format_duration():
+    assert format_duration(5) == "0:05"
+    assert format_duration(125.4) == "2:05"
+    assert format_duration(3725) == "1:02:05"
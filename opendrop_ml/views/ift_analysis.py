@@ -2,12 +2,14 @@ from opendrop_ml.modules.core.classes import ExperimentalSetup
 from opendrop_ml.modules.ift.ift_data_processor import IftDataProcessor
 from opendrop_ml.views.component.imageGallery import ImageGallery
 from opendrop_ml.views.helper.theme import get_system_text_color
+from opendrop_ml.utils.lazy import lazy_import
 
 from customtkinter import CTkFrame, CTkScrollableFrame, CTkTabview, CTkLabel
 
 # from PIL import Image
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import matplotlib.pyplot as plt
+
+backend_tkagg = lazy_import("matplotlib.backends.backend_tkagg")
+plt = lazy_import("matplotlib.pyplot")
 
 
 class IftAnalysis(CTkFrame):
@@ -22,7 +24,6 @@ class IftAnalysis(CTkFrame):
 
         self.user_input_data = user_input_data
         self.ift_processor = ift_processor
-        self.ift_processor.process_data(self.user_input_data)
         # Create tabs
         self.tab_view = CTkTabview(self)
         self.tab_view.pack(fill="both", expand=True)
@@ -144,10 +145,10 @@ class IftAnalysis(CTkFrame):
         fig.canvas.mpl_connect("key_press_event", on_key)
         show(idx[0])
         # Create a canvas for the figure
-        canvas = FigureCanvasTkAgg(fig, self.residuals_frame)
+        canvas = backend_tkagg.FigureCanvasTkAgg(fig, self.residuals_frame)
 
         # Create and pack the navigation toolbar
-        toolbar = NavigationToolbar2Tk(canvas, self.residuals_frame)
+        toolbar = backend_tkagg.NavigationToolbar2Tk(canvas, self.residuals_frame)
         toolbar.update()
 
         # Ensure the canvas is packed after the toolbar
@@ -185,8 +186,8 @@ class IftAnalysis(CTkFrame):
         fig.canvas.mpl_connect("key_press_event", on_key)
         show(idx[0])
 
-        canvas = FigureCanvasTkAgg(fig, parent)
-        toolbar = NavigationToolbar2Tk(canvas, parent)
+        canvas = backend_tkagg.FigureCanvasTkAgg(fig, parent)
+        toolbar = backend_tkagg.NavigationToolbar2Tk(canvas, parent)
         toolbar.update()
         canvas.get_tk_widget().pack(fill="both", expand=True)
         canvas.draw()
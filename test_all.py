@@ -8,6 +8,8 @@ def run_all_pytest():
     test_dirs = [
         os.path.join(root_dir, "opendrop_ml/modules"),
         os.path.join(root_dir, "opendrop_ml/views"),
+        os.path.join(root_dir, "opendrop_ml/utils"),
+        os.path.join(root_dir, "opendrop_ml/cli_test.py"),
     ]
 
     args = [